@@ -0,0 +1,53 @@
+"""
+Memory benchmark: bytes per in-memory sample (`Dataset.sample_list`) for the example COCO and VOC definitions.
+
+    python benchmarks/bench_memory.py [--repeat 3]
+
+The raw yaml samples are loaded first, only the memory retained by the instantiated `Struct` objects (and the
+geometry objects they hold) is counted, measured with `tracemalloc`.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsdl.dataset import DSDLDataset  # noqa: E402
+
+DEMOS = {
+    "coco": os.path.join(ROOT, "demo", "coco_demo.yaml"),
+    "voc": os.path.join(ROOT, "demo", "voc_demo.yaml"),
+}
+LIBRARY = os.path.join(ROOT, "dsdl", "dsdl_library")
+
+
+def measure(dsdl_yaml, lazy_init=False):
+    location_config = dict(type="LocalFileReader", working_dir=os.path.dirname(dsdl_yaml))
+    dataset = DSDLDataset(dsdl_yaml, location_config, import_dir=LIBRARY, lazy_init=lazy_init)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sample_list = dataset._load_sample()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / max(len(sample_list), 1), len(sample_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'dataset':<8}{'lazy':<7}{'samples':>8}{'bytes/sample':>15}")
+    for name, dsdl_yaml in DEMOS.items():
+        for lazy_init in (False, True):
+            res = [measure(dsdl_yaml, lazy_init) for _ in range(args.repeat)]
+            per_sample = min(_[0] for _ in res)
+            print(f"{name:<8}{str(lazy_init):<7}{res[0][1]:>8}{per_sample:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Pipeline benchmark: time the hot paths of the SDK on a synthetic dataset and compare them against a baseline.
+
+    python benchmarks/bench_pipeline.py --task detection --samples 5000 --save-baseline baseline.json
+    python benchmarks/bench_pipeline.py --task detection --samples 5000 --baseline baseline.json --threshold 0.2
+
+Stages: `dsdl_parse` (without the parser cache), `Dataset._load_sample` (eager and lazy), `extract_field_info` of the
+task fields on every sample, `bytes_to_numpy` of the images, `ImageVisualizePipeline.visualize` and `CheckDataset`.
+Each stage is run `--repeat` times and the best time is reported. With `--baseline`, a stage slower than the baseline
+by more than `--threshold` is reported as a regression (and the exit code is 1).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import generate_dataset, TASKS  # noqa: E402
+from dsdl.dataset import DSDLDataset, CheckDataset  # noqa: E402
+from dsdl.dataset.utils import ImageVisualizePipeline, Report  # noqa: E402
+from dsdl.geometry.base_geometry import FontMixin  # noqa: E402
+from dsdl.geometry.utils import bytes_to_numpy  # noqa: E402
+from dsdl.parser import dsdl_parse  # noqa: E402
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _ensure_font():
+    # 源码中不一定包含可视化使用的字体文件，此时使用PIL的默认字体
+    from PIL import ImageFont
+    font_path = os.path.join(ROOT, "dsdl", "geometry", "source", "Arial_Font.ttf")
+    if FontMixin.FONT is None and not os.path.exists(font_path):
+        FontMixin.set_font(ImageFont.load_default())
+
+
+def run(info, repeat=3, visualize_samples=50, decode_images=64):
+    _ensure_font()
+    location_config = dict(type="LocalFileReader", working_dir=info["working_dir"])
+    fields = info["fields"]
+    results = {}
+
+    def record(name, func, items):
+        results[name] = {"seconds": best_time(func, repeat), "items": items}
+
+    record("dsdl_parse", lambda: dsdl_parse(info["dsdl_yaml"], info["import_dir"], use_cache=False), 1)
+
+    dataset = DSDLDataset(info["dsdl_yaml"], location_config, import_dir=info["import_dir"])
+    num_samples = len(dataset)
+    for lazy_init in (False, True):
+        def load(lazy_init=lazy_init):
+            dataset.lazy_init = lazy_init
+            return dataset._load_sample()
+
+        record(f"load_sample[lazy={lazy_init}]", load, num_samples)
+    dataset.lazy_init = False
+
+    samples = dataset.sample_list
+    record("extract_field_info", lambda: [_.extract_field_info(fields) for _ in samples], num_samples)
+
+    reader = dataset.file_reader
+    image_paths = sorted({_["image"] for _ in dataset._samples})[:decode_images]
+    image_bytes = [reader.read(_) for _ in image_paths]
+    record("bytes_to_numpy", lambda: [bytes_to_numpy(_) for _ in image_bytes], len(image_bytes))
+
+    vis_samples = samples[:visualize_samples]
+    record("visualize", lambda: [ImageVisualizePipeline(fields, _).visualize() for _ in vis_samples],
+           len(vis_samples))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def check():
+            report = Report(os.path.join(tmp_dir, "report.md"))
+            CheckDataset(report, dataset._samples, dataset.sample_type, location_config)
+
+        record("check_dataset", check, num_samples)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    return the rows of the comparison table and the names of the regressed stages
+    """
+    rows, regressions = [], []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, res["seconds"], None, None))
+            continue
+        # 样本数不同时按单个样本的耗时比较
+        ratio = (res["seconds"] / res["items"]) / (base["seconds"] / base["items"])
+        rows.append((name, res["seconds"], base["seconds"], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--task", choices=TASKS, default="detection")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--image-size", type=int, nargs=2, default=(320, 240), metavar=("W", "H"))
+    parser.add_argument("--objects", type=int, default=8)
+    parser.add_argument("--format", choices=("json", "yaml"), default="json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=None, help="where the synthetic dataset is written, default to a temp dir")
+    parser.add_argument("--output", default=None, help="write the results to this json file")
+    parser.add_argument("--save-baseline", default=None, help="write the results as a baseline json file")
+    parser.add_argument("--baseline", default=None, help="compare the results with this baseline json file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    config = {"task": args.task, "samples": args.samples, "images": args.images, "image_size": list(args.image_size),
+              "objects": args.objects, "format": args.format}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or os.path.join(tmp_dir, "data")
+        info = generate_dataset(data_dir, args.task, args.samples, args.images, tuple(args.image_size), args.objects,
+                                args.format)
+        results = run(info, args.repeat)
+
+    report = {"config": config, "python": platform.python_version(), "platform": platform.platform(),
+              "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_report = json.load(f)
+        if baseline_report.get("config") != config:
+            print(f"warning: the baseline was run with {baseline_report.get('config')}")
+        baseline = baseline_report["results"]
+    rows, regressions = compare(results, baseline, args.threshold)
+
+    print(f"{'stage':<24}{'items':>8}{'seconds':>12}{'us/item':>12}{'baseline':>12}{'ratio':>8}")
+    for name, seconds, base, ratio in rows:
+        items = results[name]["items"]
+        line = f"{name:<24}{items:>8}{seconds:>12.4f}{seconds / items * 1e6:>12.1f}"
+        if base is not None:
+            flag = " !" if name in regressions else ""
+            line += f"{base:>12.4f}{ratio:>8.2f}{flag}"
+        print(line)
+    if regressions:
+        print(f"regressions (> {args.threshold:.0%} slower than the baseline): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Synthetic DSDL dataset generator for the benchmarks.
+
+    python benchmarks/synthetic.py /tmp/dsdl_bench --task detection --samples 10000
+
+Writes a self-contained dataset: the task/class definitions (`library/`), the dsdl yaml (`dataset.yaml`), the samples
+(`samples.json` or `samples.yaml`, referenced by `sample-path`) and random local images (`media/`). The output only
+depends on the arguments (a fixed random seed), so the benchmark results are comparable across runs and machines.
+"""
+import argparse
+import json
+import os
+import random
+
+import numpy as np
+import yaml
+from PIL import Image
+
+TASKS = ("detection", "classification", "segmentation")
+NUM_CLASSES = 20
+CLASS_DOM = "BenchClassDom"
+
+_TASK_DEFS = {
+    "detection": ("BenchDetectionSample", """
+BenchObjectEntry:
+    $def: struct
+    $params: ['cdom']
+    $fields:
+        bbox: BBox
+        label: Label[dom=$cdom]
+        is_crowd: Bool
+    $optional: ['label']
+
+BenchDetectionSample:
+    $def: struct
+    $params: ['cdom']
+    $fields:
+        image: Image
+        objects: List[etype=BenchObjectEntry[cdom=$cdom]]
+"""),
+    "classification": ("BenchClassificationSample", """
+BenchClassificationSample:
+    $def: struct
+    $params: ['cdom']
+    $fields:
+        image: Image
+        label: Label[dom=$cdom]
+"""),
+    "segmentation": ("BenchSegmentationSample", """
+BenchSegmentationSample:
+    $def: struct
+    $params: ['cdom']
+    $fields:
+        image: Image
+        label_map: LabelMap[dom=$cdom]
+"""),
+}
+
+# 每个任务在基准测试中提取/可视化的字段
+TASK_FIELDS = {
+    "detection": ["image", "bbox", "label"],
+    "classification": ["image", "label"],
+    "segmentation": ["image", "labelmap"],
+}
+
+
+def _write_library(library_dir, task):
+    os.makedirs(os.path.join(library_dir, "task"), exist_ok=True)
+    os.makedirs(os.path.join(library_dir, "class"), exist_ok=True)
+    sample_type, definition = _TASK_DEFS[task]
+    with open(os.path.join(library_dir, "task", f"bench-{task}.yaml"), "w") as f:
+        f.write('$dsdl-version: "0.5.0"\n' + definition)
+    with open(os.path.join(library_dir, "class", "bench-class-dom.yaml"), "w") as f:
+        f.write('$dsdl-version: "0.5.0"\n\n%s:\n    $def: class_domain\n    classes:\n' % CLASS_DOM)
+        for i in range(NUM_CLASSES):
+            f.write(f"        - class_{i}\n")
+    return sample_type
+
+
+def _write_images(media_dir, task, num_images, image_size, rng):
+    os.makedirs(media_dir, exist_ok=True)
+    w, h = image_size
+    for i in range(num_images):
+        array = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+        Image.fromarray(array).save(os.path.join(media_dir, f"{i:06d}.jpg"), quality=90)
+        if task == "segmentation":
+            label_map = rng.integers(0, NUM_CLASSES + 1, size=(h // 8, w // 8), dtype=np.uint8)
+            label_map = np.kron(label_map, np.ones((8, 8), dtype=np.uint8))
+            Image.fromarray(label_map).save(os.path.join(media_dir, f"{i:06d}_seg.png"))
+
+
+def _make_sample(i, task, num_images, image_size, objects_per_image, rnd):
+    image_id = i % num_images
+    sample = {"image": f"media/{image_id:06d}.jpg"}
+    if task == "classification":
+        sample["label"] = rnd.randint(1, NUM_CLASSES)
+    elif task == "segmentation":
+        sample["label_map"] = f"media/{image_id:06d}_seg.png"
+    else:
+        w, h = image_size
+        objects = []
+        for _ in range(rnd.randint(max(objects_per_image // 2, 1), objects_per_image * 3 // 2 + 1)):
+            x, y = round(rnd.uniform(0, w - 2), 2), round(rnd.uniform(0, h - 2), 2)
+            bbox = [x, y, round(rnd.uniform(1, w - x), 2), round(rnd.uniform(1, h - y), 2)]
+            objects.append({"bbox": bbox, "label": rnd.randint(1, NUM_CLASSES), "is_crowd": rnd.random() < 0.05})
+        sample["objects"] = objects
+    return sample
+
+
+def generate_dataset(out_dir, task="detection", num_samples=1000, num_images=64, image_size=(320, 240),
+                     objects_per_image=8, sample_format="json", seed=0):
+    """
+    Generate a synthetic dataset in `out_dir` and return a dict with `dsdl_yaml`, `import_dir`, `working_dir`,
+    `sample_type` and `fields` (the fields used by the task). Existing images are reused.
+    """
+    assert task in TASKS, f"task must be one of {TASKS}"
+    assert sample_format in ("json", "yaml"), "sample_format must be 'json' or 'yaml'"
+    os.makedirs(out_dir, exist_ok=True)
+    num_images = max(1, min(num_images, num_samples))
+    library_dir = os.path.join(out_dir, "library")
+    sample_type = _write_library(library_dir, task)
+    media_dir = os.path.join(out_dir, "media")
+    marker = os.path.join(media_dir, f".{task}_{num_images}_{image_size[0]}x{image_size[1]}_{seed}")
+    if not os.path.exists(marker):
+        _write_images(media_dir, task, num_images, image_size, np.random.default_rng(seed))
+        open(marker, "w").close()
+
+    rnd = random.Random(seed)
+    samples = [_make_sample(i, task, num_images, image_size, objects_per_image, rnd) for i in range(num_samples)]
+    sample_file = f"samples.{sample_format}"
+    with open(os.path.join(out_dir, sample_file), "w") as f:
+        if sample_format == "json":
+            json.dump({"samples": samples}, f)
+        else:
+            yaml.safe_dump({"samples": samples}, f, default_flow_style=None, sort_keys=False)
+
+    dsdl_yaml = os.path.join(out_dir, "dataset.yaml")
+    with open(dsdl_yaml, "w") as f:
+        yaml.safe_dump({
+            "$dsdl-version": "0.5.0",
+            "$import": [f"task/bench-{task}", "class/bench-class-dom"],
+            "meta": {"name": f"Synthetic {task} benchmark", "creator": "dsdl-benchmarks", "dataset-version": "1.0.0"},
+            "data": {"sample-type": f"{sample_type}[cdom={CLASS_DOM}]", "sample-path": sample_file},
+        }, f, sort_keys=False)
+    return {
+        "dsdl_yaml": dsdl_yaml,
+        "import_dir": library_dir,
+        "working_dir": out_dir,
+        "sample_type": sample_type,
+        "fields": TASK_FIELDS[task],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--task", choices=TASKS, default="detection")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--images", type=int, default=64, help="number of distinct images, reused by the samples")
+    parser.add_argument("--image-size", type=int, nargs=2, default=(320, 240), metavar=("W", "H"))
+    parser.add_argument("--objects", type=int, default=8, help="average number of objects per image (detection)")
+    parser.add_argument("--format", choices=("json", "yaml"), default="json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    info = generate_dataset(args.out_dir, args.task, args.samples, args.images, tuple(args.image_size), args.objects,
+                            args.format, args.seed)
+    print(info["dsdl_yaml"])
+
+
+if __name__ == "__main__":
+    main()
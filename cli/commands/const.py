@@ -20,6 +20,8 @@ PROG_NAME = "odl-cli"  # 程序名称
 
 DEFAULT_LOCAL_STORAGE_PATH = os.path.join(DEFAULT_CONFIG_DIR, "datasets")  # 默认本地存储路径
 
+DEFAULT_MANIFEST_CACHE_DIR = os.path.join(DEFAULT_CONFIG_DIR, "manifests")  # 远端数据集对象清单（key/size/etag）的缓存目录
+
 DEFAULT_CLI_LOG_FILE_PATH = os.path.join(
     DEFAULT_CONFIG_DIR, "logs"
 )  # default log file path
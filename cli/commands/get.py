@@ -11,7 +11,7 @@ import shutil
 
 import yaml
 from commands.cmdbase import CmdBase
-from commands.const import DEFAULT_LOCAL_STORAGE_PATH, DSDL_CLI_DATASET_NAME
+from commands.const import DEFAULT_LOCAL_STORAGE_PATH, DSDL_CLI_DATASET_NAME, DEFAULT_MANIFEST_CACHE_DIR
 from commons.argument_parser import EnvDefaultVar
 from commons.exceptions import CLIException, ExistCode
 from commons.stdio import print_stdout
@@ -84,6 +84,12 @@ class Get(CmdBase):
             action="store_true",
             help='download label data only.',
         )
+        select_parser.add_argument(
+            "--workers",
+            type=int,
+            default=16,
+            help='the number of files downloaded concurrently, default to 16.',
+            metavar='')
 
         return select_parser
 
@@ -119,7 +125,9 @@ class Get(CmdBase):
         s3_client = ops.OssClient(endpoint_url=endpoint_url,
                                   aws_access_key_id=aws_access_key_id,
                                   aws_secret_access_key=aws_secret_access_key,
-                                  region_name=region_name)
+                                  region_name=region_name,
+                                  max_workers=cmdargs.workers,
+                                  manifest_cache_dir=DEFAULT_MANIFEST_CACHE_DIR)
 
         # construct class of sqlite client
         db_client = admin.DBClient()
@@ -175,17 +183,21 @@ class Get(CmdBase):
 
                 # download dataset
                 if not label_flag:
-                    s3_client.download_directory(default_bucket,
-                                                 dataset_name + '/',
-                                                 dataset_dir)
+                    media_ok = s3_client.download_directory(default_bucket,
+                                                            dataset_name + '/',
+                                                            dataset_dir)
+                    if not media_ok and not os.path.exists(dataset_info_path):
+                        self.__download_failed(dataset_name, "label data")
                 else:
                     print_stdout("parquet folder: ")
-                    s3_client.download_directory(default_bucket,
-                                                 s3_parquet_prefix,
-                                                 parquet_dir)
+                    label_ok = s3_client.download_directory(default_bucket,
+                                                            s3_parquet_prefix,
+                                                            parquet_dir)
                     print_stdout("yml folder: ")
-                    s3_client.download_directory(default_bucket, s3_yml_prefix,
-                                                 yml_dir)
+                    label_ok = s3_client.download_directory(default_bucket, s3_yml_prefix,
+                                                            yml_dir) and label_ok
+                    if not label_ok:
+                        self.__download_failed(dataset_name, "label data")
                 print_stdout("register local dataset...")
 
                 # get meta info of dataset to insert into sqlite
@@ -208,23 +220,29 @@ class Get(CmdBase):
                 dataset_media_size = stat['dataset_stat']['media_size']
 
                 if not label_flag:
+                    # 只有标注文件都已下载时才能登记数据集，部分媒体文件下载失败时media标记为0，再次运行时继续下载
+                    if not all(os.path.exists(os.path.join(parquet_dir, split)) for split in parquet_list):
+                        self.__download_failed(dataset_name, "label data")
                     db_client.register_dataset(dataset_name, task_type, output,
-                                               dataset_dir, 1, 1,
+                                               dataset_dir, 1, int(media_ok),
                                                dataset_media_num,
                                                dataset_media_size)
 
                     # get meta info of split to insert into sqlite
+                    splits = []
                     for split in parquet_list:
                         stat = query.ParquetReader(
                             os.path.join(dataset_dir, 'parquet',
                                          split)).get_metadata()
                         split_media_num = stat['split_stat']['media_num']
                         split_media_size = stat['split_stat']['media_size']
-                        db_client.register_split(dataset_name,
-                                                 split.replace(".parquet",
-                                                               ""), 'official',
-                                                 1, 1, split_media_num,
-                                                 split_media_size)
+                        splits.append((dataset_name,
+                                       split.replace(".parquet", ""),
+                                       'official', 1, int(media_ok), split_media_num,
+                                       split_media_size))
+                    db_client.register_splits(splits)
+                    if not media_ok:
+                        self.__download_failed(dataset_name, "media data")
                 else:
                     db_client.register_dataset(dataset_name, task_type, output,
                                                dataset_dir, 1, 0,
@@ -232,17 +250,18 @@ class Get(CmdBase):
                                                dataset_media_size)
 
                     # get meta info of split to insert into sqlite
+                    splits = []
                     for split in parquet_list:
                         stat = query.ParquetReader(
                             os.path.join(dataset_dir, 'parquet',
                                          split)).get_metadata()
                         split_media_num = stat['split_stat']['media_num']
                         split_media_size = stat['split_stat']['media_size']
-                        db_client.register_split(dataset_name,
-                                                 split.replace(".parquet",
-                                                               ""), 'official',
-                                                 1, 0, split_media_num,
-                                                 split_media_size)
+                        splits.append((dataset_name,
+                                       split.replace(".parquet", ""),
+                                       'official', 1, 0, split_media_num,
+                                       split_media_size))
+                    db_client.register_splits(splits)
 
             # dataset has already been partly downloaded
             else:
@@ -263,47 +282,45 @@ class Get(CmdBase):
                         print_stdout("label data has been all downloaded")
                     else:
                         print_stdout("download missing label files")
-                        s3_client.download_list(default_bucket,
-                                                download_file_list,
-                                                s3_parquet_prefix, parquet_dir)
-
-                        print_stdout("register local split...")
-                        for split in download_file_list:
-                            stat = query.ParquetReader(
-                                os.path.join(parquet_dir,
-                                             split)).get_metadata()
-                            split_media_num = stat['split_stat']['media_num']
-                            split_media_size = stat['split_stat']['media_size']
-                            db_client.register_split(
-                                dataset_name, split.replace(".parquet",
-                                                            ""), 'official', 1,
-                                1, split_media_num, split_media_size)
+                        if not s3_client.download_list(default_bucket,
+                                                       download_file_list,
+                                                       s3_parquet_prefix, parquet_dir):
+                            self.__download_failed(dataset_name, "label data")
 
                 print_stdout("check media data...")
+                media_ok = True
                 if media_exist_flag:
                     print_stdout("media data has been all downloaded")
                 else:
                     if not os.path.exists(media_dir):
                         os.mkdir(media_dir)
                     print_stdout("download missing media files")
-                    s3_client.download_directory(default_bucket,
-                                                 s3_media_prefix, media_dir)
+                    media_ok = s3_client.download_directory(default_bucket,
+                                                            s3_media_prefix, media_dir)
+
+                if not s3_client.download_directory(default_bucket, s3_yml_prefix,
+                                                    yml_dir):
+                    self.__download_failed(dataset_name, "label data")
 
-                s3_client.download_directory(default_bucket, s3_yml_prefix,
-                                             yml_dir)
+                if not label_exist_flag and download_file_list:
+                    print_stdout("register local split...")
+                    splits = []
+                    for split in download_file_list:
+                        stat = query.ParquetReader(
+                            os.path.join(parquet_dir,
+                                         split)).get_metadata()
+                        split_media_num = stat['split_stat']['media_num']
+                        split_media_size = stat['split_stat']['media_size']
+                        splits.append((dataset_name,
+                                       split.replace(".parquet", ""),
+                                       'official', 1, int(media_ok), split_media_num,
+                                       split_media_size))
+                    db_client.register_splits(splits)
 
                 print_stdout("update dataset info...")
-                try:
-                    db_client.cursor.execute(
-                        "update dataset set label_data=?, media_data=?, updated_time=datetime('now','localtime') where dataset_name=?",
-                        [1, 1, dataset_name])
-                    db_client.cursor.execute(
-                        "update split set label_data=?, media_data=?, updated_time=datetime('now','localtime') where dataset_name=?",
-                        [1, 1, dataset_name])
-                    db_client.conn.commit()
-                except Exception as e:
-                    raise CLIException(ExistCode.SQLITE_OPERATION_ERROR,
-                                       str(e))
+                db_client.update_dataset_flags(dataset_name, 1, int(media_ok))
+                if not media_ok:
+                    self.__download_failed(dataset_name, "media data")
 
         # download a split of dataset
         else:
@@ -320,21 +337,23 @@ class Get(CmdBase):
                     if not os.path.exists(parquet_dir):
                         os.mkdir(parquet_dir)
 
-                    s3_client.download_file(default_bucket, s3_parquet_key,
-                                            parquet_path)
-                    s3_client.download_file(default_bucket, s3_datainfo_key,
-                                            dataset_info_path)
+                    if not (s3_client.download_file(default_bucket, s3_parquet_key,
+                                                    parquet_path) and
+                            s3_client.download_file(default_bucket, s3_datainfo_key,
+                                                    dataset_info_path)):
+                        self.__download_failed(dataset_name, "label data of split %s" % split_name)
                     parquet_reader = query.ParquetReader(parquet_path)
                     s3_media_keys = parquet_reader.select(
                         'image')['image'].tolist()
 
+                    media_ok = False
                     if not label_flag:
                         if not os.path.exists(media_dir):
                             os.mkdir(media_dir)
 
-                        s3_client.download_list(default_bucket, s3_media_keys,
-                                                dataset_name + "/",
-                                                dataset_dir)
+                        media_ok = s3_client.download_list(default_bucket, s3_media_keys,
+                                                           dataset_name + "/",
+                                                           dataset_dir)
 
                     print_stdout("register local split...")
                     if not dataset_exist_flag:
@@ -357,35 +376,25 @@ class Get(CmdBase):
                         stat = query.ParquetReader(parquet_path).get_metadata()
                         split_media_num = stat['split_stat']['media_num']
                         split_media_size = stat['split_stat']['media_size']
-                        if label_flag:
-                            db_client.register_split(dataset_name, split_name,
-                                                     'official', 1, 0,
-                                                     split_media_num,
-                                                     split_media_size)
-                        else:
-                            db_client.register_split(dataset_name, split_name,
-                                                     'official', 1, 1,
-                                                     split_media_num,
-                                                     split_media_size)
+                        db_client.register_split(dataset_name, split_name,
+                                                 'official', 1, int(media_ok),
+                                                 split_media_num,
+                                                 split_media_size)
                     else:
                         stat = query.ParquetReader(parquet_path).get_metadata()
                         split_media_num = stat['split_stat']['media_num']
                         split_media_size = stat['split_stat']['media_size']
-                        if label_flag:
-                            db_client.register_split(dataset_name, split_name,
-                                                     'official', 1, 0,
-                                                     split_media_num,
-                                                     split_media_size)
-                        else:
-                            db_client.register_split(dataset_name, split_name,
-                                                     'official', 1, 1,
-                                                     split_media_num,
-                                                     split_media_size)
+                        db_client.register_split(dataset_name, split_name,
+                                                 'official', 1, int(media_ok),
+                                                 split_media_num,
+                                                 split_media_size)
+                    if not label_flag and not media_ok:
+                        self.__download_failed(dataset_name, "media data of split %s" % split_name)
 
                 else:
                     local_db_split_dict = db_client.get_sqlite_dict_list(
-                        "select * from split where dataset_name='%s' and split_name='%s'"
-                        % (dataset_name, split_name))[0]
+                        "select * from split where dataset_name=? and split_name=?",
+                        [dataset_name, split_name])[0]
                     label_data = local_db_split_dict['label_data']
                     media_data = local_db_split_dict['media_data']
                     if label_data == 1 and media_data == 1:
@@ -401,19 +410,14 @@ class Get(CmdBase):
                             parquet_reader = query.ParquetReader(parquet_path)
                             s3_media_keys = parquet_reader.select(
                                 'image')['image'].tolist()
-                            s3_client.download_list(default_bucket,
-                                                    s3_media_keys,
-                                                    dataset_name + "/",
-                                                    dataset_dir)
+                            if not s3_client.download_list(default_bucket,
+                                                           s3_media_keys,
+                                                           dataset_name + "/",
+                                                           dataset_dir):
+                                self.__download_failed(dataset_name, "media data of split %s" % split_name)
                             print_stdout("update split info...")
-                            try:
-                                db_client.cursor.execute(
-                                    "update split set media_data=?, updated_time=datetime('now','localtime') where dataset_name=? and split_name=?",
-                                    [1, dataset_name, split_name])
-                                db_client.conn.commit()
-                            except Exception as e:
-                                raise CLIException(
-                                    ExistCode.SQLITE_OPERATION_ERROR, str(e))
+                            db_client.update_split_media_flag(
+                                dataset_name, split_name, 1)
 
             else:
                 if not split_exist_flag:
@@ -426,8 +430,8 @@ class Get(CmdBase):
                     dataset_name, split_name)
 
                 local_db_split_dict = db_client.get_sqlite_dict_list(
-                    "select * from split where dataset_name='%s' and split_name='%s'"
-                    % (dataset_name, split_name))[0]
+                    "select * from split where dataset_name=? and split_name=?",
+                    [dataset_name, split_name])[0]
                 label_data = local_db_split_dict['label_data']
                 media_data = local_db_split_dict['media_data']
                 if label_data == 1 and media_data == 1:
@@ -443,18 +447,22 @@ class Get(CmdBase):
                         parquet_reader = query.ParquetReader(parquet_path)
                         s3_media_keys = parquet_reader.select(
                             'image')['image'].tolist()
-                        s3_client.download_list(default_bucket, s3_media_keys,
-                                                dataset_name + "/",
-                                                dataset_dir)
+                        if not s3_client.download_list(default_bucket, s3_media_keys,
+                                                       dataset_name + "/",
+                                                       dataset_dir):
+                            self.__download_failed(dataset_name, "media data of split %s" % split_name)
                         print_stdout("update split info...")
-                        try:
-                            db_client.cursor.execute(
-                                "update split set media_data=?, updated_time=datetime('now','localtime') where dataset_name=? and split_name=?",
-                                [1, dataset_name, split_name])
-                            db_client.conn.commit()
-                        except Exception as e:
-                            raise CLIException(
-                                ExistCode.SQLITE_OPERATION_ERROR, str(e))
+                        db_client.update_split_media_flag(
+                            dataset_name, split_name, 1)
+
+    def __download_failed(self, dataset_name: str, what: str):
+        """
+        some files failed to download, the media flag is left as 0 so that running the command again resumes the download
+        """
+        reminder = "%s of dataset %s failed to download, run the command again to resume the download" % (
+            what, dataset_name)
+        logger.info(reminder)
+        raise CLIException(ExistCode.DOWNLOAD_FAILED, reminder)
 
     def __check_disk_usage(self, dataset_name: str, output_path: str,
                            s3_client: ops.OssClient):
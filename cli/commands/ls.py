@@ -53,7 +53,7 @@ class Ls(CmdBase):
             raise CLIException(ExistCode.NO_DATASET_LOCAL,
                                "Local storage has no datasets !")
         # datasplit_list = db_client.get_sqlite_dict_list('select * from split')
-        datasplit_join_list = db_client.get_sqlite_dict_list("select * from split where dataset_name='%s'" %(dataset_name))
+        datasplit_join_list = db_client.get_sqlite_dict_list("select * from split where dataset_name=?", [dataset_name])
 
         return dataset_list, datasplit_join_list
     
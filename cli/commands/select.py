@@ -8,10 +8,11 @@ Examples:
 """
 import os
 import re
+import sys
 
 import yaml
 from commands.cmdbase import CmdBase
-from commands.const import DEFAULT_LOCAL_STORAGE_PATH, DSDL_CLI_DATASET_NAME
+from commands.const import DEFAULT_LOCAL_STORAGE_PATH, DSDL_CLI_DATASET_NAME, DEFAULT_MANIFEST_CACHE_DIR
 from commons.argument_parser import EnvDefaultVar
 from commons.exceptions import CLIException, ExistCode
 from commons.stdio import print_stdout
@@ -87,7 +88,7 @@ class Select(CmdBase):
             "--filter",
             type=str,
             help=
-            'filter data according to given conditions, such as "label=\'bird\'"',
+            'filter data according to given conditions, a raw sql expression such as "label=\'bird\'"',
             metavar='')
         # select_parser.add_argument("--fields", type=str,
         #                            help='Fields to be selected. All the files will be selected if the arg is not given. Use "," to split fields.',
@@ -102,6 +103,11 @@ class Select(CmdBase):
         # select_parser.add_argument("--random", type=int,
         #                            help='Set the number of random samples from the returned select result',
         #                            metavar='')
+        select_parser.add_argument("--page-size",
+                                   type=int,
+                                   default=100,
+                                   help='the number of records shown on the console at a time, default to 100',
+                                   metavar='')
         select_parser.add_argument(
             "--export-name",
             type=str,
@@ -123,6 +129,32 @@ class Select(CmdBase):
         )
         return select_parser
 
+    @staticmethod
+    def _print_pages(batches):
+        """
+        Print the record batches page by page, wait for the user between the pages in an interactive terminal
+        """
+        interactive = sys.stdin.isatty() and sys.stdout.isatty()
+        shown = 0
+        try:
+            try:
+                batch = batches.read_next_batch()
+            except StopIteration:
+                print_stdout(batches.schema.empty_table().to_pandas())
+                return
+            while True:
+                print_stdout(batch.to_pandas())
+                shown += batch.num_rows
+                try:
+                    batch = batches.read_next_batch()
+                except StopIteration:
+                    break
+                if interactive and input("-- %d rows shown, press Enter for more or 'q' to quit --" % shown) in (
+                        "q", "Q"):
+                    break
+        finally:
+            batches.close()
+
     def cmd_entry(self, cmdargs, config, *args, **kwargs):
         """
         Entry point for the command
@@ -160,7 +192,8 @@ class Select(CmdBase):
         s3_client = ops.OssClient(aws_access_key_id=aws_access_key_id,
                                   aws_secret_access_key=aws_secret_access_key,
                                   endpoint_url=endpoint_url,
-                                  region_name=region_name)
+                                  region_name=region_name,
+                                  manifest_cache_dir=DEFAULT_MANIFEST_CACHE_DIR)
         duck_cursor = duckdb.connect(database=':memory:')
         # if not db_client.is_dataset_local_exist(dataset_name):
         #     print("there is no dataset named %s locally" % dataset_name)
@@ -198,17 +231,27 @@ class Select(CmdBase):
             media_path_field = [media_path_field]
 
         try:
-            df = split_reader.select(select_cols=fields,
-                                     filter_cond=filter,
-                                     limit=limit,
-                                     offset=offset,
-                                     samples=random)
+            if export_name is not None:
+                df = split_reader.select(select_cols=fields,
+                                         filter_cond=filter,
+                                         limit=limit,
+                                         offset=offset,
+                                         samples=random)
+                print_stdout(df)
+            else:
+                # 只展示结果时按页流式读取，不把整个结果加载到内存中
+                batches = split_reader.select_batches(select_cols=fields,
+                                                      filter_cond=filter,
+                                                      limit=limit,
+                                                      offset=offset,
+                                                      samples=random,
+                                                      batch_size=max(cmdargs.page_size, 1))
+                self._print_pages(batches)
         except Exception as e:
             # print_stdout(str(e))
             logger.error(e)
             raise CLIException(ExistCode.QUERY_SYNTAX_ERROR,
                                query_error_info(e))
-        print_stdout(df)
 
         if cmdargs.output is not None and export_name is None:
             print_stdout(
@@ -236,8 +279,8 @@ class Select(CmdBase):
                 path_info = "the dataset %s registered locally, the split has to been exported to %s" % (
                     dataset_name, sub_split.parquet_path)
                 split_db_info = db_client.get_sqlite_dict_list(
-                    "select * from split where dataset_name='%s' and split_name='%s'"
-                    % (dataset_name, split_name))
+                    "select * from split where dataset_name=? and split_name=?",
+                    [dataset_name, split_name])
                 if len(split_db_info) != 0:
                     # print(split_db_info)
                     media_download_flag = split_db_info[0]['media_data']
@@ -25,6 +25,7 @@ class ExistCode(Enum):
     DISK_SPACE_NOT_ENOUGH = 15  # 磁盘空间不足
     NO_DATASET_LOCAL = 16 # 本地没有数据集
     VIEW_TASK_TYPE_ERROR = 17 # 不支持的任务类型
+    DOWNLOAD_FAILED = 18  # 部分文件下载失败
 
 
 class CLIException(Exception):
@@ -5,6 +5,7 @@ import logging
 import os
 import sqlite3
 import json
+import threading
 
 import pandas as pd
 from tabulate import tabulate
@@ -50,14 +51,12 @@ def __get_default_db_path():
     return path
 
 
-def initialize_db(db_file):
+def _create_tables(cursor):
     """
-    Initialize sqlite db file in defautl DSDL folder
-    @param db_file: default db file path
+    Create the tables and the indexes of the catalog if they don't exist
+    @param cursor: a cursor of a db connection
     @return:
     """
-    conn = sqlite3.connect(database=db_file)
-    cursor = conn.cursor()
     create_table_sql = '''
     CREATE TABLE IF NOT EXISTS dataset(
     dataset_name varchar, 
@@ -94,11 +93,110 @@ def initialize_db(db_file):
     '''
     cursor.execute(create_table_sql)
 
+    # 主键已经覆盖了按数据集名称（以及split名称）的查询
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_dataset_storage ON dataset(storage_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_split_type ON split(dataset_name, split_type)")
+
+
+def initialize_db(db_file):
+    """
+    Initialize sqlite db file in defautl DSDL folder
+    @param db_file: default db file path
+    @return:
+    """
+    conn = sqlite3.connect(database=db_file)
+    cursor = conn.cursor()
+    _create_tables(cursor)
     conn.commit()
     cursor.close()
     conn.close()
 
 
+class _Catalog:
+    """
+    The sqlite connection shared by all the `DBClient` objects of a process
+
+    - the database runs in WAL mode with a busy timeout, so readers don't block the writer (and vice versa) and
+      concurrent writers wait for the lock instead of failing;
+    - the statements are parameterized, sqlite3 keeps the prepared statements in its statement cache;
+    - the results of the read queries are cached, the cache is cleared when this process writes, or when another
+      connection has committed (`PRAGMA data_version` changed).
+    """
+    BUSY_TIMEOUT = 30  # seconds
+    CACHE_SIZE = 256
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(database=db_path, timeout=self.BUSY_TIMEOUT, check_same_thread=False,
+                                    cached_statements=self.CACHE_SIZE)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=%d" % (self.BUSY_TIMEOUT * 1000))
+        with self.conn:
+            _create_tables(self.conn.cursor())
+        self._cache = {}
+        self._data_version = self._get_data_version()
+
+    def _get_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def query(self, sql, params=()):
+        """
+        Run a read query
+        @return: (header, rows)
+        """
+        key = (sql, tuple(params))
+        with self.lock:
+            data_version = self._get_data_version()
+            if data_version != self._data_version:
+                self._cache.clear()
+                self._data_version = data_version
+            res = self._cache.get(key)
+            if res is None:
+                cursor = self.conn.execute(sql, params)
+                rows = cursor.fetchall()
+                header = tuple(x[0] for x in cursor.description) if cursor.description else ()
+                res = (header, rows)
+                if len(self._cache) >= self.CACHE_SIZE:
+                    self._cache.clear()
+                self._cache[key] = res
+        return res
+
+    def execute(self, sql, params=()):
+        return self.executemany([(sql, params)])
+
+    def executemany(self, statements):
+        """
+        Run the (sql, params) statements in one transaction
+        """
+        with self.lock:
+            try:
+                with self.conn:
+                    for sql, params in statements:
+                        self.conn.execute(sql, params)
+            finally:
+                self._cache.clear()
+
+
+_CATALOGS = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def get_catalog(db_path=None) -> _Catalog:
+    """
+    Get the catalog (shared sqlite connection) of the current process
+    @param db_path: the path of the sqlite db file, default to the db in the default DSDL folder
+    @return:
+    """
+    db_path = DB_PATH if db_path is None else db_path
+    key = (os.getpid(), db_path)  # fork出的子进程不能复用父进程的连接
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(key)
+        if catalog is None:
+            catalog = _CATALOGS[key] = _Catalog(db_path)
+    return catalog
+
+
 def get_size_sum(file_list):
     """
     Compute total size of a list of files
@@ -130,43 +228,55 @@ class DBClient:
     This class handles operations on DSDL local db
     """
 
-    def __init__(self):
+    def __init__(self, db_path=None):
+        """
+        get the catalog (connection) shared in the process, all the reads and writes go through it so that its query
+        cache is cleared on every write
         """
-        create connection and cursor to link sqlite
+        self.catalog = get_catalog(db_path)
+
+    def _fetchone(self, sql, params):
         """
-        self.conn = sqlite3.connect(database=DB_PATH)
-        self.cursor = self.conn.cursor()
+        Run a cached read query and return the first row as a dict
+        """
+        header, rows = self.catalog.query(sql, params)
+        return dict(zip(header, rows[0])) if rows else None
+
+    def _write(self, operation, statements):
+        try:
+            self.catalog.executemany(statements)
+        except Exception as e:
+            error_info = "Sqlite %s operation error: \n" % operation + str(e)
+            logger.error(error_info)
+            raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
 
-    # def __del__(self):
-    #     """
-    #     close connection and cursor
-    #     @return:
-    #     """
-    #     self.cursor.close()
-    #     self.conn.close()
-    def get_sqlite_dict_list(self, sql) -> list:
+    def execute(self, sql, params=()):
+        """
+        Run a write statement (insert/update/delete) in a transaction
+        @param sql: the sql with `?` placeholders
+        @param params: the values of the placeholders
+        @return:
+        """
+        self._write("write", [(sql, params)])
+
+    def get_sqlite_dict_list(self, sql, params=()) -> list:
         """
         Get sql query result as a list of dicts
-        @param cursor: a cursor of a db connection
-        @param sql: query sql
+        @param sql: query sql, the values should be passed as `?` placeholders
+        @param params: the values of the placeholders
         @return: the query result as a list of dicts
         """
-        cursor = self.cursor
-        res_list = []
-        res = cursor.execute(sql).fetchall()
-        header = [x[0] for x in cursor.description]
-        for r in res:
-            res_list.append(dict(zip(header, r)))
-        return res_list
+        header, rows = self.catalog.query(sql, params)
+        return [dict(zip(header, r)) for r in rows]
 
-    def get_sqlite_dataframe(self, sql) -> pd.DataFrame:
+    def get_sqlite_dataframe(self, sql, params=()) -> pd.DataFrame:
         """
         Get sql query result as a pandas dataframe
-        @param cursor: a cursor of a db connection
-        @param sql: query sql
+        @param sql: query sql, the values should be passed as `?` placeholders
+        @param params: the values of the placeholders
         @return: the query result as a pandas dataframe
         """
-        dict_list = self.get_sqlite_dict_list(sql)
+        dict_list = self.get_sqlite_dict_list(sql, params)
         dataframe = pd.DataFrame.from_dict(data=dict_list)
         return dataframe
 
@@ -179,14 +289,13 @@ class DBClient:
                  return None if there is no record in database for the given dataset name
         """
         try:
-            res = self.cursor.execute("select dataset_path from dataset where dataset_name=?",
-                                      [dataset_name]).fetchone()
+            res = self._fetchone("select dataset_path from dataset where dataset_name=?", [dataset_name])
         except Exception as e:
             error_info = "Sqlite select dataset operation error: \n" + str(e)
             logger.error(error_info)
             raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
         if res:
-            return res[0]
+            return res['dataset_path']
         else:
             return None
 
@@ -200,8 +309,8 @@ class DBClient:
         """
         dataset_path = self.get_local_dataset_path(dataset_name)
         try:
-            split_data = self.cursor.execute("select * from split where dataset_name=? and split_name=?",
-                                             [dataset_name, split_name]).fetchone()
+            split_data = self._fetchone("select * from split where dataset_name=? and split_name=?",
+                                        [dataset_name, split_name])
         except Exception as e:
             error_info = "Sqlite select split operation error: \n" + str(e)
             logger.error(error_info)
@@ -222,16 +331,12 @@ class DBClient:
 
         """
         try:
-            res = self.cursor.execute("select * from dataset where dataset_name=?", [dataset_name]).fetchone()
+            res = self._fetchone("select * from dataset where dataset_name=?", [dataset_name])
         except Exception as e:
             error_info = "Sqlite select dataset operation error: \n" + str(e)
             logger.error(error_info)
             raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
-        if res:
-            header = [x[0] for x in self.cursor.description]
-            return dict(zip(header, res))
-        else:
-            return None
+        return res
 
     def is_dataset_local_exist(self, dataset_name: str) -> bool:
         """
@@ -253,8 +358,8 @@ class DBClient:
         @return: if exists, return True, otherwise return False
         """
         try:
-            res = self.cursor.execute("select * from split where dataset_name=? and split_name=?",
-                                      [dataset_name, split_name]).fetchone()
+            res = self._fetchone("select * from split where dataset_name=? and split_name=?",
+                                 [dataset_name, split_name])
         except Exception as e:
             error_info = "Sqlite select split operation error: \n" + str(e)
             logger.error(error_info)
@@ -278,15 +383,9 @@ class DBClient:
         @param media_size: the number of total media file size
         @return:
         """
-        try:
-            self.cursor.execute(
-                "insert or replace into dataset values (?,?,?,?,?,?,?,?,datetime('now','localtime'),datetime('now','localtime'))",
-                [dataset_name, task_type, storage_name, dataset_path, label, media, media_num, media_size])
-            self.conn.commit()
-        except Exception as e:
-            error_info = "Sqlite register dataset operation error: \n" + str(e)
-            logger.error(error_info)
-            raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
+        self._write("register dataset", [(
+            "insert or replace into dataset values (?,?,?,?,?,?,?,?,datetime('now','localtime'),datetime('now','localtime'))",
+            [dataset_name, task_type, storage_name, dataset_path, label, media, media_num, media_size])])
 
     def register_split(self, dataset_name, split_name, split_type, label, media, media_num, media_size):
         """
@@ -297,15 +396,42 @@ class DBClient:
         @param media_size: the number of total media file size
         @return:
         """
-        try:
-            self.cursor.execute(
-                "insert or replace into split values (?,?,?,?,?,?,?,datetime('now','localtime'),datetime('now','localtime'))",
-                [dataset_name, split_name, split_type, label, media, media_num, media_size])
-            self.conn.commit()
-        except Exception as e:
-            error_info = "Sqlite register split operation error: \n" + str(e)
-            logger.error(error_info)
-            raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
+        self.register_splits([(dataset_name, split_name, split_type, label, media, media_num, media_size)])
+
+    def register_splits(self, splits):
+        """
+        Register many splits in one transaction
+        @param splits: a list of (dataset_name, split_name, split_type, label, media, media_num, media_size)
+        @return:
+        """
+        sql = "insert or replace into split values (?,?,?,?,?,?,?,datetime('now','localtime'),datetime('now','localtime'))"
+        self._write("register split", [(sql, list(split)) for split in splits])
+
+    def update_dataset_flags(self, dataset_name, label, media):
+        """
+        Update the download flags of a dataset and all its splits in one transaction
+        @param dataset_name: the dataset name
+        @param label: 1 or 0, whether the label data is downloaded
+        @param media: 1 or 0, whether the media data is downloaded
+        @return:
+        """
+        self._write("update dataset", [
+            ("update dataset set label_data=?, media_data=?, updated_time=datetime('now','localtime') where dataset_name=?",
+             [label, media, dataset_name]),
+            ("update split set label_data=?, media_data=?, updated_time=datetime('now','localtime') where dataset_name=?",
+             [label, media, dataset_name])])
+
+    def update_split_media_flag(self, dataset_name, split_name, media):
+        """
+        Update the media download flag of a split
+        @param dataset_name: the dataset name
+        @param split_name: a subset of a dataset
+        @param media: 1 or 0, whether the media data is downloaded
+        @return:
+        """
+        self._write("update split", [
+            ("update split set media_data=?, updated_time=datetime('now','localtime') where dataset_name=? and split_name=?",
+             [media, dataset_name, split_name])])
 
     def delete_split(self, dataset_name, split_name):
         """
@@ -314,15 +440,8 @@ class DBClient:
         @param split_name: a subset of a dataset
         @return:
         """
-        try:
-            self.cursor.execute(
-                "delete from split where dataset_name=? and split_name=?",
-                [dataset_name, split_name])
-            self.conn.commit()
-        except Exception as e:
-            error_info = "Sqlite delete split operation error: \n" + str(e)
-            logger.error(error_info)
-            raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
+        self._write("delete split", [("delete from split where dataset_name=? and split_name=?",
+                                      [dataset_name, split_name])])
 
     def delete_dataset(self, dataset_name):
         """
@@ -330,18 +449,8 @@ class DBClient:
         @param dataset_name: the dataset name
         @return:
         """
-        try:
-            self.cursor.execute(
-                "delete from split where dataset_name=?",
-                [dataset_name])
-            self.cursor.execute(
-                "delete from dataset where dataset_name=?",
-                [dataset_name])
-            self.conn.commit()
-        except Exception as e:
-            error_info = "Sqlite delete dataset operation error: \n" + str(e)
-            logger.error(error_info)
-            raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
+        self._write("delete dataset", [("delete from split where dataset_name=?", [dataset_name]),
+                                        ("delete from dataset where dataset_name=?", [dataset_name])])
 
     def is_dataset_label_downloaded(self, dataset_name):
         """
@@ -350,15 +459,14 @@ class DBClient:
         @return:
         """
         try:
-            res = self.cursor.execute("select label_data from dataset where dataset_name=?",
-                                      [dataset_name]).fetchone()
+            res = self._fetchone("select label_data from dataset where dataset_name=?", [dataset_name])
         except Exception as e:
             error_info = "Sqlite select dataset operation error: \n" + str(e)
             logger.error(error_info)
             raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
         flag = False
         if res:
-            if res[0] == 1:
+            if res['label_data'] == 1:
                 flag = True
 
         return flag
@@ -370,15 +478,14 @@ class DBClient:
         @return:
         """
         try:
-            res = self.cursor.execute("select media_data from dataset where dataset_name=?",
-                                      [dataset_name]).fetchone()
+            res = self._fetchone("select media_data from dataset where dataset_name=?", [dataset_name])
         except Exception as e:
             error_info = "Sqlite select dataset operation error: \n" + str(e)
             logger.error(error_info)
             raise CLIException(ExistCode.SQLITE_OPERATION_ERROR, error_info)
         flag = False
         if res:
-            if res[0] == 1:
+            if res['media_data'] == 1:
                 flag = True
 
         return flag
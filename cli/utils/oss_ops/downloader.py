@@ -0,0 +1,148 @@
+"""
+downloader module downloads many s3 objects concurrently
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from loguru import logger
+from tqdm import tqdm
+
+JOURNAL_NAME = ".dsdl_download.journal"
+PART_SUFFIX = ".part"
+
+# 这些错误码表示对象本身有问题（不存在、没有权限），重试没有意义
+_NO_RETRY_CODES = {"NoSuchKey", "NoSuchBucket", "AccessDenied", "404", "403"}
+
+
+class DownloadJournal:
+    """
+    An append-only file recording the keys which have been downloaded completely, so that an interrupted download
+    continues where it stopped instead of checking (or downloading) every file again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        self._file = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.endswith("\n")}
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def add(self, key):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(key + "\n")
+            self._file.flush()
+            self.done.add(key)
+
+    def close(self, remove=False):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if remove and os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class ParallelDownloader:
+    """
+    Download a list of s3 objects with a thread pool
+
+    - each file is downloaded to `<local_file>.part` and renamed when it is complete, so a local file always has the
+      full content of the object;
+    - failed downloads are retried `max_retries` times with exponential backoff;
+    - the completed keys are recorded in a journal in the local directory, the journal is removed when all the files
+      are downloaded;
+    - the progress bar reports the total bytes downloaded and the throughput of all the workers.
+    """
+
+    def __init__(self, s3_client, max_workers=16, max_retries=3, backoff=0.5):
+        self.s3_client = s3_client
+        self.max_workers = max(int(max_workers), 1)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # 并发发生在文件之间，单个文件不再使用多线程分片下载
+        self.transfer_config = TransferConfig(use_threads=False)
+
+    def _download_one(self, bucket, key, local_file, callback):
+        part_file = local_file + PART_SUFFIX
+        attempt = 0
+        while True:
+            received = [0]
+
+            def _callback(n):
+                received[0] += n
+                callback(n)
+
+            try:
+                os.makedirs(os.path.dirname(local_file) or ".", exist_ok=True)
+                self.s3_client.download_file(bucket, key, part_file, Callback=_callback, Config=self.transfer_config)
+                os.replace(part_file, local_file)
+                return
+            except (ClientError, BotoCoreError, OSError) as e:
+                callback(-received[0])  # 失败的部分不计入进度
+                if os.path.exists(part_file):
+                    os.remove(part_file)
+                code = str(e.response.get("Error", {}).get("Code", "")) if isinstance(e, ClientError) else ""
+                if code in _NO_RETRY_CODES or attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+                attempt += 1
+
+    def download(self, bucket, tasks, local_directory, description="Download"):
+        """
+        Download the objects concurrently
+        @param bucket: bucket name
+        @param tasks: a list of (key, local file, size), size is used for the progress only and can be None
+        @param local_directory: the directory to keep the journal
+        @param description: the description of the progress bar
+        @return: a list of (key, error) of the files failed to download
+        """
+        journal = DownloadJournal(os.path.join(local_directory, JOURNAL_NAME))
+        pending = [task for task in tasks if task[0] not in journal and not os.path.exists(task[1])]
+        total = sum(task[2] or 0 for task in pending)
+        pbar = tqdm(total=total or None, desc=description, ncols=100, unit="B", unit_scale=True, unit_divisor=1024)
+        lock = threading.Lock()
+        failed = []
+        finished = [len(tasks) - len(pending)]
+        pbar.set_postfix(files="%d/%d" % (finished[0], len(tasks)))
+
+        def _update(n):
+            with lock:
+                pbar.update(n)
+
+        def _run(task):
+            key, local_file, _ = task
+            try:
+                self._download_one(bucket, key, local_file, _update)
+            except Exception as e:
+                logger.error("failed to download %s: %s" % (key, e))
+                with lock:
+                    failed.append((key, e))
+                return
+            journal.add(key)
+            with lock:
+                finished[0] += 1
+                pbar.set_postfix(files="%d/%d" % (finished[0], len(tasks)), refresh=False)
+
+        try:
+            if self.max_workers == 1:
+                for task in pending:
+                    _run(task)
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    list(executor.map(_run, pending))
+        finally:
+            pbar.close()
+            journal.close(remove=not failed and finished[0] == len(tasks))
+        return failed
@@ -0,0 +1,94 @@
+"""
+manifest module keeps the size/etag of all the objects under a prefix
+"""
+import json
+import os
+import time
+
+
+class ObjectManifest:
+    """
+    key -> (size, etag) of all the objects under a prefix, built from one flat (paginated) listing, so that the size and
+    the existence of any object, and the directory tree under the prefix, are known without a request per object.
+    """
+
+    def __init__(self, bucket, prefix, objects=None, created=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.objects = objects if objects is not None else {}
+        self.created = created if created is not None else time.time()
+
+    @classmethod
+    def from_listing(cls, bucket, prefix, obj_list):
+        """
+        Build the manifest from the result of `list_objects`
+        """
+        objects = {obj['Key']: (int(obj.get('Size', 0)), str(obj.get('ETag', '')).strip('"')) for obj in obj_list}
+        return cls(bucket, prefix, objects)
+
+    def __contains__(self, key):
+        return key in self.objects
+
+    def __len__(self):
+        return len(self.objects)
+
+    def covers(self, key):
+        return key.startswith(self.prefix)
+
+    def size(self, key):
+        return self.objects[key][0]
+
+    def etag(self, key):
+        return self.objects[key][1]
+
+    def keys(self):
+        return self.objects.keys()
+
+    def dirs(self, prefix=None):
+        """
+        The directories (relative to `prefix`, default to the prefix of the manifest) containing objects, parents first
+        """
+        prefix = self.prefix if prefix is None else prefix
+        dirs = set()
+        for key in self.objects:
+            if not key.startswith(prefix):
+                continue
+            parts = key[len(prefix):].split('/')[:-1]
+            for i in range(1, len(parts) + 1):
+                dirs.add('/'.join(parts[:i]))
+        return sorted(dirs)
+
+    @staticmethod
+    def cache_path(cache_dir, bucket, prefix):
+        name = prefix.strip('/').replace('/', '__') or '__root__'
+        return os.path.join(cache_dir, bucket, name + '.manifest.json')
+
+    def save(self, cache_dir):
+        """
+        Save the manifest to the cache directory, the file is written to a temporary file and renamed
+        """
+        path = self.cache_path(cache_dir, self.bucket, self.prefix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "%s.tmp%d" % (path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump({'bucket': self.bucket, 'prefix': self.prefix, 'created': self.created,
+                       'objects': self.objects}, f)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, cache_dir, bucket, prefix, max_age=None):
+        """
+        Load the manifest from the cache directory
+        @return: None if there is no cached manifest or it's older than `max_age` seconds
+        """
+        path = cls.cache_path(cache_dir, bucket, prefix)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if max_age is not None and time.time() - data.get('created', 0) > max_age:
+            return None
+        objects = {k: tuple(v) for k, v in data['objects'].items()}
+        return cls(data['bucket'], data['prefix'], objects, data['created'])
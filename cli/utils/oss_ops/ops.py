@@ -8,11 +8,14 @@ import time
 
 import human_readable
 from boto3.session import Session
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from commons.exceptions import CLIException, ExistCode
 from commons.stdio import print_stdout
 from loguru import logger
-from tqdm import tqdm
+
+from .downloader import ParallelDownloader, PART_SUFFIX
+from .manifest import ObjectManifest
 
 
 def print_progress(iteration,
@@ -58,17 +61,23 @@ class OssClient:
     """
 
     def __init__(self, aws_access_key_id, aws_secret_access_key, endpoint_url,
-                 region_name):
+                 region_name, max_workers=16, manifest_cache_dir=None, manifest_max_age=24 * 3600):
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
         self.endpoint_url = endpoint_url
         self.region_name = region_name
+        self.max_workers = max_workers  # 并发下载的线程数
+        self.manifest_cache_dir = manifest_cache_dir  # 对象清单的磁盘缓存目录，为None时只缓存在内存中
+        self.manifest_max_age = manifest_max_age  # 磁盘缓存的对象清单的有效期（秒）
+        self._manifests = {}
+        self._listed = set()  # 本进程中列举过的(bucket, prefix)，这些清单不会比本次运行更旧
 
         self.session = Session(aws_access_key_id, aws_secret_access_key)
         self.s3_client = self.session.client("s3",
                                              endpoint_url=endpoint_url,
                                              region_name=region_name,
-                                             use_ssl=False)
+                                             use_ssl=False,
+                                             config=Config(max_pool_connections=max(10, max_workers)))
 
     def list_buckets(self):
         """
@@ -99,6 +108,50 @@ class OssClient:
                     obj_list.append(obj)
         return obj_list
 
+    def get_manifest(self, bucket, prefix, refresh=False):
+        """
+        Get the manifest (key -> size/etag) of all the objects under a prefix, the manifest is built from one flat
+        listing (1000 keys per request) and cached in memory and (when `manifest_cache_dir` is set) on disk. A manifest
+        loaded from the disk cache may be up to `manifest_max_age` old, use `_fresh_manifest` when the sizes must be
+        current
+        @param bucket: bucket name
+        @param prefix: the prefix, such as a dataset name followed by '/'
+        @param refresh: list the objects again even if the manifest is cached
+        @return: an `ObjectManifest`
+        """
+        manifest = None if refresh else self._cached_manifest(bucket, prefix)
+        if manifest is None:
+            manifest = ObjectManifest.from_listing(bucket, prefix, self.list_objects(bucket, prefix))
+            self._set_manifest(manifest)
+            self._listed.add((bucket, prefix))
+        return manifest
+
+    def _fresh_manifest(self, bucket, prefix):
+        """
+        Get a manifest listed in this process, the manifests loaded from the disk cache are listed again
+        """
+        return self.get_manifest(bucket, prefix, refresh=(bucket, prefix) not in self._listed)
+
+    def _cached_manifest(self, bucket, prefix):
+        manifest = self._manifests.get((bucket, prefix))
+        if manifest is None and self.manifest_cache_dir is not None:
+            manifest = ObjectManifest.load(self.manifest_cache_dir, bucket, prefix, self.manifest_max_age)
+            if manifest is not None:
+                self._manifests[(bucket, prefix)] = manifest
+        return manifest
+
+    def _set_manifest(self, manifest):
+        self._manifests[(manifest.bucket, manifest.prefix)] = manifest
+        if self.manifest_cache_dir is not None:
+            try:
+                manifest.save(self.manifest_cache_dir)
+            except OSError as e:
+                logger.warning("failed to cache the manifest of %s: %s" % (manifest.prefix, e))
+
+    @staticmethod
+    def _dataset_prefix(key):
+        return key.split('/', 1)[0] + '/'
+
     def get_dir_list(self, bucket, remote_directory):
         """
         List directories in a remote directory
@@ -119,40 +172,20 @@ class OssClient:
 
         return sorted(child_dir_list)
 
-    def __get_recursive_dir(self, dirs, bucket, remote_directory):
-        """
-        A recursive func to get all directories in a remote directory
-        @param dirs:
-        @param bucket:
-        @param remote_directory:
-        @return:
-        """
-        dirs.append(remote_directory)
-        # child_list = set()
-        # paginator = self.s3_client.get_paginator('list_objects_v2')
-        # pages = paginator.paginate(Bucket=bucket, Prefix=remote_directory, Delimiter='/')
-        #
-        # for page in pages:
-        #     if 'CommonPrefixes' in page.keys():
-        #         for p in page['CommonPrefixes']:
-        #             child_list.add(p['Prefix'])
-
-        child_dir_list = self.get_dir_list(bucket, remote_directory)
-        if len(child_dir_list) != 0:
-            for child_dir in child_dir_list:
-                self.__get_recursive_dir(dirs, bucket, child_dir)
-
     def get_recursive_dir_list(self, bucket, remote_directory):
         """
-        Call a recursive func to get all directories in a remote directory
+        Get all directories in a remote directory (relative to the remote directory), the first one is '' (the remote
+        directory itself). The directories are taken from the manifest of the remote directory.
         @param bucket:
         @param remote_directory:
         @return:
         """
-        dir_list = []
-        self.__get_recursive_dir(dir_list, bucket, remote_directory)
-        dir_list = [dir[len(remote_directory):] for dir in dir_list]
-        return dir_list
+        manifest = self.get_manifest(bucket, remote_directory)
+        return [''] + [d + '/' for d in manifest.dirs(remote_directory)]
+
+    def _make_local_dirs(self, manifest, remote_directory, local_directory):
+        for d in manifest.dirs(remote_directory):
+            os.makedirs(os.path.join(local_directory, d), exist_ok=True)
 
     def download_file(self, bucket, remote_file, local_file):
         """
@@ -164,12 +197,27 @@ class OssClient:
         """
         try:
             if not os.path.exists(local_file):
-                self.s3_client.download_file(bucket, remote_file, local_file)
+                # 先下载到临时文件再重命名，中断时不会留下不完整的文件
+                self.s3_client.download_file(bucket, remote_file, local_file + PART_SUFFIX)
+                os.replace(local_file + PART_SUFFIX, local_file)
         except ClientError as e:
             logging.error(e)
             return False
         return True
 
+    def _download_tasks(self, bucket, tasks, local_directory):
+        """
+        Download a list of (key, local file, size) concurrently, see `ParallelDownloader`
+        @return: True if all the files are downloaded
+        """
+        downloader = ParallelDownloader(self.s3_client, max_workers=self.max_workers)
+        failed = downloader.download(bucket, tasks, local_directory)
+        if failed:
+            print_stdout("%d files failed to download, run the command again to resume the download" % len(failed))
+            return False
+        print_stdout('Download Complete')
+        return True
+
     def download_directory(self, bucket, remote_directory, local_directory):
         """
         download a directory from s3
@@ -179,41 +227,17 @@ class OssClient:
         :return:
         """
         print_stdout("preparing...")
-        dirs_list = self.get_recursive_dir_list(
-            bucket=bucket, remote_directory=remote_directory)
-        for d in dirs_list:
-            path = os.path.join(local_directory, d)
-            if not os.path.exists(path):
-                os.mkdir(path)
+        # 下载整个目录时总是重新列举，顺便刷新缓存的清单
+        manifest = self.get_manifest(bucket, remote_directory, refresh=True)
+        self._make_local_dirs(manifest, remote_directory, local_directory)
 
         print_stdout("start download...")
 
-        # print(bucket)
-        # print(remote_directory)
-        file_list = self.list_objects(bucket, remote_directory)
-        # process = 0
-        file_number = len(file_list)
-        # start_time = time.perf_counter()
-
-        pbar = tqdm(total=file_number, ncols=100)
-        pbar.set_description("Download")
-        for file in file_list:
-            file_name = file['Key']
-            local_file = os.path.join(local_directory,
-                                      file_name[len(remote_directory):])
-            if not os.path.exists(local_file):
-                self.download_file(bucket, file_name, local_file)
-            pbar.update(1)
-            # process += 1
-            # print_progress(process,
-            #                file_number,
-            #                start_time,
-            #                prefix='Download',
-            #                suffix='Complete',
-            #                bar_length=50)
-
-        pbar.close()
-        print_stdout('Download Complete')
+        tasks = [(key,
+                  os.path.join(local_directory, key[len(remote_directory):]),
+                  manifest.size(key)) for key in manifest.keys()
+                 if key.startswith(remote_directory) and not key.endswith('/')]
+        return self._download_tasks(bucket, tasks, local_directory)
 
     def download_list(self, bucket, media_list, remote_directory,
                       local_directory):
@@ -226,53 +250,39 @@ class OssClient:
         @return:
         """
         print_stdout("preparing...")
-        dirs_list = self.get_recursive_dir_list(
-            bucket=bucket, remote_directory=remote_directory)
-        # print(dirs_list)
-        for d in dirs_list:
-            path = os.path.join(local_directory, d)
-            if not os.path.exists(path):
-                os.mkdir(path)
+        manifest = self.get_manifest(bucket, remote_directory)
+        self._make_local_dirs(manifest, remote_directory, local_directory)
 
         print_stdout("start download...")
 
-        # process = 0
-        file_number = len(media_list)
-        # start_time = time.perf_counter()
-
-        # print_progress(process,
-        #                file_number,
-        #                start_time,
-        #                prefix='Downloading',
-        #                suffix='Complete',
-        #                bar_length=50)
-
-        pbar = tqdm(total=file_number, ncols=100)
-        pbar.set_description("Download")
+        tasks = []
         for media in media_list:
-            file_key = remote_directory + media
-            local_file = os.path.join(local_directory, media)
-            if not os.path.exists(local_file):
-                self.download_file(bucket, file_key, local_file)
-            # process += 1
-            # print_progress(process,
-            #                file_number,
-            #                start_time,
-            #                prefix='Download',
-            #                suffix='Complete',
-            #                bar_length=50)
-            pbar.update(1)
-
-        pbar.close()
-        print_stdout('Download Complete')
+            key = remote_directory + media
+            tasks.append((key, os.path.join(local_directory, media), manifest.size(key) if key in manifest else None))
+        return self._download_tasks(bucket, tasks, local_directory)
+
+    def _head_size(self, bucket, key):
+        data = self.s3_client.head_object(Bucket=bucket, Key=key)
+        return int(data['ResponseMetadata']['HTTPHeaders']['content-length'])
 
     def get_sum_size(self, bucket, file_key_list):
+        """
+        Get the total size of the objects, the sizes are taken from the manifest of the dataset (the first part of the
+        key) instead of requesting each object. Only a manifest listed in this process is used, like `obj_is_exist`,
+        since the objects may have been overwritten after a manifest in the disk cache was listed
+        @param bucket:
+        @param file_key_list:
+        @return:
+        """
         sum = 0
+        manifests = {}
         for key in file_key_list:
-            data = self.s3_client.head_object(Bucket=bucket, Key=key)
-            size = int(
-                data['ResponseMetadata']['HTTPHeaders']['content-length'])
-            sum += size
+            prefix = self._dataset_prefix(key)
+            manifest = manifests.get(prefix)
+            if manifest is None:
+                manifest = manifests[prefix] = self._fresh_manifest(bucket, prefix)
+            # 清单之后新增的对象单独请求
+            sum += manifest.size(key) if key in manifest else self._head_size(bucket, key)
         return sum
 
     def read_file(self, bucket, remote_file):
@@ -398,11 +408,15 @@ class OssClient:
 
     def obj_is_exist(self, bukcet, obj_name):
         '''
-        check if a s3 object already  exists
+        check if a s3 object already  exists, only the manifests listed in this process are trusted (the ones loaded
+        from the disk cache may be up to `manifest_max_age` old), otherwise the object is checked with a HEAD request
         :param bukcet: bucket name
         :param obj_name: object name
         :return: True if exists, else False
         '''
+        key = (bukcet, self._dataset_prefix(obj_name))
+        if key in self._listed and obj_name in self._manifests[key]:
+            return True
         try:
             self.s3_client.head_object(Bucket=bukcet, Key=obj_name)
         except ClientError:
@@ -29,9 +29,43 @@ def get_dataset_info(dataset_name):
     return dataset_dict
 
 
+def _quote(value):
+    """
+    quote a value as a sql string literal, used where duckdb does not accept parameters (view definitions, settings)
+    """
+    return "'%s'" % str(value).replace("'", "''")
+
+
+def _quote_identifier(name):
+    """
+    quote a column name (`a.b` for a field of a struct column) as sql identifiers, `*` is kept as is
+    """
+    name = name.strip()
+    if name == '*':
+        return name
+    return '.'.join('"%s"' % part.replace('"', '""') for part in name.split('.'))
+
+
+def _select_list(select_cols):
+    """
+    the select list from a column name, a comma separated string of column names or a list of column names
+    """
+    if isinstance(select_cols, str):
+        select_cols = select_cols.split(',')
+    return ', '.join(_quote_identifier(col) for col in select_cols)
+
+
 class ParquetReader:
     """
     A Class to read parquet file
+
+    The reader keeps a long-lived duckdb session: the connection (and the httpfs/s3 settings in s3 mode) is configured
+    and the `dataset` view is registered only once, at the first query. The selected columns are quoted as
+    identifiers, the values of limit/offset and of the placeholders (`?`) in the filter are passed as parameters of a
+    prepared statement, and the result can be streamed as arrow record batches with `select_batches`.
+
+    The filter is a raw sql boolean expression (e.g. the `--filter` of the select command) and is inserted into the
+    query as is, pass the values as `?` placeholders and `params` when they don't come from the user directly.
     """
 
     def __init__(self, parquet_path, endpoint=None, access_key_id=None, secret_access_key=None, url_stype='path',
@@ -40,7 +74,7 @@ class ParquetReader:
         Construct the parquet reader based on the parquet file path
         @param parquet_path:
         """
-        self.cursor = duckdb.connect(database=':memory:')
+        self._cursor = None
         if not parquet_path.lower().startswith("s3"):
             self.path_flag = "local"
             self.parquet_path = parquet_path
@@ -70,61 +104,102 @@ class ParquetReader:
                 endpoint_override=endpoint_url,
             )
 
-    def __create_dataset_view(self):
-        if self.path_flag == "local":
-            view_sql = """create or replace view dataset as 
-            select * 
-            from parquet_scan('%s');
-            """ % self.parquet_path
-        elif self.path_flag == "s3":
-            self.cursor.execute("INSTALL httpfs;")
-            self.cursor.execute("LOAD httpfs;")
-            self.cursor.execute("set s3_endpoint='%s'" % self.endpoint)
-            self.cursor.execute("set s3_access_key_id='%s'" % self.access_key_id)
-            self.cursor.execute("set s3_secret_access_key='%s'" % self.secret_access_key)
-            self.cursor.execute("set s3_url_style = '%s'" % self.url_stype)
-            self.cursor.execute("set s3_use_ssl=%s" % self.use_ssl)
-            view_sql = """create or replace view dataset as 
-            select * 
-            from read_parquet('%s');
-            """ % self.parquet_path
-
-        self.cursor.execute(view_sql)
-
-    def select(self, select_cols='*', filter_cond='', limit=None, offset=None, samples=None):
+    @property
+    def cursor(self):
         """
-        Select data from parquet file
-        @param select_cols: columns you want to select
-        @param filter_cond: specify filters to apply to the data
-        @param limit: restrict the amount of rows fetched
-        @param offset: indicate at which position to start reading the values
-        @param samples: query on a sample from the base table
-        @return: a dataframe of data selected from the parquet
+        The duckdb connection of the session, it's created and configured at the first access
         """
-        self.__create_dataset_view()
-
-        query_sql = "select {cols} from dataset".format(cols=select_cols)
-
-        # add where condition
+        if self._cursor is None:
+            cursor = duckdb.connect(database=':memory:')
+            try:
+                self.__configure_session(cursor)
+            except Exception:
+                cursor.close()
+                raise
+            self._cursor = cursor
+        return self._cursor
+
+    def __configure_session(self, cursor):
+        if self.path_flag == "local":
+            view_sql = "create view dataset as select * from parquet_scan(%s);" % _quote(self.parquet_path)
+        else:
+            cursor.execute("INSTALL httpfs;")
+            cursor.execute("LOAD httpfs;")
+            cursor.execute("set s3_endpoint=%s" % _quote(self.endpoint))
+            cursor.execute("set s3_access_key_id=%s" % _quote(self.access_key_id))
+            cursor.execute("set s3_secret_access_key=%s" % _quote(self.secret_access_key))
+            cursor.execute("set s3_url_style=%s" % _quote(self.url_stype))
+            cursor.execute("set s3_use_ssl=%s" % self.use_ssl)
+            view_sql = "create view dataset as select * from read_parquet(%s);" % _quote(self.parquet_path)
+        cursor.execute(view_sql)
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _build_select(select_cols='*', filter_cond='', limit=None, offset=None, samples=None, params=None):
+        query_sql = "select {cols} from dataset".format(cols=_select_list(select_cols))
+        params = list(params or [])
+
+        # add where condition, the filter is raw sql, the placeholders in the condition are bound to `params`
         if filter_cond:
             query_sql = query_sql + ' where ' + filter_cond
 
         # add limit
         if limit:
-            query_sql = query_sql + ' limit ' + str(limit)
+            query_sql = query_sql + ' limit ?'
+            params.append(int(limit))
 
         # add offset
         if offset:
-            query_sql = query_sql + ' offset ' + str(offset)
+            query_sql = query_sql + ' offset ?'
+            params.append(int(offset))
 
-        # add random samples
+        # add random samples, duckdb only supports constants in the sample clause
         if samples:
             # to do: implement %
-            query_sql = 'select * from (' + query_sql + ') using sample %d rows' % samples
+            query_sql = 'select * from (' + query_sql + ') using sample %d rows' % int(samples)
+
+        return query_sql, params
+
+    def _execute(self, sql, params=None):
+        if params:
+            return self.cursor.execute(sql, params)
+        return self.cursor.execute(sql)
+
+    def select(self, select_cols='*', filter_cond='', limit=None, offset=None, samples=None, params=None):
+        """
+        Select data from parquet file
+        @param select_cols: columns you want to select, a name, a comma separated string or a list of names
+        @param filter_cond: a raw sql expression to filter the data, it can contain `?` placeholders
+        @param limit: restrict the amount of rows fetched
+        @param offset: indicate at which position to start reading the values
+        @param samples: query on a sample from the base table
+        @param params: values of the placeholders in `filter_cond`
+        @return: a dataframe of data selected from the parquet
+        """
+        query_sql, params = self._build_select(select_cols, filter_cond, limit, offset, samples, params)
+        return self._execute(query_sql, params).fetch_df()
 
-        # print(query_sql)
-        df = self.cursor.execute(query_sql).fetch_df()
-        return df
+    def select_batches(self, select_cols='*', filter_cond='', limit=None, offset=None, samples=None, params=None,
+                       batch_size=1024):
+        """
+        The same as `select`, but stream the result instead of materializing it
+        @return: a `pyarrow.RecordBatchReader` yielding record batches of at most `batch_size` rows
+        """
+        query_sql, params = self._build_select(select_cols, filter_cond, limit, offset, samples, params)
+        result = self._execute(query_sql, params)
+        if hasattr(result, "to_arrow_reader"):
+            return result.to_arrow_reader(batch_size)
+        return result.fetch_record_batch(batch_size)
 
     def get_metadata(self):
         """
@@ -158,9 +233,8 @@ class ParquetReader:
 
         return schema
 
-    def query(self, sql):
-        self.__create_dataset_view()
-        return self.cursor.execute(sql).fetch_df()
+    def query(self, sql, params=None):
+        return self._execute(sql, params).fetch_df()
 
 
 class SplitReader(ParquetReader):
@@ -2,9 +2,11 @@ from .base_dataset import Dataset
 from .utils.commons import Util
 from .demo_dataset import DemoDataset
 from .utils.visualizer import ImageVisualizePipeline
-from .utils import Report
+from .utils import Report, DSDLCollate
 from .check_dataset import CheckDataset
 from .wrapper_dataset import DSDLDataset
+from .iterable_dataset import DSDLIterableDataset
+from .compiled_dataset import DSDLCompiledDataset
 
 __all__ = [
     "Dataset",
@@ -13,5 +15,8 @@ __all__ = [
     "ImageVisualizePipeline",
     "Util",
     "Report",
+    "DSDLCollate",
     "DSDLDataset",
+    "DSDLIterableDataset",
+    "DSDLCompiledDataset",
 ]
@@ -12,11 +12,14 @@ except ImportError:
 
         def __getitem__(self, item):
             pass
+import gc
 from ..types import Struct, StructMetaclass
 from ..geometry import STRUCT
 from dsdl.dataset.utils import Util
+from dsdl.dataset.utils.prefetch import prefetch_map, prefetch_media, PrefetchedFileReader
 import dsdl.objectio as objectio
-from typing import List, Dict, Any, Callable, Optional, Union
+from .. import instrumentation
+from typing import List, Dict, Any, Callable, Optional, Union, Iterable, Iterator
 
 try:
     from yaml import CSafeLoader as YAMLSafeLoader
@@ -95,9 +98,18 @@ class Dataset(Dataset_):
         该函数的作用是将yaml文件中的样本转换为Struct对象，并存储到sample_list列表中
         """
         sample_list = []
-        for i, sample in enumerate(self._samples):
-            struct_sample = self.sample_type(lazy_init=self.lazy_init, file_reader=self.file_reader, **sample)
-            sample_list.append(self.process_sample(i, struct_sample))
+        # 实例化大量样本时会频繁触发循环垃圾回收（且每次都要遍历已经创建的所有样本），加载期间暂停gc
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with instrumentation.timer("dataset.load_sample"):
+                for i, sample in enumerate(self._samples):
+                    struct_sample = self.sample_type(lazy_init=self.lazy_init, file_reader=self.file_reader, **sample)
+                    sample_list.append(self.process_sample(i, struct_sample))
+        finally:
+            if gc_enabled:
+                gc.enable()
+        instrumentation.count("dataset.samples", len(sample_list))
         return sample_list
 
     def process_sample(self, i, sample):
@@ -109,10 +121,46 @@ class Dataset(Dataset_):
     def __getitem__(self, idx):
         data = self.sample_list[idx]
         # data = self.process_sample(sample)
+        if self.pipeline is not None:
+            with instrumentation.timer("dataset.pipeline"):
+                data = self.pipeline(data)
+        return data
+
+    def iter(self, prefetch: int = 64, workers: int = 8, indices: Optional[Iterable[int]] = None) -> Iterator[Any]:
+        """
+        按顺序返回样本，同时在后台线程池中提前读取之后`prefetch`个样本的媒体文件（图像、分割图等），
+        使得文件读取与调用方的计算重叠。中途退出循环时会取消尚未开始的读取。
+
+        返回的样本是新创建的Struct对象（不是`sample_list`中的对象），预读的内容保存在该样本自己的file reader中，
+        第一次读取后即交给调用方，样本被释放后内存也随之释放。
+        """
+        if indices is None:
+            indices = range(len(self))
+        return prefetch_map(self._prefetch_item, indices, prefetch=prefetch, workers=workers)
+
+    def _prefetch_item(self, idx):
+        reader = PrefetchedFileReader(self.file_reader)
+        struct_sample = self.sample_type(lazy_init=self.lazy_init, file_reader=reader, **self._samples[idx])
+        data = prefetch_media(self.process_sample(idx, struct_sample), reader)
         if self.pipeline is not None:
             data = self.pipeline(data)
         return data
 
+    def to_arrow(self, batch_size: int = 1024):
+        """
+        将样本（yaml中的原始内容）转换为一个`pyarrow.Table`，每个field为一列，列的类型由`sample_type`的定义决定，
+        详见`dsdl.dataset.utils.arrow.ArrowConverter`。
+        """
+        from .utils.arrow import to_arrow
+        return to_arrow(self._samples, self.sample_type, batch_size=batch_size)
+
+    def to_parquet(self, path: str, row_group_size: int = 1024, **kwargs) -> str:
+        """
+        以流式的方式（每次转换并写入一个row group）将样本导出为parquet文件，之后可以直接用DuckDB等工具查询。
+        """
+        from .utils.arrow import to_parquet
+        return to_parquet(self._samples, self.sample_type, path, row_group_size=row_group_size, **kwargs)
+
     def get_sample_list(self):
         return self.sample_list
 
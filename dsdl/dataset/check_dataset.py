@@ -1,25 +1,96 @@
+from concurrent.futures import ProcessPoolExecutor
+from array import array
 from .base_dataset import Dataset
 from .utils import check_struct, Report
+from ..geometry import STRUCT
+from ..parser import compile_dsdl_py
+
+_NORMAL_REPORT = {"error_flag": False, "warning_flag": False, "normal_flag": True}
+
+# 验证进程中的全局状态，由`_init_check_worker`初始化
+_WORKER_STATE = {}
+
+
+def _init_check_worker(dsdl_py, sample_type_name, location_config):
+    if dsdl_py is not None:
+        exec(compile_dsdl_py(dsdl_py), {})
+    _WORKER_STATE["sample_type"] = STRUCT.get(sample_type_name)
+    _WORKER_STATE["file_reader"] = Dataset._load_file_reader(location_config)
+
+
+def _check_chunk(samples):
+    """
+    验证一批样本，只返回验证结果（正常样本返回None以减少进程间通信），不返回实例化的Struct对象。
+    """
+    sample_type, file_reader = _WORKER_STATE["sample_type"], _WORKER_STATE["file_reader"]
+    reports = []
+    for sample in samples:
+        _, report_info = check_struct(sample_type, sample, file_reader)
+        reports.append(None if report_info["normal_flag"] else report_info)
+    return reports
 
 
 class CheckDataset(Dataset):
 
-    def __init__(self, report: Report, *args, **kwargs):
+    def __init__(self, report: Report, *args, num_workers=0, dsdl_py=None, **kwargs):
+        """
+        num_workers大于1时，使用进程池并行验证样本；此时dsdl_py为样本定义的python代码，用于在验证进程中注册Struct类
+        （以fork方式启动进程时可以不传）。并行模式下验证进程不返回Struct对象，`__getitem__`时再实例化对应的样本并调用`process_sample`。
+        """
         self.report = report
+        self.num_workers = num_workers
+        self._dsdl_py = dsdl_py
+        self._valid_indices = None
         super().__init__(*args, **kwargs)
 
     def _load_sample(self):
         """
         该函数的作用是将yaml文件中的样本转换为Struct对象，并存储到sample_list列表中
         """
+        if self.num_workers is not None and self.num_workers > 1:
+            self._check_parallel()
+            return None
         sample_list = []
-        for sample in self._samples:
+        for i, sample in enumerate(self._samples):
             struct_instance, report_info = check_struct(self.sample_type, sample, self.file_reader)
             self.report.add_sample_info(report_info)
             if struct_instance is not None:
-                sample_list.append(struct_instance)
+                sample_list.append(self.process_sample(i, struct_instance))
         return sample_list
 
+    def _check_parallel(self):
+        samples = self._samples
+        chunk_size = max(1, min(1024, len(samples) // (self.num_workers * 8)))
+        chunks = (samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size))
+        valid_indices = array("q")
+        idx = 0
+        with ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_check_worker,
+                                 initargs=(self._dsdl_py, self.sample_type.__name__, self.location_config)) as executor:
+            for reports in executor.map(_check_chunk, chunks):
+                for report_info in reports:
+                    report_info = report_info or _NORMAL_REPORT
+                    self.report.add_sample_info(report_info, idx)
+                    if not report_info["error_flag"]:
+                        valid_indices.append(idx)
+                    idx += 1
+        self._valid_indices = valid_indices
+
+    def __len__(self):
+        if self._valid_indices is not None:
+            return len(self._valid_indices)
+        return super().__len__()
+
+    def __getitem__(self, idx):
+        if self._valid_indices is None:
+            return super().__getitem__(idx)
+        # 与串行模式相同，process_sample的参数为样本在原始样本列表中的序号
+        sample_idx = self._valid_indices[idx]
+        data = self.sample_type(lazy_init=self.lazy_init, file_reader=self.file_reader, **self._samples[sample_idx])
+        data = self.process_sample(sample_idx, data)
+        if self.pipeline is not None:
+            data = self.pipeline(data)
+        return data
+
     def _load_global_info(self):
         if self.global_info_type is not None and self._global_info is not None:
             global_info, report_info = check_struct(self.global_info_type, self._global_info, self.file_reader)
@@ -0,0 +1,56 @@
+from .wrapper_dataset import DSDLDataset
+from .utils.compiled import CompiledSamples, compile_dsdl, default_compiled_path, is_compiled_up_to_date
+from ..parser import dsdl_parse
+
+
+class DSDLCompiledDataset(DSDLDataset):
+    """
+    基于编译后样本文件（见`dsdl compile`）的DSDLDataset：样本文件以mmap方式打开，构造数据集的耗时与样本数量无关，
+    `__getitem__`只解码并实例化被请求的那一个样本。
+
+    如果编译后的文件不存在，或者dsdl yaml文件、sample-path及global-info-path指向的文件有变化（大小或mtime），会先自动编译。
+    """
+
+    def __init__(self, dsdl_yaml, location_config, import_dir='', lazy_init=True, compiled_path=None, pipeline=None):
+        self._compiled_path = compiled_path or default_compiled_path(dsdl_yaml)
+        super().__init__(dsdl_yaml, location_config, import_dir, lazy_init)
+        self.pipeline = pipeline
+
+    def extract_info_from_yml(self):
+        dsdl_yaml = self._dsdl_yaml
+        compiled_path = self._compiled_path
+        if not is_compiled_up_to_date(dsdl_yaml, compiled_path):
+            compile_dsdl(dsdl_yaml, compiled_path)
+        samples = CompiledSamples(compiled_path)
+        info = samples.info
+        dsdl_py = dsdl_parse(dsdl_yaml, dsdl_library_path=self._import_dir)
+        res = {
+            "sample_type": info["sample_type"],
+            "global_info_type": info["global_info_type"],
+            "samples": samples,
+            "global_info": info["global_info"],
+            "dsdl_py": dsdl_py,
+            "version": info["version"],
+            "meta": info["meta"]
+        }
+        return res
+
+    def _load_sample(self):
+        return None
+
+    def _build_sample(self, idx):
+        sample = self._samples[idx]
+        struct_sample = self.sample_type(lazy_init=self.lazy_init, file_reader=self.file_reader, **sample)
+        return self.process_sample(idx, struct_sample)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def __getitem__(self, idx):
+        data = self._build_sample(idx)
+        if self.pipeline is not None:
+            data = self.pipeline(data)
+        return data
+
+    def get_sample_list(self):
+        return (self._build_sample(i) for i in range(len(self)))
@@ -0,0 +1,74 @@
+try:
+    from torch.utils.data import IterableDataset as IterableDataset_
+    from torch.utils.data import get_worker_info
+except ImportError:
+    class IterableDataset_:
+        def __iter__(self):
+            pass
+
+
+    def get_worker_info():
+        return None
+from itertools import islice
+from .wrapper_dataset import DSDLDataset
+from .utils.loader import SampleStream, resolve_sample_paths
+from .utils.prefetch import prefetch_map, prefetch_media, PrefetchedFileReader
+
+
+class DSDLIterableDataset(DSDLDataset, IterableDataset_):
+    """
+    DSDLDataset的流式版本：样本文件在迭代时被增量解析，Struct对象只在被消费时才创建，
+    因此内存占用与数据集大小无关，且第一个样本几乎可以立即返回。
+
+    当在torch的DataLoader中使用多个worker时，样本会按照worker的编号交错分配给各个worker。
+    样本文件总是按顺序流式解析，`num_workers`与DSDLDataset相同，用于一次性载入的文件（如global-info-path）。
+    """
+
+    def __init__(self, dsdl_yaml, location_config, import_dir='', lazy_init=True, pipeline=None, num_workers=0):
+        super().__init__(dsdl_yaml, location_config, import_dir, lazy_init, num_workers)
+        self.pipeline = pipeline
+
+    def _read_samples(self, dsdl_path, sample_path):
+        return SampleStream(resolve_sample_paths(dsdl_path, sample_path))
+
+    def _load_sample(self):
+        return None
+
+    def _iter_raw_samples(self):
+        samples = iter(self._samples)
+        worker_info = get_worker_info()
+        if worker_info is not None and worker_info.num_workers > 1:
+            samples = islice(samples, worker_info.id, None, worker_info.num_workers)
+        return samples
+
+    def _build_sample(self, i, sample, prefetch=False):
+        file_reader = PrefetchedFileReader(self.file_reader) if prefetch else self.file_reader
+        data = self.sample_type(lazy_init=self.lazy_init, file_reader=file_reader, **sample)
+        data = self.process_sample(i, data)
+        if prefetch:
+            data = prefetch_media(data, file_reader)
+        if self.pipeline is not None:
+            data = self.pipeline(data)
+        return data
+
+    def __iter__(self):
+        for i, sample in enumerate(self._iter_raw_samples()):
+            yield self._build_sample(i, sample)
+
+    def iter(self, prefetch=64, workers=8, indices=None):
+        """
+        样本文件仍在当前线程中增量解析，Struct对象的创建和媒体文件的读取在后台线程池中提前进行；不支持`indices`。
+        """
+        if indices is not None:
+            raise TypeError(f"{self.__class__.__name__} is a streaming dataset and does not support indexing.")
+        return prefetch_map(lambda item: self._build_sample(*item, prefetch=True),
+                            enumerate(self._iter_raw_samples()), prefetch=prefetch, workers=workers)
+
+    def __len__(self):
+        raise TypeError(f"{self.__class__.__name__} is a streaming dataset and has no len().")
+
+    def __getitem__(self, idx):
+        raise TypeError(f"{self.__class__.__name__} is a streaming dataset and does not support indexing.")
+
+    def get_sample_list(self):
+        return iter(self)
@@ -1,10 +1,16 @@
 from .commons import Util
 from .check import check_struct, Report
 from .visualizer import ImageVisualizePipeline
+from .collate import DSDLCollate
+from .prefetch import prefetch_map
+from .arrow import ArrowConverter
 
 __all__ = [
     "Util",
     "check_struct",
     "Report",
-    "ImageVisualizePipeline"
+    "ImageVisualizePipeline",
+    "DSDLCollate",
+    "prefetch_map",
+    "ArrowConverter",
 ]
\ No newline at end of file
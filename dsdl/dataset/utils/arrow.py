@@ -0,0 +1,226 @@
+import json
+from itertools import islice
+from typing import Iterable, Iterator, Dict, Any, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+from ...types import Struct, StructMetaclass
+from ...types.field import Field
+from ...types.generic import BoolField, IntField, NumField, StrField, ListField
+from ...types.special import CoordField, Coord3DField, IntervalField, BBoxField, RotatedBBoxField, PolygonField, \
+    KeypointField, LabelField, DateField, TimeField, TextField, ImageShapeField, InstanceIDField, UniqueIDField
+from ...types.unstructure import UnstructuredObjectField
+from ...exception import ValidationError
+
+SAMPLE_TYPE_KEY = b"dsdl.sample_type"
+PATH_KEY = b"dsdl.path"
+FIELD_KEY = b"dsdl.field"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("'pyarrow' is required to export the dataset to arrow/parquet, please install it first.")
+
+
+class _Column:
+    """
+    把一个field在一批样本中的原始值（yaml中的值，缺失为None）转换为一个arrow数组。
+    """
+
+    def __init__(self, arrow_type, path, convert=None):
+        self.arrow_type = arrow_type
+        self.path = path
+        self.convert = convert
+
+    def build(self, values):
+        if self.convert is not None:
+            convert = self.convert
+            values = [None if v is None else convert(v) for v in values]
+        try:
+            return pa.array(values, type=self.arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError) as e:
+            raise ValidationError(f"Failed to convert the field '{self.path}' to arrow type {self.arrow_type}: {e}")
+
+
+class _LabelColumn(_Column):
+    """
+    类别以字典编码存储，字典为类别域中所有类别的名字（多个类别域时为`<domain>::<name>`），索引的顺序与类别域中的顺序一致。
+    """
+
+    def __init__(self, field, path):
+        domains = field.dom if isinstance(field.dom, list) else [field.dom]
+        names, self._offsets = [], {}
+        for dom in domains:
+            self._offsets[dom.__name__] = len(names)
+            labels = dom.get_labels()
+            names.extend(_.name if len(domains) == 1 else f"{dom.__name__}::{_.name}" for _ in labels)
+        self.dictionary = pa.array(names, type=pa.string())
+        self.field = field
+        self._cache = {}
+        super().__init__(pa.dictionary(pa.int32(), pa.string()), path)
+
+    def _index(self, value):
+        index = self._cache.get(value)
+        if index is None:
+            try:
+                label = self.field.validate(value)
+            except Exception as e:
+                raise ValidationError(f"Failed to convert the field '{self.path}' to arrow: {e}")
+            index = self._offsets[label.domain_name] + label.index_in_domain() - 1
+            self._cache[value] = index
+        return index
+
+    def build(self, values):
+        indices = pa.array([None if v is None else self._index(v) for v in values], type=pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, self.dictionary)
+
+
+class _ListColumn(_Column):
+    def __init__(self, child, path):
+        self.child = child
+        super().__init__(pa.list_(_arrow_field("item", child)), path)
+
+    def build(self, values):
+        offsets, flat, mask = [0], [], []
+        for v in values:
+            if v is None:
+                mask.append(True)
+            else:
+                if not isinstance(v, list):
+                    raise ValidationError(f"Failed to convert the field '{self.path}' to arrow: expect list, got {v}")
+                mask.append(False)
+                flat.extend(v)
+            offsets.append(len(flat))
+        return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), self.child.build(flat), type=self.arrow_type,
+                                        mask=pa.array(mask, type=pa.bool_()) if any(mask) else None)
+
+
+class _StructColumn(_Column):
+    def __init__(self, children: Dict[str, _Column], path):
+        self.children = children
+        super().__init__(pa.struct([_arrow_field(k, v) for k, v in children.items()]), path)
+
+    def build_children(self, values):
+        return [child.build([None if v is None else v.get(k) for v in values]) for k, child in self.children.items()]
+
+    def build(self, values):
+        mask = [v is None for v in values]
+        return pa.StructArray.from_arrays(self.build_children(values), fields=list(self.arrow_type),
+                                          mask=pa.array(mask, type=pa.bool_()) if any(mask) else None)
+
+
+def _arrow_field(name, column):
+    metadata = None
+    if not isinstance(column, (_ListColumn, _StructColumn)):
+        metadata = {PATH_KEY: column.path, FIELD_KEY: column.field_key}
+    return pa.field(name, column.arrow_type, metadata=metadata)
+
+
+def _fixed_list(value_type, size):
+    return pa.list_(value_type, size)
+
+
+def _field_column(field: Field, path: str) -> _Column:
+    # 几何类型按yaml中的原始数值存储（如BBox为xywh，RotatedBBox按field的mode/measure），不做坐标变换
+    if isinstance(field, LabelField):
+        column = _LabelColumn(field, path)
+    elif isinstance(field, BoolField):
+        column = _Column(pa.bool_(), path)
+    elif isinstance(field, IntField):
+        column = _Column(pa.int64(), path, field.validate)
+    elif isinstance(field, NumField):
+        column = _Column(pa.float64(), path, field.validate)
+    elif isinstance(field, (StrField, TextField, InstanceIDField, UniqueIDField, UnstructuredObjectField)):
+        column = _Column(pa.string(), path)
+    elif isinstance(field, (CoordField, IntervalField)):
+        column = _Column(_fixed_list(pa.float64(), 2), path)
+    elif isinstance(field, Coord3DField):
+        column = _Column(_fixed_list(pa.float64(), 3), path)
+    elif isinstance(field, BBoxField):
+        column = _Column(_fixed_list(pa.float32(), 4), path)
+    elif isinstance(field, RotatedBBoxField):
+        column = _Column(_fixed_list(pa.float32(), 5 if field.mode == "xywht" else 8), path)
+    elif isinstance(field, PolygonField):
+        column = _Column(pa.list_(pa.list_(_fixed_list(pa.float32(), 2))), path)
+    elif isinstance(field, KeypointField):
+        column = _Column(_fixed_list(_fixed_list(pa.float32(), 3), len(field.dom)), path)
+    elif isinstance(field, ImageShapeField):
+        column = _Column(_fixed_list(pa.int64(), 2), path)
+    elif isinstance(field, DateField):
+        column = _Column(pa.date32(), path, field.validate)
+    elif isinstance(field, TimeField):
+        column = _Column(pa.time64("us"), path, field.validate)
+    else:
+        # DictField以及未知的field类型保存为json字符串
+        column = _Column(pa.string(), path, lambda v: json.dumps(v, ensure_ascii=False, default=str))
+    column.field_key = field.extract_key()
+    return column
+
+
+def _struct_column(struct_cls, path) -> _StructColumn:
+    children = {}
+    for name, field in struct_cls.get_mapping().items():
+        children[name] = _item_column(field, f"{path}/{name}")
+    for name, struct_obj in struct_cls.get_struct_mapping().items():
+        children[name] = _struct_column(struct_obj.__class__, f"{path}/{name}")
+    return _StructColumn(children, path)
+
+
+def _item_column(item, path) -> _Column:
+    if isinstance(item, Struct):
+        return _struct_column(item.__class__, path)
+    if isinstance(item, ListField):
+        return _ListColumn(_item_column(item.ele_type, f"{path}/*"), path)
+    return _field_column(item, path)
+
+
+class ArrowConverter:
+    """
+    根据Struct的定义生成arrow schema，并把yaml中的原始样本（dict）按批转换为`pyarrow.RecordBatch`：
+
+    - 每个field为一列，嵌套的Struct为struct列，List[Struct]（如objects）为list<struct>列；
+    - 叶子列的field metadata中记录了该列对应的field路径（与`Struct._flatten_struct`中的路径一致，如`./objects/*/bbox`）
+      以及field类型（如`$bbox`），schema的metadata中记录了样本的Struct类型；
+    - BBox等定长的几何类型为fixed_size_list，Polygon为list<list<fixed_size_list<float32, 2>>>，
+      Label为字典编码（字典为类别域中所有类别的名字），媒体文件（Image等）保存其路径，缺失的optional field为null。
+    """
+
+    def __init__(self, sample_type: StructMetaclass):
+        _require_pyarrow()
+        self.sample_type = sample_type
+        self._root = _struct_column(sample_type, ".")
+        self.schema = pa.schema(list(self._root.arrow_type),
+                                metadata={SAMPLE_TYPE_KEY: sample_type.__name__.encode("utf-8")})
+
+    def convert(self, samples: Iterable[Dict[str, Any]]):
+        samples = list(samples)
+        return pa.RecordBatch.from_arrays(self._root.build_children(samples), schema=self.schema)
+
+    def iter_batches(self, samples: Iterable[Dict[str, Any]], batch_size: int = 1024) -> Iterator:
+        samples = iter(samples)
+        while True:
+            batch = list(islice(samples, batch_size))
+            if not batch:
+                return
+            yield self.convert(batch)
+
+
+def to_arrow(samples: Iterable[Dict[str, Any]], sample_type: StructMetaclass, batch_size: int = 1024):
+    converter = ArrowConverter(sample_type)
+    return pa.Table.from_batches(converter.iter_batches(samples, batch_size), schema=converter.schema)
+
+
+def to_parquet(samples: Iterable[Dict[str, Any]], sample_type: StructMetaclass, path: str,
+               row_group_size: int = 1024, compression: Optional[str] = "zstd", **kwargs):
+    """
+    逐个row group地把样本写入parquet文件，内存中同时只有一个row group的数据。
+    """
+    converter = ArrowConverter(sample_type)
+    with pq.ParquetWriter(path, converter.schema, compression=compression, **kwargs) as writer:
+        for batch in converter.iter_batches(samples, row_group_size):
+            writer.write_batch(batch, row_group_size=row_group_size)
+    return path
@@ -74,19 +74,53 @@ def check_struct(sample_type: StructMetaclass, sample: dict, file_reader: BaseFi
 class Report:
     def __init__(self, output_path):
         self.parser_info = None
-        self.sample_info = []
         self.global_info = None
         self.image_info = []
         self.output_path = output_path
+        # 样本的验证结果不再全部保存在内存中：异常样本的信息在添加时直接写入samples_log.md，这里只保留计数
+        self.sample_stat = {"total": 0, "error": 0, "warn": 0, "normal": 0}
+        self._sample_log = None
+
+    @property
+    def sample_log_path(self):
+        return osp.join(osp.split(self.output_path)[0], "samples_log.md")
 
     def set_global_info(self, item):
         self.global_info = item
 
-    def add_sample_info(self, item):
-        self.sample_info.append(item)
+    def add_sample_info(self, item, idx=None):
+        if idx is None:
+            idx = self.sample_stat["total"]
+        self.sample_stat["total"] += 1
+        if item["normal_flag"]:
+            self.sample_stat["normal"] += 1
+            return
+        f = self._open_sample_log()
+        if item["warning_flag"]:
+            self.sample_stat["warn"] += 1
+            f.write(f"sample {idx}: ")
+            f.write(f"status WARNING" + "\n")
+            f.write("\twarning messages:" + "\n")
+            for msg in item["warning_msgs"]:
+                f.write("\t\t" + msg + "\n")
+            f.write("\tsample content:" + "\n")
+            f.write("\t\t" + f"{str(item['sample_content'])}" + "\n")
+        elif item["error_flag"]:
+            self.sample_stat["error"] += 1
+            f.write(f"sample {idx}: ")
+            f.write("status ERROR" + "\n")
+            f.write("\terror messages:" + "\n")
+            f.write("\t\t" + f"{item['error_msg']}" + "\n")
+            f.write("\tsample content:" + "\n")
+            f.write("\t\t" + f"{str(item['sample_content'])}" + "\n")
 
     def set_sample_info(self, info):
-        self.sample_info = info
+        self.sample_stat = {"total": 0, "error": 0, "warn": 0, "normal": 0}
+        if self._sample_log is not None:
+            self._sample_log.close()
+            self._sample_log = None
+        for item in info:
+            self.add_sample_info(item)
 
     def add_image_info(self, item):
         self.image_info.append(item)
@@ -94,37 +128,19 @@ class Report:
     def set_parser_info(self, item):
         self.parser_info = item
 
+    def _open_sample_log(self):
+        if self._sample_log is None:
+            self._sample_log = open(self.sample_log_path, "w")
+            self._sample_log.write("具体异常日志信息如下：" + os.linesep)
+            self._sample_log.write("```json\n")
+        return self._sample_log
+
     def parse_sample_info(self):
-        work_dir = osp.split(self.output_path)[0]
-        log_path = osp.join(work_dir, "samples_log.md")
-        total_num, normal_num, warn_num, error_num = len(self.sample_info), 0, 0, 0
-        with open(log_path, "w") as f:
-            f.write("具体异常日志信息如下：" + os.linesep)
-            f.write("```json\n")
-            for idx, info in enumerate(self.sample_info):
-                if info["normal_flag"]:
-                    normal_num += int(info["normal_flag"])
-                    # f.write(f"status SUCCESS" + os.linesep)
-                    continue
-                elif info["warning_flag"]:
-                    f.write(f"sample {idx}: ")
-                    warn_num += int(info["warning_flag"])
-                    f.write(f"status WARNING" + "\n")
-                    f.write("\twarning messages:" + "\n")
-                    for msg in info["warning_msgs"]:
-                        f.write("\t\t" + msg + "\n")
-                    f.write("\tsample content:" + "\n")
-                    f.write("\t\t" + f"{str(info['sample_content'])}" + "\n")
-                elif info["error_flag"]:
-                    f.write(f"sample {idx}: ")
-                    error_num += int(info["error_flag"])
-                    f.write("status ERROR" + "\n")
-                    f.write("\terror messages:" + "\n")
-                    f.write("\t\t" + f"{info['error_msg']}" + "\n")
-                    f.write("\tsample content:" + "\n")
-                    f.write("\t\t" + f"{str(info['sample_content'])}" + "\n")
-            f.write("```" + os.linesep)
-        return {"total": total_num, "error": error_num, "warn": warn_num, "normal": normal_num}
+        f = self._open_sample_log()
+        f.write("```" + os.linesep)
+        f.close()
+        self._sample_log = None
+        return dict(self.sample_stat)
 
     def parse_image_info(self):
         work_dir, _ = osp.split(self.output_path)
@@ -162,7 +178,7 @@ class Report:
         return success_flag
 
     def generate_sample_info(self, file_handler):
-        if not self.sample_info:
+        if not self.sample_stat["total"]:
             return False
         file_handler.write("## 2.样本验证结果" + os.linesep)
         if self.global_info:
@@ -187,7 +203,7 @@ class Report:
                 file_handler.write(str(self.global_info["sample_content"]) + "\n")
                 file_handler.write("```\n")
 
-        if len(self.sample_info) == 0:
+        if self.sample_stat["total"] == 0:
             file_handler.write("数据集中无样本，请检查`sample-path`字段路径是否有效或`samples`字段是否正确" + os.linesep)
             return False
 
@@ -203,7 +219,7 @@ class Report:
         if total_num != normal_num:
             file_handler.write("查看具体日志信息请[点击链接](./samples_log.md)" + os.linesep)
         else:
-            os.remove(osp.join(osp.split(self.output_path)[0], "samples_log.md"))
+            os.remove(self.sample_log_path)
         return True
 
     def generate_image_info(self, file_handler):
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
+import numpy as np
+
+try:
+    import torch
+except ImportError:
+    torch = None
+from .commons import TASK_FIELDS
+from ...geometry import BBoxArray, Label, LabelList
+
+MEDIA_FIELDS = ("image", "labelmap", "instancemap")
+
+
+class DSDLCollate:
+    """
+    A task-aware collate function which turns a list of samples (`Struct` objects returned by `Dataset.__getitem__`)
+    into a batch of arrays, it can be passed to torch's `DataLoader(collate_fn=...)` directly and is safe to pickle to
+    DataLoader workers.
+
+    The batch is a dict, for each field in `fields` (default to `TASK_FIELDS[task]`):
+
+    - media fields (image/labelmap/instancemap) are decoded (by `decode_workers` threads) and stacked into a
+      (B, H, W[, C]) array when all of them have the same shape, otherwise a list of arrays is returned;
+    - variable-length fields are packed into one array together with `<field>_offsets` of shape (B + 1,), the items of
+      the i-th sample are `batch[field][offsets[i]:offsets[i + 1]]`:
+        bbox: (M, 4) float32 in xyxy format; label: (M,) int64 index in the class domain (a (B,) array for the
+        classification task); rotatedbbox: (M, 5) float32 [x, y, w, h, theta]; keypoint: (M, K, 3) float32;
+    - polygon: all the points are packed into `polygon` (P, 2) float32, `polygon_item_offsets` indexes the points of
+      each polygon item, `polygon_part_offsets` indexes the items of each polygon and `polygon_offsets` indexes the
+      polygons of each sample;
+    - other fields are returned as lists.
+
+    Arrays are converted to torch tensors when torch is installed and `to_tensor` is True.
+    """
+
+    def __init__(self, task: Optional[str] = None, fields: Optional[Sequence[str]] = None, decode: bool = True,
+                 decode_workers: int = 0, draft=None, to_tensor: bool = True):
+        if fields is None:
+            assert task in TASK_FIELDS, f"invalid task, you can only choose in {list(TASK_FIELDS.keys())}"
+            fields = TASK_FIELDS[task]
+        self.task = task
+        self.fields = [_.lower() for _ in fields]
+        self.decode = decode
+        self.decode_workers = decode_workers
+        self.draft = draft
+        self.to_tensor = to_tensor
+
+    def __call__(self, batch: List[Any]) -> Dict[str, Any]:
+        field_info = [sample.extract_field_info(self.fields, whole_list=True) for sample in batch]
+        res = dict()
+        for field in self.fields:
+            values = [info.get(field, []) for info in field_info]
+            if field in MEDIA_FIELDS:
+                res[field] = self._collate_media(values)
+            elif field == "bbox":
+                self._pack(res, field, [self._bbox_rows(_) for _ in values], (4,))
+            elif field == "label":
+                self._collate_label(res, values)
+            elif field == "rotatedbbox":
+                self._pack(res, field, [[item.rbbox_value for item in _] for _ in values], (5,))
+            elif field == "keypoint":
+                self._collate_keypoint(res, values)
+            elif field == "polygon":
+                self._collate_polygon(res, values)
+            else:
+                res[field] = values
+        if self.to_tensor and torch is not None:
+            res = {k: torch.from_numpy(v) if isinstance(v, np.ndarray) else v for k, v in res.items()}
+        return res
+
+    def _decode(self, media):
+        return media.to_array(draft=self.draft)
+
+    def _collate_media(self, values):
+        if not self.decode:
+            return values
+        flat = [item for items in values for item in items]
+        if self.decode_workers is not None and self.decode_workers > 1 and len(flat) > 1:
+            with ThreadPoolExecutor(max_workers=self.decode_workers) as executor:
+                arrays = list(executor.map(self._decode, flat))
+        else:
+            arrays = [self._decode(_) for _ in flat]
+        if all(len(_) == 1 for _ in values) and len({_.shape for _ in arrays}) == 1:
+            return np.stack(arrays)
+        res, start = [], 0
+        for items in values:
+            res.append(arrays[start:start + len(items)])
+            start += len(items)
+        return res
+
+    @staticmethod
+    def _bbox_rows(values):
+        rows = []
+        for item in values:
+            if isinstance(item, BBoxArray):
+                rows.extend(item.xyxy.tolist())
+            else:
+                rows.append(item.xyxy)
+        return rows
+
+    @staticmethod
+    def _pack(res, field, per_sample, item_shape, dtype=np.float32):
+        counts = [len(_) for _ in per_sample]
+        offsets = np.zeros(len(per_sample) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        items = [item for items in per_sample for item in items]
+        if items:
+            res[field] = np.asarray(items, dtype=dtype).reshape((-1, *item_shape))
+        else:
+            res[field] = np.zeros((0, *item_shape), dtype=dtype)
+        res[f"{field}_offsets"] = offsets
+        return res
+
+    def _collate_label(self, res, values):
+        per_sample = []
+        for items in values:
+            indices = []
+            for item in items:
+                if isinstance(item, Label):
+                    indices.append(item.index_in_domain())
+                elif isinstance(item, LabelList):
+                    indices.extend(_.index_in_domain() for _ in item.label_list)
+            per_sample.append(indices)
+        if self.task == "classification" and all(len(_) == 1 for _ in per_sample):
+            res["label"] = np.asarray([_[0] for _ in per_sample], dtype=np.int64)
+        else:
+            self._pack(res, "label", per_sample, (), dtype=np.int64)
+
+    def _collate_keypoint(self, res, values):
+        per_sample = [[item.value for item in items] for items in values]
+        num_points = {len(item) for items in per_sample for item in items}
+        if len(num_points) > 1:
+            res["keypoint"] = per_sample
+            return
+        self._pack(res, "keypoint", per_sample, (num_points.pop() if num_points else 0, 3))
+
+    def _collate_polygon(self, res, values):
+        points, item_counts, part_counts, polygon_counts = [], [], [], []
+        for items in values:
+            polygon_counts.append(len(items))
+            for polygon in items:
+                part_counts.append(len(polygon.polygons))
+                for polygon_item in polygon.polygons:
+                    item_counts.append(len(polygon_item.points))
+                    points.extend(polygon_item.points)
+        res["polygon"] = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        for name, counts in (("polygon_item_offsets", item_counts), ("polygon_part_offsets", part_counts),
+                             ("polygon_offsets", polygon_counts)):
+            offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(counts)
+            res[name] = offsets
@@ -14,6 +14,14 @@ FIELD_VISUALIZE_ORDER = {  # 定义画图时的先后顺序，数值越小的越
     "others": -1
 }
 
+TASK_FIELDS = {  # 每种任务需要使用的field
+    "detection": ["image", "label", "bbox", "polygon", "keypoint", "rotatedbbox"],
+    "classification": ["image", "label"],
+    "semantic-seg": ["image", "labelmap"],
+    "panoptic-seg": ["image", "labelmap", "instancemap"],
+    "ocr": ["image", "rotatedbbox", "text", "polygon"]
+}
+
 
 class Util:
     @staticmethod
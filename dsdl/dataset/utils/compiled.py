@@ -0,0 +1,206 @@
+import os
+import json
+import mmap
+import struct
+from array import array
+from datetime import date, datetime
+from collections.abc import Sequence
+from typing import Iterable, Dict, Any, Optional
+
+import numpy as np
+from yaml import load as yaml_load
+
+try:
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLSafeLoader
+from .loader import SampleStream, resolve_sample_paths
+
+# 编译后的样本文件格式（小端序）:
+#   | magic (8B) | 样本数 n (u64) | 偏移表位置 (u64) | info长度 (u64) | info (json) | 样本记录 (json) ... | 偏移表 (n+1个u64) |
+# 第i个样本的json记录位于 [offsets[i], offsets[i+1]) 之间，因此随机访问只需要解码一条记录。
+COMPILED_MAGIC = b"DSDLIDX\x01"
+COMPILED_SUFFIX = ".dsdlc"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+# yaml中的日期、时间戳不是json类型，编码为只含一个标记键的对象，解码时还原
+_DATETIME_TAG = "$datetime"
+_DATE_TAG = "$date"
+
+
+def _encode(obj):
+    if isinstance(obj, datetime):
+        return {_DATETIME_TAG: obj.isoformat()}
+    if isinstance(obj, date):
+        return {_DATE_TAG: obj.isoformat()}
+    raise TypeError(f"Object of type {type(obj).__name__} can not be stored in a compiled dsdl sample file.")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if _DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[_DATETIME_TAG])
+        if _DATE_TAG in obj:
+            return date.fromisoformat(obj[_DATE_TAG])
+    return obj
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_encode).encode("utf-8")
+
+
+def _loads(data):
+    # 只有包含标记的记录才需要逐个对象检查
+    if b'"$date' in data:
+        return json.loads(data, object_hook=_decode)
+    return json.loads(data)
+
+
+def write_compiled_samples(samples: Iterable[Dict[str, Any]], output_path: str, info: Optional[Dict] = None) -> int:
+    """
+    将样本逐条写入编译后的二进制文件，返回写入的样本数。样本可以是任意可迭代对象（如SampleStream），不会一次性载入内存。
+    """
+    info_bytes = _dumps(info or {})
+    offsets = array("Q")
+    tmp_path = f"{output_path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(COMPILED_MAGIC, 0, 0, 0))
+            f.write(info_bytes)
+            pos = _HEADER.size + len(info_bytes)
+            for sample in samples:
+                offsets.append(pos)
+                record = _dumps(sample)
+                f.write(record)
+                pos += len(record)
+            offsets.append(pos)
+            f.write(np.asarray(offsets, dtype="<u8").tobytes())
+            f.seek(0)
+            f.write(_HEADER.pack(COMPILED_MAGIC, len(offsets) - 1, pos, len(info_bytes)))
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(offsets) - 1
+
+
+def compile_dsdl(dsdl_yaml: str, output_path: Optional[str] = None) -> str:
+    """
+    将dsdl yaml文件（及其sample-path指向的样本文件）中的样本编译为可以内存映射的二进制文件，返回编译后的文件路径。
+    """
+    if output_path is None:
+        output_path = default_compiled_path(dsdl_yaml)
+    with open(dsdl_yaml, "r") as f:
+        dsdl_all_info = yaml_load(f, Loader=YAMLSafeLoader)
+    dsdl_info = dsdl_all_info["data"]
+    sources = [dsdl_yaml]
+    if "sample-path" not in dsdl_info or dsdl_info["sample-path"] in ("local", "$local"):
+        assert "samples" in dsdl_info, f"Key 'samples' is required in {dsdl_yaml}."
+        samples = dsdl_info.pop("samples")
+    else:
+        sample_paths = resolve_sample_paths(dsdl_yaml, dsdl_info["sample-path"])
+        sources.extend(_source_dirs(dsdl_yaml, dsdl_info["sample-path"]) + sample_paths)
+        samples = SampleStream(sample_paths)
+    global_info_type = dsdl_info.get("global-info-type", None)
+    global_info = None
+    if global_info_type is not None:
+        if "global-info-path" not in dsdl_info:
+            assert "global-info" in dsdl_info, f"Key 'global-info' is required in {dsdl_yaml}."
+            global_info = dsdl_info["global-info"]
+        else:
+            global_info_path = resolve_sample_paths(dsdl_yaml, dsdl_info["global-info-path"])
+            sources.extend(_source_dirs(dsdl_yaml, dsdl_info["global-info-path"]) + global_info_path)
+            global_info = next(iter(SampleStream(global_info_path, "global-info")))
+    info = {
+        "sample_type": dsdl_info["sample-type"],
+        "global_info_type": global_info_type,
+        "global_info": global_info,
+        "meta": dsdl_all_info["meta"],
+        "version": dsdl_all_info["$dsdl-version"],
+        "sources": [_source_stat(_) for _ in sources],
+    }
+    write_compiled_samples(samples, output_path, info)
+    return output_path
+
+
+def default_compiled_path(dsdl_yaml: str) -> str:
+    return os.path.splitext(dsdl_yaml)[0] + COMPILED_SUFFIX
+
+
+def _source_dirs(dsdl_yaml: str, path) -> list:
+    # sample-path为目录时也记录目录本身，目录下增删样本文件会改变目录的mtime
+    if isinstance(path, str) and os.path.isdir(os.path.join(os.path.split(dsdl_yaml)[0], path)):
+        return [os.path.join(os.path.split(dsdl_yaml)[0], path)]
+    return []
+
+
+def _source_stat(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def is_compiled_up_to_date(dsdl_yaml: str, compiled_path: str) -> bool:
+    """
+    编译后的文件是否仍然有效：文件头中记录了dsdl yaml以及sample-path、global-info-path指向的所有文件的大小和mtime，
+    其中任何一个发生变化（或被删除）都需要重新编译。
+    """
+    if not os.path.exists(compiled_path):
+        return False
+    try:
+        sources = CompiledSamples(compiled_path).info.get("sources")
+    except (RuntimeError, ValueError, struct.error):
+        return False
+    if not sources or sources[0]["path"] != os.path.abspath(dsdl_yaml):
+        return False
+    for source in sources:
+        try:
+            if _source_stat(source["path"]) != source:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+class CompiledSamples(Sequence):
+    """
+    以mmap方式打开编译后的样本文件，`len`为O(1)，`__getitem__`只解码被请求的那一条记录。
+    fork出的DataLoader worker共享同一份页缓存，而不会复制样本列表。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._num, table_pos, info_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != COMPILED_MAGIC:
+            raise RuntimeError(f"{self.path} is not a compiled dsdl sample file.")
+        self._info_len = info_len
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=self._num + 1, offset=table_pos)
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        return _loads(self._mm[_HEADER.size:_HEADER.size + self._info_len])
+
+    def __len__(self):
+        return self._num
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._num))]
+        if idx < 0:
+            idx += self._num
+        if not 0 <= idx < self._num:
+            raise IndexError(f"sample index {idx} out of range.")
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        return _loads(self._mm[start:end])
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._open()
@@ -0,0 +1,252 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Sequence, Union, Iterator, List, Any
+
+import yaml
+from yaml import load as yaml_load
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+try:
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLSafeLoader
+try:
+    from yaml import CParser as _YAMLParser
+
+    _YAML_PARSER_BASES = (_YAMLParser,)
+except ImportError:
+    from yaml.reader import Reader
+    from yaml.scanner import Scanner
+    from yaml.parser import Parser
+
+    _YAML_PARSER_BASES = (Reader, Scanner, Parser)
+
+YAML_VALID_SUFFIX = ('.yaml', '.YAML')
+JSON_VALID_SUFFIX = ('.json', '.JSON')
+VALID_SUFFIX = YAML_VALID_SUFFIX + JSON_VALID_SUFFIX
+
+_JSON_CHUNK_SIZE = 1 << 16
+_JSON_WHITESPACE = " \t\n\r"
+
+
+class _YAMLEventLoader(*_YAML_PARSER_BASES, Composer, SafeConstructor, Resolver):
+    """
+    A safe yaml loader which exposes the event api, so that the items of a sequence can be composed and constructed
+    one by one instead of building the whole document in memory.
+    """
+
+    def __init__(self, stream):
+        if len(_YAML_PARSER_BASES) == 1:
+            _YAML_PARSER_BASES[0].__init__(self, stream)
+        else:
+            Reader.__init__(self, stream)
+            Scanner.__init__(self)
+            Parser.__init__(self)
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+    def skip_node(self):
+        depth = 0
+        while True:
+            event = self.get_event()
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return
+
+    def iter_key(self, extract_key):
+        """
+        yield the constructed items of the top-level `extract_key`, a non-list value is yielded as a single item.
+        """
+        self.get_event()  # StreamStartEvent
+        if self.check_event(yaml.StreamEndEvent):
+            return
+        self.get_event()  # DocumentStartEvent
+        if not self.check_event(yaml.MappingStartEvent):
+            raise KeyError(extract_key)
+        self.get_event()
+        while not self.check_event(yaml.MappingEndEvent):
+            key = self.construct_document(self.compose_node(None, None))
+            if key != extract_key:
+                self.skip_node()
+                continue
+            if not self.check_event(yaml.SequenceStartEvent):
+                yield self.construct_document(self.compose_node(None, None))
+                return
+            self.get_event()
+            while not self.check_event(yaml.SequenceEndEvent):
+                yield self.construct_document(self.compose_node(None, None))
+            return
+        raise KeyError(extract_key)
+
+
+def iter_yaml_samples(file_path: str, extract_key: str = "samples") -> Iterator[Any]:
+    """
+    Parse the yaml file incrementally and yield the items under the top-level key `extract_key` one at a time.
+    """
+    with open(file_path, "r") as f:
+        loader = _YAMLEventLoader(f)
+        try:
+            yield from loader.iter_key(extract_key)
+        finally:
+            loader.dispose()
+
+
+class _JSONStream:
+    def __init__(self, fp):
+        self._fp = fp
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = self._fp.read(_JSON_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _JSON_WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of json stream.")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expect '{char}' in json stream, got '{self._buf[self._pos]}'.")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number at the end of the buffer may be truncated, make sure it is followed by a delimiter
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+
+def iter_json_samples(file_path: str, extract_key: str = "samples") -> Iterator[Any]:
+    """
+    Parse the json file incrementally and yield the items under the top-level key `extract_key` one at a time.
+    """
+    with open(file_path, "r") as f:
+        stream = _JSONStream(f)
+        stream.expect("{")
+        if stream.peek() == "}":
+            raise KeyError(extract_key)
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key != extract_key:
+                stream.value()
+            elif stream.peek() != "[":
+                yield stream.value()
+                return
+            else:
+                stream.expect("[")
+                if stream.peek() == "]":
+                    return
+                while True:
+                    yield stream.value()
+                    if stream.peek() == "]":
+                        return
+                    stream.expect(",")
+            if stream.peek() == "}":
+                raise KeyError(extract_key)
+            stream.expect(",")
+
+
+def resolve_sample_paths(dsdl_path: str, path: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Get the sample files given the `sample-path` field of the dsdl yaml file, relative paths are resolved against the
+    directory of the dsdl yaml file.
+    """
+    paths = []
+    dsdl_dir = os.path.split(dsdl_path)[0]
+    if isinstance(path, str):
+        path = os.path.join(dsdl_dir, path)
+        if os.path.isdir(path):
+            paths = [os.path.join(path, _) for _ in sorted(os.listdir(path)) if _.endswith(VALID_SUFFIX)]
+        elif os.path.isfile(path):
+            if path.endswith(VALID_SUFFIX):
+                paths = [path]
+    elif isinstance(path, (list, tuple)):
+        paths = [os.path.join(dsdl_dir, _) for _ in path if _.endswith(VALID_SUFFIX)]
+        paths = [_ for _ in paths if os.path.isfile(_)]
+    return paths
+
+
+def load_sample_file(file_path: str, extract_key: str = "samples") -> List[Any]:
+    """
+    Load the whole yaml/json file and return the items under the top-level key `extract_key` as a list.
+    """
+    with open(file_path, "r") as f:
+        if file_path.endswith(YAML_VALID_SUFFIX):
+            data = yaml_load(f, YAMLSafeLoader)[extract_key]
+        else:
+            data = json.load(f)[extract_key]
+    if isinstance(data, list):
+        return data
+    return [data]
+
+
+def load_sample_files(paths: Sequence[str], extract_key: str = "samples", num_workers: int = 0) -> List[Any]:
+    """
+    Load the samples of several files, the files are parsed concurrently by a process pool when `num_workers` > 1.
+    The samples are always merged in the order of `paths`.
+    """
+    samples = []
+    if num_workers is None or num_workers <= 1 or len(paths) <= 1:
+        for p in paths:
+            samples.extend(load_sample_file(p, extract_key))
+        return samples
+    num_workers = min(num_workers, len(paths))
+    chunksize = max(1, len(paths) // (num_workers * 4))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for data in executor.map(load_sample_file, paths, repeat(extract_key), chunksize=chunksize):
+            samples.extend(data)
+    return samples
+
+
+def iter_sample_file(file_path: str, extract_key: str = "samples") -> Iterator[Any]:
+    if file_path.endswith(YAML_VALID_SUFFIX):
+        return iter_yaml_samples(file_path, extract_key)
+    return iter_json_samples(file_path, extract_key)
+
+
+class SampleStream:
+    """
+    A re-iterable view of the samples stored in several yaml/json files. The files are parsed incrementally each time
+    the stream is iterated, so only the sample being consumed is kept in memory.
+    """
+
+    def __init__(self, paths: Sequence[str], extract_key: str = "samples"):
+        self.paths = list(paths)
+        self.extract_key = extract_key
+
+    def __iter__(self):
+        for p in self.paths:
+            yield from iter_sample_file(p, self.extract_key)
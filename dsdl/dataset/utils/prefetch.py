@@ -0,0 +1,119 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, TypeVar
+from ...objectio.base import BaseFileReader, BytesWrapper
+from ... import instrumentation
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MEDIA_FIELDS = ("image", "labelmap", "instancemap")
+
+
+def prefetch_map(func: Callable[[T], R], iterable: Iterable[T], prefetch: int = 64, workers: int = 8) -> Iterator[R]:
+    """
+    Lazily apply `func` to the items of `iterable` in a background thread pool and yield the results in order.
+
+    At most `prefetch` items are in flight at any time: a new item is only submitted when the consumer takes a result
+    (backpressure), so a slow consumer never makes the pool read ahead without bound. An exception raised by `func` is
+    re-raised at the position of the failing item. Closing the generator (or breaking out of the loop) cancels the
+    pending items and shuts the pool down without waiting for them.
+    """
+    if workers is None or workers <= 0 or prefetch is None or prefetch <= 0:
+        for item in iterable:
+            yield func(item)
+        return
+    iterator = iter(iterable)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for item in iterator:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= prefetch:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for item in iterator:
+                pending.append(executor.submit(func, item))
+                break
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class PrefetchedFileReader(BaseFileReader):
+    """
+    Wrap the file reader of a dataset for one prefetched sample: `prefetch` reads the given files into memory, and
+    each prefetched content is handed out once, by the first read of the file, so the bytes are owned by the consumer
+    afterwards and freed with it. Files which are not prefetched (or read again) are read by the wrapped reader.
+
+    A new reader is created for every yielded sample, the Struct objects kept by the dataset never see it.
+    """
+
+    def __init__(self, reader):
+        super().__init__(reader.working_dir)
+        self.reader = reader
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, item):
+        # stat/read_range等其他方法由被包装的reader提供
+        if item == "reader":
+            raise AttributeError(item)
+        return getattr(self.reader, item)
+
+    def __getstate__(self):
+        return {"working_dir": self.working_dir, "reader": self.reader}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, files):
+        name = "reader." + self.reader.__class__.__name__
+        for file in dict.fromkeys(files):
+            if file in self._buffers:
+                continue
+            with instrumentation.timer(name + ".read"):
+                value = self.reader.read(file)
+            instrumentation.count(name + ".requests")
+            instrumentation.count(name + ".bytes", len(value))
+            with self._lock:
+                self._buffers[file] = value
+
+    @property
+    def pending(self):
+        """
+        number of prefetched files which have not been read yet
+        """
+        return len(self._buffers)
+
+    def read(self, file) -> bytes:
+        with self._lock:
+            value = self._buffers.pop(file, None)
+        if value is None:
+            value = self.reader.read(file)
+        return value
+
+    @contextmanager
+    def load(self, file):
+        yield BytesWrapper(self.read(file))
+
+
+def prefetch_media(sample, reader: PrefetchedFileReader, fields=MEDIA_FIELDS):
+    """
+    Read the media files (image, segmentation map, ...) of a `Struct` sample into `reader`, which must be the file
+    reader the sample was created with, so that the following decoding (e.g. `to_array`) doesn't block on the file
+    reader. Samples that are not `Struct` objects are returned unchanged.
+    """
+    extract = getattr(sample, "extract_field_info", None)
+    if extract is None:
+        return sample
+    reader.prefetch([item.location for items in extract(list(fields)).values() for item in items
+                     if getattr(item, "location", None) is not None])
+    return sample
@@ -6,6 +6,81 @@ from ...geometry import LabelList, BBox
 from ...types import Struct
 from copy import deepcopy
 
+# 按图像路径的布局缓存_MediaPathIndex，同一Struct类的样本（图像数量不随样本变化时）共用一个索引及其匹配结果
+_INDEX_CACHE = {}
+_INDEX_CACHE_SIZE = 256
+
+
+class _PathTrieNode:
+    __slots__ = ("children", "images")
+
+    def __init__(self):
+        self.children = {}
+        self.images = []  # 所在目录恰好为该节点的图像在image_paths中的下标
+
+
+class _MediaPathIndex:
+    """
+    图像路径按目录构建的前缀树，用于为标注路径查找距离最近的图像，与`ImageVisualizePipeline._match`的结果相同：
+
+    设图像目录与标注路径的公共目录为P，则bu_distance为图像目录在P之下的层数，td_distance为标注路径在P之下的层数。
+    当`DIST_TRHESH <= 2 * BU_DIST_WEIGHT`时只有bu_distance为0（图像目录是标注的祖先目录）或1（图像目录是某个祖先目录的子目录）
+    的图像可能被匹配，它们都在标注路径沿前缀树向下的路径上或其子节点中，因此每个标注只需查找O(路径深度)个节点。
+    同一目录下的标注（如`./objects/3/bbox`与`./objects/3/label`）匹配结果相同，结果按目录缓存。
+    """
+
+    def __init__(self, image_paths, metric, thresh):
+        self.image_paths = image_paths
+        self._metric = metric
+        self._thresh = thresh
+        self._root = _PathTrieNode()
+        self._memo = {}
+        for i, image_path in enumerate(image_paths):
+            node = self._root
+            for part in image_path.split("/")[:-1]:
+                child = node.children.get(part)
+                if child is None:
+                    child = node.children[part] = _PathTrieNode()
+                node = child
+            node.images.append(i)
+
+    def match(self, ann_path):
+        ann_dir = ann_path[:ann_path.rfind("/")]
+        res = self._memo.get(ann_dir)
+        if res is None:
+            res = self._memo[ann_dir] = self._match_dir(ann_dir.split("/"))
+        return res
+
+    def _match_dir(self, dir_parts):
+        depth = len(dir_parts) + 1  # 标注路径的层数
+        nodes = []  # nodes[k - 1]为目录dir_parts[:k]对应的节点
+        node = self._root
+        for part in dir_parts:
+            node = node.children.get(part)
+            if node is None:
+                break
+            nodes.append(node)
+        candidates = []  # (distance, image index)
+        for k in range(len(nodes), 0, -1):
+            if nodes[k - 1].images:
+                dist = self._metric(0, depth - k)
+                candidates.extend((dist, i) for i in nodes[k - 1].images)
+                break
+        # bu_distance为1的图像距离不小于metric(1, depth - len(nodes))，已有更近的图像时不需要查找
+        if not candidates or candidates[0][0] >= self._metric(1, depth - len(nodes)):
+            for k in range(len(nodes), 0, -1):
+                on_path = dir_parts[k] if k < len(dir_parts) else None
+                dist = self._metric(1, depth - k)
+                for key, child in nodes[k - 1].children.items():
+                    if key != on_path:
+                        candidates.extend((dist, i) for i in child.images)
+        if not candidates:
+            return ()
+        min_dist = min(_[0] for _ in candidates)
+        if min_dist >= self._thresh:
+            return ()
+        return tuple(sorted(i for dist, i in candidates if dist == min_dist))
+
 
 class ImageSample:
     def __init__(self, image, palette):
@@ -139,14 +214,33 @@ class ImageVisualizePipeline:
     def _metric(cls, bu_distance, td_distance):
         return bu_distance * cls.BU_DIST_WEIGHT + td_distance * cls.TD_DIST_WEIGHT
 
+    @classmethod
+    def _path_index(cls, image_paths):
+        """
+        返回image_paths的前缀树索引，权重被修改为不满足`_MediaPathIndex`的条件时返回None
+        """
+        if cls.DIST_TRHESH > 2 * cls.BU_DIST_WEIGHT or cls.TD_DIST_WEIGHT <= 0:
+            return None
+        key = (cls, tuple(image_paths))
+        index = _INDEX_CACHE.get(key)
+        if index is None:
+            if len(_INDEX_CACHE) >= _INDEX_CACHE_SIZE:
+                _INDEX_CACHE.clear()
+            index = _INDEX_CACHE[key] = _MediaPathIndex(list(image_paths), cls._metric, cls.DIST_TRHESH)
+        return index
+
     def group_media_and_ann(self):
         data_dic = self.data_dic
         image_dic = data_dic.pop("image")
         image_paths = list(image_dic.keys())
         result_dic = {k_: ImageSample(image_dic[k_], self.palette) for k_ in image_paths}
+        index = self._path_index(image_paths)
         for field_key, ann_dic in data_dic.items():
             for ann_path, ann_obj in ann_dic.items():
-                matched_img_paths = self._match(ann_path, image_paths)
+                if index is not None and "/" in ann_path:
+                    matched_img_paths = [image_paths[_] for _ in index.match(ann_path)]
+                else:
+                    matched_img_paths = self._match(ann_path, image_paths)
                 for matched_img_path in matched_img_paths:
                     result_dic[matched_img_path].append_ground_truth(field_key, ann_path, ann_obj)
         return result_dic
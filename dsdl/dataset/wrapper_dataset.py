@@ -6,28 +6,30 @@ try:
     from yaml import CSafeLoader as YAMLSafeLoader
 except ImportError:
     from yaml import SafeLoader as YAMLSafeLoader
-import os
-import json
-from ..parser import dsdl_parse
+from ..parser import dsdl_parse, compile_dsdl_py
 from .utils.commons import Util
 from ..geometry import CLASSDOMAIN
+from .. import instrumentation
+from .utils.loader import resolve_sample_paths, load_sample_files, YAML_VALID_SUFFIX, JSON_VALID_SUFFIX, VALID_SUFFIX
 
 
 class DSDLDataset(Dataset):
-    YAML_VALID_SUFFIX = ('.yaml', '.YAML')
-    JSON_VALID_SUFFIX = ('.json', '.JSON')
-    VALID_SUFFIX = YAML_VALID_SUFFIX + JSON_VALID_SUFFIX
+    YAML_VALID_SUFFIX = YAML_VALID_SUFFIX
+    JSON_VALID_SUFFIX = JSON_VALID_SUFFIX
+    VALID_SUFFIX = VALID_SUFFIX
 
-    def __init__(self, dsdl_yaml, location_config, import_dir='', lazy_init=True):
+    def __init__(self, dsdl_yaml, location_config, import_dir='', lazy_init=True, num_workers=0):
         self._dsdl_yaml = dsdl_yaml
         self._location_config = location_config
         self._import_dir = import_dir
+        self._num_workers = num_workers  # 并行解析样本文件的进程数，0或1表示串行
 
         self._yaml_info = self.extract_info_from_yml()
         dsdl_py, sample_type, samples, global_info_type, global_info = self._yaml_info["dsdl_py"], self._yaml_info[
             "sample_type"], self._yaml_info["samples"], self._yaml_info["global_info_type"], self._yaml_info[
                                                                            "global_info"]
-        exec(dsdl_py, {})
+        with instrumentation.timer("dsdl_dataset.exec"):
+            exec(compile_dsdl_py(dsdl_py), {})
         all_class_dom = Util.extract_class_dom(sample_type)
         self.class_dom = None
         this_class_dom = None
@@ -43,7 +45,7 @@ class DSDLDataset(Dataset):
 
     def extract_info_from_yml(self):
         dsdl_yaml = self._dsdl_yaml
-        with open(dsdl_yaml, "r") as f:
+        with instrumentation.timer("dsdl_dataset.read_yaml"), open(dsdl_yaml, "r") as f:
             dsdl_all_info = yaml_load(f, Loader=YAMLSafeLoader)
         dsdl_info, dsdl_meta, dsdl_version = dsdl_all_info['data'], dsdl_all_info["meta"], dsdl_all_info[
             "$dsdl-version"]
@@ -55,16 +57,19 @@ class DSDLDataset(Dataset):
             samples = dsdl_info['samples']
         else:
             sample_path = dsdl_info["sample-path"]
-            samples = self.load_samples(dsdl_yaml, sample_path)
+            with instrumentation.timer("dsdl_dataset.read_samples"):
+                samples = self._read_samples(dsdl_yaml, sample_path)
         if global_info_type is not None:
             if "global-info-path" not in dsdl_info:
                 assert "global-info" in dsdl_info, f"Key 'global-info' is required in {dsdl_yaml}."
                 global_info = dsdl_info["global_info"]
             else:
                 global_info_path = dsdl_info["global-info-path"]
-                global_info = self.load_samples(dsdl_yaml, global_info_path, "global-info")[0]
+                global_info = self.load_samples(dsdl_yaml, global_info_path, "global-info",
+                                                num_workers=self._num_workers)[0]
 
-        dsdl_py = dsdl_parse(dsdl_yaml, dsdl_library_path=self._import_dir)
+        with instrumentation.timer("dsdl_dataset.parse"):
+            dsdl_py = dsdl_parse(dsdl_yaml, dsdl_library_path=self._import_dir)
 
         res = {
             "sample_type": sample_type,
@@ -77,33 +82,13 @@ class DSDLDataset(Dataset):
         }
         return res
 
+    def _read_samples(self, dsdl_path, sample_path):
+        """
+        读取sample-path中的样本，子类可以重写该方法（如流式读取）
+        """
+        return self.load_samples(dsdl_path, sample_path, num_workers=self._num_workers)
+
     @classmethod
-    def load_samples(cls, dsdl_path: str, path: Union[str, Sequence[str]], extract_key="samples"):
-        samples = []
-        paths = []
-        dsdl_dir = os.path.split(dsdl_path)[0]
-        if isinstance(path, str):
-            path = os.path.join(dsdl_dir, path)
-            if os.path.isdir(path):
-                paths = [os.path.join(path, _) for _ in os.listdir(path) if _.endswith(cls.VALID_SUFFIX)]
-            elif os.path.isfile(path):
-                if path.endswith(cls.VALID_SUFFIX):
-                    paths = [path]
-        elif isinstance(path, (list, tuple)):
-            paths = [os.path.join(dsdl_dir, _) for _ in path if os.path.isfile(_) and _.endswith(cls.VALID_SUFFIX)]
-        for p in paths:
-            if p.endswith(cls.YAML_VALID_SUFFIX):
-                with open(p, "r") as f:
-                    data = yaml_load(f, YAMLSafeLoader)[extract_key]
-                if isinstance(data, list):
-                    samples.extend(data)
-                else:
-                    samples.append(data)
-            else:
-                with open(p, "r") as f:
-                    data = json.load(f)[extract_key]
-                if isinstance(data, list):
-                    samples.extend(data)
-                else:
-                    samples.append(data)
-        return samples
+    def load_samples(cls, dsdl_path: str, path: Union[str, Sequence[str]], extract_key="samples", num_workers=0):
+        paths = resolve_sample_paths(dsdl_path, path)
+        return load_sample_files(paths, extract_key, num_workers)
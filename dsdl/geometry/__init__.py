@@ -1,4 +1,4 @@
-from .box import BBox
+from .box import BBox, BBoxArray
 from .label import Label, LabelList
 from .media import ImageMedia
 from .polygon import Polygon, PolygonItem
@@ -15,6 +15,7 @@ from .uniqueid import UniqueID
 
 __all__ = [
     "BBox",
+    "BBoxArray",
     "Label",
     "Text",
     "ImageMedia",
@@ -2,6 +2,8 @@ from .base_geometry import BaseGeometry
 
 
 class Attributes(BaseGeometry):
+    __slots__ = ("container",)
+
     def __init__(self, **kwargs):
         self.container = {}
         for k, v in kwargs.items():
@@ -1,4 +1,6 @@
 class BaseGeometry:
+    # 几何对象的数量与样本数成正比，子类都使用__slots__以避免每个实例的__dict__开销
+    __slots__ = ()
 
     def visualize(self, image, palette, **kwargs):
         return image
@@ -12,6 +14,7 @@ class BaseGeometry:
 
 
 class FontMixin:
+    __slots__ = ()
     FONT = None
 
     @classmethod
@@ -21,3 +24,10 @@ class FontMixin:
     @property
     def font(self):
         return self.FONT
+
+    def text_size(self, draw_obj, text):
+        # Pillow>=10移除了ImageDraw.textsize，使用textbbox计算文本的宽高
+        if hasattr(draw_obj, "textbbox"):
+            left, top, right, bottom = draw_obj.textbbox((0, 0), text, font=self.font)
+            return right - left, bottom - top
+        return draw_obj.textsize(text, self.font)
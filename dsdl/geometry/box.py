@@ -1,4 +1,4 @@
-from typing import TypeVar, List
+from typing import TypeVar, List, Sequence
 import numpy as np
 from PIL import ImageDraw
 from .base_geometry import BaseGeometry
@@ -7,6 +7,7 @@ _ELE_TYPE = TypeVar("_ELE_TYPE", int, float)
 
 
 class BBox(BaseGeometry):
+    __slots__ = ("_data",)
 
     def __init__(
             self,
@@ -15,7 +16,7 @@ class BBox(BaseGeometry):
             width: _ELE_TYPE,
             height: _ELE_TYPE
     ):
-        self._data = [x, y, width, height]
+        self._data = (x, y, width, height)
 
     @property
     def x(self) -> _ELE_TYPE:
@@ -65,10 +66,10 @@ class BBox(BaseGeometry):
         return [self.xmin, self.ymin, self.xmax, self.ymax]
 
     def to_int(self):
-        self._data = [int(_) for _ in self._data]
+        self._data = tuple(int(_) for _ in self._data)
 
     def to_float(self):
-        self._data = [float(_) for _ in self._data]
+        self._data = tuple(float(_) for _ in self._data)
 
     def visualize(self, image, palette, **kwargs):
         draw_obj = ImageDraw.Draw(image)
@@ -89,3 +90,123 @@ class BBox(BaseGeometry):
     @property
     def field_key(self):
         return "BBox"
+
+
+class BBoxArray(BaseGeometry):
+    """
+    A batch of bounding boxes stored in an (N, 4) float64 array with the format [x, y, width, height], it is used as
+    the value of `List[etype=BBox]` so that the boxes of a sample are validated in one pass without per-box objects.
+
+    Indexing with an integer (or iterating) returns a new `BBox` holding a copy of the values, so changing that `BBox`
+    (e.g. `boxes[0].to_int()`) doesn't change the array; modify the array with `to_int`/`to_float` or through `data`.
+    Indexing with a slice or an index array returns a `BBoxArray`.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: np.ndarray):
+        self._data = data
+
+    @classmethod
+    def from_list(cls, value: Sequence[Sequence[_ELE_TYPE]]) -> "BBoxArray":
+        if isinstance(value, np.ndarray):
+            data = value.astype(np.float64, copy=False)
+        elif type(value) is not list:
+            raise ValueError(f"expect list of bbox, got {value}")
+        elif len(value) == 0:
+            data = np.zeros((0, 4), dtype=np.float64)
+        else:
+            try:
+                data = np.array(value, dtype=np.float64)
+            except (TypeError, ValueError) as _:
+                raise ValueError(f"expect list of bbox with 4 numbers, got {value}")
+        if data.ndim != 2 or data.shape[1] != 4:
+            raise ValueError(f"expect list of bbox with 4 numbers, got {value}")
+        return cls(data)
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data[:, 1]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self._data[:, 2]
+
+    @property
+    def height(self) -> np.ndarray:
+        return self._data[:, 3]
+
+    @property
+    def xmin(self) -> np.ndarray:
+        return self._data[:, 0]
+
+    @property
+    def ymin(self) -> np.ndarray:
+        return self._data[:, 1]
+
+    @property
+    def xmax(self) -> np.ndarray:
+        return self._data[:, 0] + self._data[:, 2]
+
+    @property
+    def ymax(self) -> np.ndarray:
+        return self._data[:, 1] + self._data[:, 3]
+
+    @property
+    def area(self) -> np.ndarray:
+        return self._data[:, 2] * self._data[:, 3]
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        res = self._data.copy()
+        res[:, 2:] += res[:, :2]
+        return res
+
+    @property
+    def xywh(self) -> np.ndarray:
+        return self._data.copy()
+
+    @property
+    def openmmlabformat(self) -> np.ndarray:
+        return self.xyxy
+
+    def to_int(self):
+        self._data = self._data.astype(np.int64)
+
+    def to_float(self):
+        self._data = self._data.astype(np.float64)
+
+    def __len__(self):
+        return self._data.shape[0]
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return BBox(*self._data[item].tolist())
+        return self.__class__(self._data[item])
+
+    def __iter__(self):
+        for x, y, w, h in self._data.tolist():
+            yield BBox(x, y, w, h)
+
+    def visualize(self, image, palette, **kwargs):
+        draw_obj = ImageDraw.Draw(image)
+        color = (0, 255, 0)
+        for box in self.xyxy.tolist():
+            draw_obj.rectangle(box, outline=(*color, 255), width=2)
+        del draw_obj
+        return image
+
+    def __repr__(self):
+        return str(self.xyxy.tolist())
+
+    @property
+    def field_key(self):
+        return "BBoxArray"
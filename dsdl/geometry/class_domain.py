@@ -20,9 +20,13 @@ class ClassDomainMeta(type):
         cat2ind = {}
         for ind, label in enumerate(classes):
             label.set_domain(name)
+            if label.domain_name == name:  # 属于其他类别域的Label保留其在原类别域中的序号
+                label.set_index(ind + 1)
             mapping[label.name] = label
             cat2ind[label.name] = ind + 1
             LABEL.registry(label)
+        for label in classes:
+            label.build_parent_index()  # 所有类别都设置了类别域之后再计算父类别和祖先类别的集合
 
         attributes["__cat2ind_mapping__"] = cat2ind
         attributes["__mapping__"] = mapping
@@ -31,6 +35,8 @@ class ClassDomainMeta(type):
                     CLASSDOMAIN_ATTRIBUTES if attr_k in attributes}
         for attr_k in attr_dic:
             attr_dic[attr_k].set_domain(name)
+            if hasattr(attr_dic[attr_k], "set_labels"):
+                attr_dic[attr_k].set_labels(classes)
         attributes["__attributes__"] = attr_dic
 
         new_cls = super_new(mcs, name, bases, attributes)
@@ -65,6 +71,13 @@ class ClassDomain(metaclass=ClassDomainMeta):
     def get_cat2ind_mapping(cls):
         return getattr(cls, '__cat2ind_mapping__')
 
+    @classmethod
+    def get_index(cls, name):
+        """
+        1-based index of the category `name` in the domain, None if the category doesn't exist
+        """
+        return getattr(cls, '__cat2ind_mapping__').get(name, None)
+
     @classmethod
     def get_label(cls, name):
         if isinstance(name, str):
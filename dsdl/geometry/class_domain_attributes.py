@@ -1,3 +1,4 @@
+import numpy as np
 from .registry import CLASSDOMAIN
 
 
@@ -6,11 +7,25 @@ class Skeleton:
     def __init__(self, skeleton, domain_name=None):
         self._value = skeleton
         self._domain_name = domain_name
+        self._label_pairs = None
+        self._index_pairs = None
 
     def set_domain(self, domain_name):
         if self._domain_name is None:
             self._domain_name = domain_name
 
+    def set_labels(self, labels):
+        """
+        在定义类别域时预先计算骨架中每条连线对应的类别和关键点下标（从0开始）
+        """
+        try:
+            self._label_pairs = [[labels[ind - 1] for ind in ind_pair] for ind_pair in self._value]
+            self._index_pairs = np.asarray([[ind - 1 for ind in ind_pair] for ind_pair in self._value],
+                                           dtype=np.int64).reshape(len(self._value), -1)
+        except (IndexError, TypeError, ValueError):
+            # 非法的骨架定义在使用时再报错
+            self._label_pairs, self._index_pairs = None, None
+
     @property
     def domain_name(self):
         return self._domain_name
@@ -23,7 +38,18 @@ class Skeleton:
     def value(self):
         return self._value
 
+    @property
+    def index_pairs(self):
+        """
+        (N, 2) int64 array of 0-based keypoint indices of the skeleton lines
+        """
+        if self._index_pairs is None:
+            self.set_labels(self.class_domain.get_labels())
+        return self._index_pairs
+
     def get_label_pairs(self):
+        if self._label_pairs is not None:
+            return [list(_) for _ in self._label_pairs]
         res = []
         for ind_pair in self._value:
             _p = []
@@ -33,11 +59,7 @@ class Skeleton:
         return res
 
     def get_point_pairs(self, keypoints):
-        label_pairs = self.get_label_pairs()
-        res = []
-        for pair in label_pairs:
-            _p = []
-            for label in pair:
-                _p.append(keypoints[label.name])
-            res.append(_p)
-        return res
+        if self._index_pairs is None or not hasattr(keypoints, "keypoints"):
+            return [[keypoints[label.name] for label in pair] for pair in self.get_label_pairs()]
+        points = keypoints.keypoints
+        return [[points[ind] for ind in pair] for pair in self._index_pairs.tolist()]
@@ -3,15 +3,35 @@ from PIL import Image
 from ..exception import FileReadError
 from .utils import bytes_to_numpy
 import numpy as np
-import cv2
 
 from .base_geometry import BaseGeometry
 
 
+def _mark_boundary(edge_a, edge_b, ids_a, ids_b):
+    diff = ids_a != ids_b
+    a, b = ids_a[diff], ids_b[diff]
+    # 实例与背景相邻时，背景一侧的像素也标记为该实例的边界
+    edge_a[diff] = np.where(a != 0, a, b)
+    edge_b[diff] = np.where(b != 0, b, a)
+
+
+def instance_boundaries(ins_map):
+    """
+    Boundaries of all the instances in one vectorized pass: a pixel is on a boundary when one of its 4-neighbours has
+    a different instance id, the result has the instance id on the boundary pixels (0 elsewhere). Like a contour of
+    thickness 2, a boundary between an instance and the background covers the pixels on both sides.
+    """
+    edge_ids = np.zeros_like(ins_map)
+    _mark_boundary(edge_ids[:, :-1], edge_ids[:, 1:], ins_map[:, :-1], ins_map[:, 1:])
+    _mark_boundary(edge_ids[:-1], edge_ids[1:], ins_map[:-1], ins_map[1:])
+    return edge_ids
+
+
 class InstanceMap(BaseGeometry):
     """
     A Geometry class for instance segmentation map
     """
+    __slots__ = ("_loc", "_reader")
 
     def __init__(self, location, file_reader):
         self._loc = location
@@ -37,24 +57,25 @@ class InstanceMap(BaseGeometry):
             raise FileReadError(f"Failed to convert bytes to an array. {e}") from None
         return img
 
-    def to_array(self):
+    def to_array(self, draft=None):
         """
-        turn InstanceMap object to numpy.ndarray
+        turn InstanceMap object to numpy.ndarray, `draft` is an optional (width, height) for reduced-size JPEG decoding
         """
-        return bytes_to_numpy(self.to_bypes())
+        return bytes_to_numpy(self._reader.read(), draft=draft)
 
     def visualize(self, image, palette, **kwargs):
         ins_map = self.to_array()
-        color_map = np.zeros((ins_map.shape[0], ins_map[1], 3), dtype=np.uint8)
-        ins_ids = np.unique(ins_map)
-
-        for ins_id in ins_ids:
-            if ins_id == 0:
-                continue
-            contour_color = tuple(np.random.randint(0, 255, size=[3]))
-            this_map = (ins_map == ins_id).astype(np.uint8) * 255
-            _, contours, _ = cv2.findContours(this_map, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-            cv2.drawContours(color_map, contours, -1, contour_color, 2)
+        if ins_map.ndim == 3:
+            # 以颜色编码实例的map，将RGB合并为一个id
+            rgb = ins_map[..., :3].astype(np.int32)
+            ins_map = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+        color_map = np.zeros((ins_map.shape[0], ins_map.shape[1], 3), dtype=np.uint8)
+        edge_ids = instance_boundaries(ins_map)
+        edge = edge_ids != 0
+        # 每个实例一个随机颜色，只对边界像素查表着色
+        ins_ids, inverse = np.unique(edge_ids[edge], return_inverse=True)
+        colors = np.random.randint(0, 255, size=[len(ins_ids), 3]).astype(np.uint8)
+        color_map[edge] = colors[inverse.ravel()]
 
         overlay = Image.fromarray(color_map).convert("RGBA")
         overlayed = Image.blend(image, overlay, 0.5)
@@ -8,6 +8,7 @@ import numpy as np
 
 
 class Coord2D(BaseGeometry):
+    __slots__ = ("_x", "_y", "_visiable", "_label")
 
     def __init__(self, x: float, y: float, visiable: int, label: Label):
         self._x = x
@@ -49,6 +50,8 @@ class Coord2D(BaseGeometry):
 
 
 class KeyPoints(BaseGeometry):
+    __slots__ = ("_keypoints", "_dom")
+
     def __init__(self, keypoints: List[Coord2D], domain: ClassDomain):
         self._keypoints = keypoints
         self._dom = domain
@@ -82,9 +85,9 @@ class KeyPoints(BaseGeometry):
         if isinstance(item, int):
             return self._keypoints[item]
         elif isinstance(item, str):
-            for ind, label_name in enumerate(self._dom.get_label_names()):
-                if label_name == item:
-                    return self._keypoints[ind]
+            ind = self._dom.get_index(item)
+            if ind is not None:
+                return self._keypoints[ind - 1]
         raise ClassNotFoundError(f"Category '{item}' not defined in domain {self._dom.__name__}.")
 
     def visualize(self, image, palette, **kwargs):
@@ -6,11 +6,16 @@ from .base_geometry import BaseGeometry, FontMixin
 
 
 class Label(BaseGeometry, FontMixin):
+    __slots__ = ("_name", "_supercategories", "_domain_name", "_index", "_parent_names", "_ancestor_names")
 
     def __init__(self, name, supercategories=(), domain_name=None):
         self._name = name
         self._supercategories = [_ for _ in supercategories if isinstance(_, Label)]
         self._domain_name = domain_name
+        # 以下由ClassDomainMeta在定义类别域时预先计算
+        self._index = None  # 在类别域中的序号（从1开始）
+        self._parent_names = None  # 直接父类别的registry_name集合
+        self._ancestor_names = None  # 所有祖先类别的registry_name集合
 
     @property
     def supercategories(self):
@@ -57,20 +62,55 @@ class Label(BaseGeometry, FontMixin):
         return CLASSDOMAIN.get(self.domain_name)
 
     def index_in_domain(self):
+        if self._index is not None:
+            return self._index
         return self.class_domain.get_cat2ind_mapping()[self.category_name]
 
+    def set_index(self, index):
+        self._index = index
+
+    def build_parent_index(self):
+        """
+        precompute the registry names of the parents and of all the ancestors
+        """
+        self._parent_names = frozenset(_.registry_name for _ in self._supercategories)
+        self._ancestor_names = None
+        self._ancestor_names = self.ancestor_names
+
+    @property
+    def parent_names_set(self):
+        if self._parent_names is None:
+            return frozenset(_.registry_name for _ in self._supercategories)
+        return self._parent_names
+
+    @property
+    def ancestor_names(self):
+        """
+        registry names of all the ancestors (parents, parents of parents, ...) of the label
+        """
+        if self._ancestor_names is None:
+            res, stack = set(), list(self._supercategories)
+            while stack:
+                label = stack.pop()
+                if label.registry_name not in res:
+                    res.add(label.registry_name)
+                    stack.extend(label.parents)
+            self._ancestor_names = frozenset(res)
+        return self._ancestor_names
+
+    def is_subcategory_of(self, other):
+        return other.registry_name in self.ancestor_names
+
     def __eq__(self, other):
-        if self.domain_name != other.domain_name:
-            return False
-        if self.name != other.name:
-            return False
-        if len(self.parents) != len(self.parents):
-            return False
-        for p1 in self.parents:
-            for p2 in other.parents:
-                if p1 != p2:
-                    return False
-        return True
+        if not isinstance(other, Label):
+            return NotImplemented
+        if self is other:
+            return True
+        return self._domain_name == other._domain_name and self._name == other._name and \
+            self.parent_names_set == other.parent_names_set
+
+    def __hash__(self):
+        return hash((self._domain_name, self._name))
 
     def visualize(self, image, palette, **kwargs):
         draw_obj = ImageDraw.Draw(image)
@@ -79,7 +119,7 @@ class Label(BaseGeometry, FontMixin):
         color = palette[self.category_name]
         if self.font is None:
             self.set_font(ImageFont.truetype(os.path.join(os.path.dirname(__file__), "source", "Arial_Font.ttf")))
-        label_size = draw_obj.textsize(self.category_name, self.font)
+        label_size = self.text_size(draw_obj, self.category_name)
         if "bbox" in kwargs:
             coords = np.array([[item.xyxy[0], item.xyxy[1] + 0.2 * label_size[1]] for item in kwargs["bbox"].values()])
         elif "polygon" in kwargs:
@@ -102,6 +142,7 @@ class Label(BaseGeometry, FontMixin):
 
 
 class LabelList(BaseGeometry, FontMixin):
+    __slots__ = ("_label_list",)
 
     def __init__(self, label_list):
         self._label_list = list(label_list)
@@ -135,7 +176,7 @@ class LabelList(BaseGeometry, FontMixin):
                 palette[category_name] = tuple(np.random.randint(0, 255, size=[3]))
             color = palette[category_name]
 
-            label_size = draw_obj.textsize(category_name, self.font)
+            label_size = self.text_size(draw_obj, category_name)
             if "bbox" in kwargs:
                 # coords.shape = [num_box, 2]
                 coords = y_offset + np.array(
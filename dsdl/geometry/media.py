@@ -6,6 +6,7 @@ from .utils import bytes_to_numpy
 
 
 class ImageMedia(BaseGeometry):
+    __slots__ = ("_loc", "_reader")
 
     def __init__(self, location, file_reader):
         self._loc = location
@@ -31,11 +32,11 @@ class ImageMedia(BaseGeometry):
             raise FileReadError(f"Failed to convert bytes to an array. {e}") from None
         return img
 
-    def to_array(self):
+    def to_array(self, draft=None):
         """
-        turn ImageMedia object to numpy.ndarray
+        turn ImageMedia object to numpy.ndarray, `draft` is an optional (width, height) for reduced-size JPEG decoding
         """
-        return bytes_to_numpy(self.to_bytes())
+        return bytes_to_numpy(self._reader.read(), draft=draft)
 
     def __repr__(self):
         return f"path:{self.location}"
@@ -2,9 +2,11 @@ from typing import List, overload
 import numpy as np
 from PIL import ImageDraw, Image
 from .base_geometry import BaseGeometry
+from . import rle
 
 
 class PolygonItem(BaseGeometry):
+    __slots__ = ("_data",)
 
     def __init__(
             self,
@@ -52,6 +54,7 @@ class PolygonItem(BaseGeometry):
 
 
 class Polygon(BaseGeometry):
+    __slots__ = ("_data",)
 
     def __init__(self, polygons: List[PolygonItem]):
         self._data = polygons
@@ -103,13 +106,44 @@ class Polygon(BaseGeometry):
 
 
 class RLEPolygon(BaseGeometry):
-    def __init__(self, rle_data, image_shape):
+    __slots__ = ("_rle_data", "_image_shape", "_rle_format")
+    START_LENGTH = "start-length"
+    COCO = "coco"
+
+    def __init__(self, rle_data, image_shape, rle_format=None):
         """
         rle_data: rle list
         image_shape: [H, W]
+        rle_format: "start-length" (1-based start/length pairs on the row-major image, default for list data) or
+            "coco" (coco counts on the column-major image, default for compressed string data)
         """
         self._rle_data = rle_data
         self._image_shape = image_shape
+        if rle_format is None:
+            rle_format = self.COCO if isinstance(rle_data, (str, bytes)) else self.START_LENGTH
+        assert rle_format in (self.START_LENGTH, self.COCO), f"invalid rle format '{rle_format}'."
+        self._rle_format = rle_format
+
+    @classmethod
+    def from_mask(cls, mask, rle_format=START_LENGTH):
+        mask = np.asarray(mask)
+        if rle_format == cls.COCO:
+            return cls(rle.encode_counts(mask), list(mask.shape[:2]), rle_format)
+        return cls(rle.encode_starts_lengths(mask), list(mask.shape[:2]), rle_format)
+
+    @staticmethod
+    def batch_mask(rle_polygons):
+        """
+        decode a list of RLEPolygon with the same image shape into one (N, H, W) uint8 array.
+        """
+        if len(rle_polygons) == 0:
+            return np.zeros((0, 0, 0), dtype=np.uint8)
+        shape = rle_polygons[0].image_shape
+        if all(_.rle_format == RLEPolygon.COCO for _ in rle_polygons):
+            masks = rle.decode_counts_batch([_.rle_data for _ in rle_polygons], shape)
+        else:
+            masks = np.stack([_.bool_mask for _ in rle_polygons])
+        return masks.view(np.uint8)
 
     @property
     def rle_data(self):
@@ -119,6 +153,16 @@ class RLEPolygon(BaseGeometry):
     def image_shape(self):
         return self._image_shape
 
+    @property
+    def rle_format(self):
+        return self._rle_format
+
+    @property
+    def bool_mask(self):
+        if self._rle_format == self.COCO:
+            return rle.decode_counts(self._rle_data, self._image_shape)
+        return rle.decode_starts_lengths(self._rle_data, self._image_shape)
+
     @property
     def mask(self):
         '''
@@ -127,27 +171,36 @@ class RLEPolygon(BaseGeometry):
         shape: (height,width) of array to return
         Returns numpy array, 1 - mask, 0 - background
         '''
-        s = self._rle_data
-        shape = self._image_shape
-        starts, lengths = [np.asarray(x, dtype=int) for x in (s[0:][::2], s[1:][::2])]
-        starts -= 1
-        ends = starts + lengths
-        img = np.zeros(shape[0] * shape[1], dtype=np.uint8)
-        for lo, hi in zip(starts, ends):
-            img[lo:hi] = 1
-        return img.reshape(shape)
+        return np.ascontiguousarray(self.bool_mask).view(np.uint8)
+
+    @property
+    def area(self):
+        if self._rle_format == self.COCO:
+            return rle.counts_area(self._rle_data)
+        return rle.starts_lengths_area(self._rle_data, self._image_shape)
+
+    @property
+    def bbox(self):
+        """
+        [x, y, w, h] computed from the runs directly, without decoding the mask.
+        """
+        if self._rle_format == self.COCO:
+            return rle.counts_bbox(self._rle_data, self._image_shape)
+        return rle.starts_lengths_bbox(self._rle_data, self._image_shape)
 
     @property
     def openmmlabformat(self):
-        return {"counts": self.rle_data, "size": self.image_shape}
+        if self._rle_format == self.COCO:
+            return {"counts": self.rle_data, "size": self.image_shape}
+        return {"counts": rle.encode_counts(self.bool_mask), "size": self.image_shape}
 
     def point_for_draw(self, mode: str = "lt") -> [int, int]:
         pass
 
     def visualize(self, image, palette, **kwargs):
         color = (0, 255, 0)
-        mask = self.mask
-        color_seg = np.array((mask.shape[0], mask.shape[1], 3), dtype=np.uint8)
+        mask = self.bool_mask
+        color_seg = np.zeros((mask.shape[0], mask.shape[1], 3), dtype=np.uint8)
 
         if "label" in kwargs:
             for label in kwargs["label"].values():
@@ -155,7 +208,7 @@ class RLEPolygon(BaseGeometry):
                     palette[label.category_name] = tuple(np.random.randint(0, 255, size=[3]))
 
                 color = palette[label.category_name]
-        color_seg[mask == 1, :] = np.array(color)
+        color_seg[mask, :] = np.array(color)
         overlay = Image.fromarray(color_seg).convert("RGBA")
         overlayed = Image.blend(image, overlay, 0.5)
         return overlayed
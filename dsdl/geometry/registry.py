@@ -24,6 +24,9 @@ class Registry:
             raise ClassNotFoundError(f"Class '{name}' is not defined.")
         return self._map[name]
 
+    def unregister(self, name):
+        self._map.pop(name, None)
+
     def clear(self):
         self._map = {}
 
@@ -57,6 +60,9 @@ class LabelRegistry:
         else:
             return False
 
+    def unregister(self, registry_name):
+        self._labels.pop(registry_name, None)
+
     def clear(self):
         self._labels = {}
 
@@ -0,0 +1,192 @@
+"""
+Vectorized run-length encoding utilities for binary masks.
+
+Two kinds of run-length data are supported:
+
+- start-length: ``[start1, length1, start2, length2, ...]`` with 1-based starts on the row-major flattened mask
+  (the format used by `RLEPolygon` by default);
+- coco counts: alternating background/foreground run lengths on the column-major flattened mask, starting with a
+  background run, either as a list of ints or as the compressed string used by pycocotools.
+
+All decoders work on whole arrays (``np.repeat``/``np.cumsum``), no python loop over the runs is involved.
+"""
+from typing import List, Sequence, Tuple, Union
+import numpy as np
+
+_RLE = Union[Sequence[int], np.ndarray, str, bytes]
+
+
+def string_to_counts(s: Union[str, bytes]) -> np.ndarray:
+    """
+    Decode the compressed coco counts string (see `rleFrString` in pycocotools' maskApi.c).
+    """
+    if isinstance(s, str):
+        s = s.encode("ascii")
+    counts = []
+    p, n = 0, len(s)
+    while p < n:
+        x, k, more = 0, 0, True
+        while more:
+            c = s[p] - 48
+            x |= (c & 0x1f) << (5 * k)
+            more = bool(c & 0x20)
+            p += 1
+            k += 1
+            if not more and (c & 0x10):
+                x |= -1 << (5 * k)
+        if len(counts) > 2:
+            x += counts[-2]
+        counts.append(x)
+    return np.asarray(counts, dtype=np.int64)
+
+
+def counts_to_string(counts: Sequence[int]) -> str:
+    """
+    Encode coco counts to the compressed string (see `rleToString` in pycocotools' maskApi.c).
+    """
+    counts = [int(_) for _ in counts]
+    res = []
+    for i, x in enumerate(counts):
+        if i > 2:
+            x -= counts[i - 2]
+        more = True
+        while more:
+            c = x & 0x1f
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            if more:
+                c |= 0x20
+            res.append(chr(c + 48))
+    return "".join(res)
+
+
+def _as_counts(counts: _RLE) -> np.ndarray:
+    if isinstance(counts, (str, bytes)):
+        return string_to_counts(counts)
+    return np.asarray(counts, dtype=np.int64)
+
+
+def decode_counts(counts: _RLE, shape: Sequence[int]) -> np.ndarray:
+    """
+    Decode coco counts to a (H, W) bool mask.
+    """
+    h, w = shape[:2]
+    counts = _as_counts(counts)
+    if counts.sum() != h * w:
+        raise ValueError(f"the sum of rle counts ({counts.sum()}) doesn't match the image shape {(h, w)}.")
+    values = np.arange(len(counts)) % 2 == 1
+    return np.repeat(values, counts).reshape(w, h).T
+
+
+def decode_counts_batch(counts_list: Sequence[_RLE], shape: Sequence[int]) -> np.ndarray:
+    """
+    Decode several coco counts of the same image shape into a single (N, H, W) bool array.
+    """
+    h, w = shape[:2]
+    if len(counts_list) == 0:
+        return np.zeros((0, h, w), dtype=bool)
+    counts_list = [_as_counts(_) for _ in counts_list]
+    lengths = np.array([len(_) for _ in counts_list])
+    counts = np.concatenate(counts_list)
+    if counts.sum() != h * w * len(counts_list):
+        raise ValueError(f"the sum of rle counts doesn't match the image shape {(h, w)}.")
+    # 每个rle都从背景开始，所以奇偶性需要在每个rle内部计算
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    values = (np.arange(len(counts)) - offsets) % 2 == 1
+    return np.repeat(values, counts).reshape(len(counts_list), w, h).transpose(0, 2, 1)
+
+
+def encode_counts(mask: np.ndarray) -> List[int]:
+    """
+    Encode a (H, W) mask to coco counts.
+    """
+    pixels = np.asarray(mask, dtype=bool).ravel(order="F")
+    if pixels.size == 0:
+        return []
+    change = np.flatnonzero(pixels[1:] != pixels[:-1]) + 1
+    bounds = np.concatenate(([0], change, [pixels.size]))
+    counts = np.diff(bounds).tolist()
+    if pixels[0]:
+        counts = [0] + counts
+    return counts
+
+
+def _split_starts_lengths(rle: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    rle = np.asarray(rle, dtype=np.int64)
+    return rle[0::2] - 1, rle[1::2]
+
+
+def decode_starts_lengths(rle: Sequence[int], shape: Sequence[int]) -> np.ndarray:
+    """
+    Decode 1-based start-length pairs on the row-major flattened image to a (H, W) bool mask.
+    """
+    h, w = shape[:2]
+    n = h * w
+    starts, lengths = _split_starts_lengths(rle)
+    ends = np.minimum(starts + lengths, n)
+    delta = np.bincount(starts, minlength=n + 1)[:n + 1] - np.bincount(ends, minlength=n + 1)[:n + 1]
+    return (np.cumsum(delta[:n]) > 0).reshape(h, w)
+
+
+def encode_starts_lengths(mask: np.ndarray) -> List[int]:
+    """
+    Encode a (H, W) mask to 1-based start-length pairs on the row-major flattened image.
+    """
+    pixels = np.concatenate(([False], np.asarray(mask, dtype=bool).ravel(), [False]))
+    change = np.flatnonzero(pixels[1:] != pixels[:-1])
+    starts, ends = change[0::2], change[1::2]
+    res = np.empty(len(starts) * 2, dtype=np.int64)
+    res[0::2] = starts + 1
+    res[1::2] = ends - starts
+    return res.tolist()
+
+
+def _runs_bbox(starts: np.ndarray, ends: np.ndarray, minor: int, column_major: bool) -> List[float]:
+    """
+    bbox [x, y, w, h] of the foreground runs [starts, ends) on a flattened image whose lines have `minor` pixels.
+    """
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return [0., 0., 0., 0.]
+    line_lo, line_hi = starts // minor, (ends - 1) // minor
+    single = line_lo == line_hi
+    # 跨越多行（列）的run一定同时覆盖了行（列）首和行（列）尾
+    pos_lo = np.where(single, starts % minor, 0)
+    pos_hi = np.where(single, (ends - 1) % minor, minor - 1)
+    lo, hi = (line_lo.min(), line_hi.max()), (pos_lo.min(), pos_hi.max())
+    if column_major:
+        (x0, x1), (y0, y1) = lo, hi
+    else:
+        (y0, y1), (x0, x1) = lo, hi
+    return [float(x0), float(y0), float(x1 - x0 + 1), float(y1 - y0 + 1)]
+
+
+def counts_area(counts: _RLE) -> int:
+    return int(_as_counts(counts)[1::2].sum())
+
+
+def counts_bbox(counts: _RLE, shape: Sequence[int]) -> List[float]:
+    h, w = shape[:2]
+    counts = _as_counts(counts)
+    bounds = np.cumsum(counts)
+    starts, ends = bounds[0::2], bounds[1::2]
+    return _runs_bbox(starts[:len(ends)], ends, h, column_major=True)
+
+
+def starts_lengths_area(rle: Sequence[int], shape: Sequence[int]) -> int:
+    h, w = shape[:2]
+    starts, lengths = _split_starts_lengths(rle)
+    if len(starts) == 0:
+        return 0
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], np.minimum(starts + lengths, h * w)[order]
+    # 按起点排序后，每个run只有超出之前所有run的最远终点的部分才计入面积（允许run之间重叠）
+    covered = np.concatenate(([starts[0]], np.maximum.accumulate(ends)[:-1]))
+    return int(np.maximum(ends - np.maximum(starts, covered), 0).sum())
+
+
+def starts_lengths_bbox(rle: Sequence[int], shape: Sequence[int]) -> List[float]:
+    h, w = shape[:2]
+    starts, lengths = _split_starts_lengths(rle)
+    return _runs_bbox(starts, np.minimum(starts + lengths, h * w), w, column_major=False)
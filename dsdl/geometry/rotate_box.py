@@ -6,6 +6,8 @@ from PIL import Image, ImageDraw
 
 
 class RBBox(BaseGeometry):
+    __slots__ = ("_polygon", "_rbbox")
+
     def __init__(self, value, mode):
         assert mode in ("xywht", "xyxy")
         if mode == "xywht":
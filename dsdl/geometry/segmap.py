@@ -9,10 +9,20 @@ from .box import BBox
 from .class_domain import _LabelMapDefaultDomain
 
 
+def _present_values(seg):
+    """
+    sorted values present in an integer map, counted in one pass when the values are small enough
+    """
+    if seg.size and seg.dtype.kind in "ui" and seg.min() >= 0 and seg.max() < (1 << 20):
+        return np.flatnonzero(np.bincount(seg.ravel()))
+    return np.unique(seg)
+
+
 class SegmentationMap(BaseGeometry):
     """
     A Geometry class for semantic segmentation map.
     """
+    __slots__ = ("_loc", "_reader", "_dom")
 
     def __init__(self, location, file_reader, dom):
         self._loc = location
@@ -45,28 +55,35 @@ class SegmentationMap(BaseGeometry):
             raise FileReadError(f"Failed to convert bytes to an array. {e}") from None
         return img
 
-    def to_array(self):
+    def to_array(self, draft=None):
         """
-        turn SegmentationMap object to numpy.ndarray
+        turn SegmentationMap object to numpy.ndarray, `draft` is an optional (width, height) for reduced-size JPEG decoding
         """
-        return bytes_to_numpy(self.to_bytes())
+        return bytes_to_numpy(self._reader.read(), draft=draft)
 
     def visualize(self, image, palette, **kwargs):
         seg = self.to_array()
-        color_seg = np.zeros((seg.shape[0], seg.shape[1], 3), dtype=np.uint8)
-        category_ids = np.unique(seg)
-        if self.class_domain.__name__ == "_LabelMapDefaultDomain":
-            category_ids = category_ids + 1
+        if seg.ndim == 3:
+            # 以RGB保存的标签图各通道的值相同，取第一个通道
+            seg = seg[..., 0]
+        # 默认类别域中像素值0为background（即第1个类别），其他类别域中像素值即为类别的序号（从1开始）
+        offset = 1 if self.class_domain.__name__ == "_LabelMapDefaultDomain" else 0
+        pixel_ids = _present_values(seg)
+        # 查找表的最后一行保持为黑色，用于负的像素值
+        lut = np.zeros((max(int(pixel_ids[-1]), 0) + 2 if len(pixel_ids) else 1, 3), dtype=np.uint8)
         label_lst = []
-        for category_id in category_ids:
-            if int(category_id) > len(self._dom) or int(category_id) < 1:
+        for pixel_id in pixel_ids:
+            category_id = int(pixel_id) + offset
+            if category_id > len(self._dom) or category_id < 1:
                 continue
-            label = self._dom.get_label(int(category_id))
+            label = self._dom.get_label(category_id)
             category_name = label.category_name
             if category_name not in palette:
                 palette[category_name] = tuple(np.random.randint(0, 255, size=[3]))
             label_lst.append(label)
-            color_seg[seg == category_id, :] = np.array(palette[category_name])
+            lut[pixel_id] = palette[category_name]
+        # 通过查找表一次完成所有类别的着色
+        color_seg = lut[np.where(seg < 0, -1, seg)] if seg.dtype.kind == "i" else lut[seg]
         overlay = Image.fromarray(color_seg).convert("RGBA")
         overlayed = Image.blend(image, overlay, 0.5)
         LabelList(label_lst).visualize(image=overlayed, palette=palette, bbox={"temp": BBox(0, 0, 0, 0)})
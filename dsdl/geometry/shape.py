@@ -2,6 +2,8 @@ from .base_geometry import BaseGeometry
 
 
 class Shape(BaseGeometry):
+    __slots__ = ("_media_type", "_value", "_mode")
+
     def __init__(self, value, mode, media):
         media = media.lower()
         mode = mode.lower()
@@ -26,6 +28,8 @@ class Shape(BaseGeometry):
 
 
 class ImageShape(Shape):
+    __slots__ = ("_height", "_width")
+
     def __init__(self, value, mode="hw"):
         assert mode.lower() in ("hw", "wh")
         super(ImageShape, self).__init__(value, mode.lower(), "image")
@@ -5,6 +5,8 @@ import os
 
 
 class Text(BaseGeometry, FontMixin):
+    __slots__ = ("_text",)
+
     def __init__(self, text):
         self._text = text
 
@@ -21,7 +23,7 @@ class Text(BaseGeometry, FontMixin):
         text_color = (0, 255, 0)  # green
         if self.font is None:
             self.set_font(ImageFont.truetype(os.path.join(os.path.dirname(__file__), "source", "Arial_Font.ttf")))
-        label_size = draw_obj.textsize(self.value, self.font)
+        label_size = self.text_size(draw_obj, self.value)
         if "bbox" in kwargs:
             coords = np.array([[item.xyxy[0], item.xyxy[3] - 1.2 * label_size[1]] for item in kwargs["bbox"].values()])
         elif "polygon" in kwargs:
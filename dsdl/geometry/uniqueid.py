@@ -2,6 +2,7 @@ from .base_geometry import BaseGeometry
 
 
 class UniqueID(BaseGeometry):
+    __slots__ = ("_value", "_field_key")
 
     def __init__(self, value, field_key):
         self._value = value
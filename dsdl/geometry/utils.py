@@ -1,8 +1,10 @@
+import os
 import numpy as np
 from PIL import Image, ExifTags
-from typing import Tuple, Any
+from typing import Tuple, Union, Optional, Callable
 import io
 from ..exception import FileReadError
+from .. import instrumentation
 
 
 def get_image_rotation(image: Image) -> int:
@@ -24,12 +26,87 @@ def get_image_rotation(image: Image) -> int:
         return 0
 
 
-def bytes_to_numpy(bytes_: io.BytesIO) -> np.ndarray:  # type: ignore[type-arg]
+_JPEG_MAGIC = b"\xff\xd8"
+_SUPPORTED_MODES = ("RGB", "RGBA", "P", "I", "L", "LA")
+
+
+def _to_buffer(bytes_: Union[bytes, bytearray, memoryview, io.IOBase]) -> Union[bytes, bytearray, memoryview]:
+    if isinstance(bytes_, (bytes, bytearray, memoryview)):
+        return bytes_
+    if isinstance(bytes_, io.BytesIO):
+        return bytes_.getbuffer()
+    return bytes_.read()
+
+
+def _pil_decode(buffer, draft: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    try:
+        image = Image.open(io.BytesIO(buffer))
+        if draft is not None and image.format == "JPEG":
+            # JPEG可以在解码时直接按1/2、1/4、1/8缩小（DCT scaling），得到不小于draft尺寸的图像
+            image.draft(image.mode, tuple(draft))
+        image.load()
+    except Exception as e:
+        raise FileReadError(f"Failed to convert bytes to an array. {e}") from None
+    rotation = get_image_rotation(image)
+    if rotation:
+        image = image.rotate(rotation, expand=True)
+    if image.mode not in _SUPPORTED_MODES:
+        raise FileReadError("Currently unsupported image type")
+    # 通过array interface整块拷贝像素数据，而不是逐像素构造python序列
+    return np.array(image)
+
+
+def _cv2_decode(buffer, draft: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    if draft is not None or bytes(buffer[:2]) != _JPEG_MAGIC:
+        return _pil_decode(buffer, draft)
+    import cv2
+    # IMREAD_ANYCOLOR保持灰度图为单通道，并按照exif信息旋转图像
+    image = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), cv2.IMREAD_ANYCOLOR)
+    if image is None:
+        return _pil_decode(buffer, draft)
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return image
+
+
+_IMAGE_DECODERS = {
+    "pil": _pil_decode,
+    "cv2": _cv2_decode,
+}
+_IMAGE_BACKEND = {"name": os.environ.get("DSDL_IMAGE_BACKEND", "pil")}
+
+
+def register_image_decoder(name: str, decoder: Callable[..., np.ndarray]):
+    """
+    Register an image decoder, the decoder is called as `decoder(buffer, draft=None)` and returns a numpy array
+    in RGB order.
+    """
+    _IMAGE_DECODERS[name] = decoder
+
+
+def set_image_backend(name: str):
+    """
+    Set the default image decoder used by `bytes_to_numpy` ("pil" or "cv2" by default), the initial value can also be
+    given by the environment variable `DSDL_IMAGE_BACKEND`.
+    """
+    if name not in _IMAGE_DECODERS:
+        raise ValueError(f"Unknown image backend '{name}', available backends: {list(_IMAGE_DECODERS)}.")
+    _IMAGE_BACKEND["name"] = name
+
+
+def get_image_backend() -> str:
+    return _IMAGE_BACKEND["name"]
+
+
+def bytes_to_numpy(bytes_: Union[bytes, bytearray, memoryview, io.IOBase], draft: Optional[Tuple[int, int]] = None,
+                   backend: Optional[str] = None) -> np.ndarray:  # type: ignore[type-arg]
     """
     Transfer bytes into numpy array.
 
     Arguments:
-        bytes_: The bytes to transfer.
+        bytes_: The bytes (or a file-like object) to transfer.
+        draft: Optional (width, height), JPEG images are decoded at the smallest reduced scale not smaller than it.
+        backend: The image decoder to use, default to the one set by `set_image_backend`.
 
     Raises:
         FileReadError: When `bytes_` cannot be loaded as an image.
@@ -37,32 +114,9 @@ def bytes_to_numpy(bytes_: io.BytesIO) -> np.ndarray:  # type: ignore[type-arg]
     Returns:
         The transferred numpy array.
     """
-    try:
-        image = Image.open(bytes_)
-    except Exception as e:
-        raise FileReadError(f"Failed to convert bytes to an array. {e}") from None
-    rotation = get_image_rotation(image)
-    if rotation:
-        image = image.rotate(rotation, expand=True)
-    if image.mode == "RGB":
-        shape: Tuple[int, ...] = (image.size[1], image.size[0], 3)
-        dtype: Any = np.uint8
-    elif image.mode == "RGBA":
-        shape: Tuple[int, ...] = (image.size[1], image.size[0], 4)
-        dtype: Any = np.uint8
-    elif image.mode == "P":
-        shape = (image.size[1], image.size[0])
-        dtype = np.uint8
-    elif image.mode == "I":
-        shape = (image.size[1], image.size[0])
-        dtype = np.int32
-    elif image.mode == "L":
-        shape = (image.size[1], image.size[0])
-        dtype = np.uint8
-    elif image.mode == "LA":
-        shape = (image.size[1], image.size[0], 2)
-        dtype = np.uint8
-    else:
-        raise FileReadError("Currently unsupported image type")
-    image_ = np.array(image.getdata(), dtype=dtype).reshape(*shape)
-    return image_
+    backend = backend or _IMAGE_BACKEND["name"]
+    decoder = _IMAGE_DECODERS[backend]
+    if instrumentation.active() is None:
+        return decoder(_to_buffer(bytes_), draft=draft)
+    with instrumentation.timer("decode." + backend):
+        return decoder(_to_buffer(bytes_), draft=draft)
@@ -0,0 +1,244 @@
+"""
+Opt-in instrumentation of the dataset loading pipeline.
+
+Nothing is recorded unless a recorder is active, the hooks in the SDK then only cost a global lookup::
+
+    from dsdl import instrumentation
+
+    with instrumentation.instrument() as rec:
+        dataset = DSDLDataset(dsdl_yaml, location_config)
+        for sample in dataset:
+            sample.image[0].to_array()
+    print(rec.to_json(indent=2))
+
+Three kinds of metrics are recorded:
+
+- timers: wall time of a stage (count, total, min, max and a latency histogram), e.g. `dsdl_dataset.parse`,
+  `dataset.load_sample`, `reader.LocalFileReader.read`, `decode.pil`;
+- counters: e.g. `dataset.samples`, `reader.LocalFileReader.bytes`, `reader.AwsOSSFileReader.retries`;
+- hooks: callables registered with `add_hook` are called as `hook(kind, name, value)` (kind is "timer" or "counter")
+  for every event while a recorder is active, e.g. to forward the metrics to another monitoring system.
+
+The recorder is process-wide and thread-safe (the readers are used from thread pools), each DataLoader worker process
+has its own recorder, `Recorder.merge` combines the exported dicts.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# 延迟直方图的桶上界（秒）：10us起按2倍递增到约84s，最后一个桶记录更大的值
+HISTOGRAM_BOUNDS = tuple(1e-5 * 2 ** i for i in range(24))
+
+_RECORDER = None
+_HOOKS = []
+
+
+class Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS, value)] += 1
+
+    def percentile(self, q):
+        """
+        approximate percentile (the upper bound of the bucket containing it), `q` in [0, 100]
+        """
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(HISTOGRAM_BOUNDS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {("%g" % bound if i < len(HISTOGRAM_BOUNDS) else "inf"): n
+                        for i, (bound, n) in enumerate(zip(HISTOGRAM_BOUNDS + (None,), self.buckets)) if n},
+        }
+
+
+class Recorder:
+    """
+    Collect the timers and counters, see the module docstring.
+    """
+
+    def __init__(self):
+        self.timers: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.created = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            hist = self.timers.get(name)
+            if hist is None:
+                hist = self.timers[name] = Histogram()
+            hist.observe(seconds)
+        for hook in _HOOKS:
+            hook("timer", name, seconds)
+
+    def add(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        for hook in _HOOKS:
+            hook("counter", name, value)
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "wall_time": time.time() - self.created,
+                "timers": {k: v.to_dict() for k, v in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self, path: Optional[str] = None, **kwargs):
+        """
+        return the metrics as a json string, also write it to `path` if given
+        """
+        res = json.dumps(self.to_dict(), **kwargs)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(res)
+        return res
+
+    @staticmethod
+    def merge(*dicts):
+        """
+        merge the results of `to_dict` (e.g. from several DataLoader workers), the percentiles are not kept
+        """
+        res = {"wall_time": 0., "timers": {}, "counters": {}}
+        for d in dicts:
+            res["wall_time"] = max(res["wall_time"], d["wall_time"])
+            for k, v in d["counters"].items():
+                res["counters"][k] = res["counters"].get(k, 0) + v
+            for k, v in d["timers"].items():
+                t = res["timers"].setdefault(k, {"count": 0, "total": 0., "min": None, "max": None, "buckets": {}})
+                t["count"] += v["count"]
+                t["total"] += v["total"]
+                t["min"] = v["min"] if t["min"] is None else min(t["min"], v["min"])
+                t["max"] = v["max"] if t["max"] is None else max(t["max"], v["max"])
+                for b, n in v["buckets"].items():
+                    t["buckets"][b] = t["buckets"].get(b, 0) + n
+        for t in res["timers"].values():
+            t["mean"] = t["total"] / t["count"] if t["count"] else None
+        return res
+
+
+class _Timer:
+    __slots__ = ("_recorder", "_name", "_start")
+
+    def __init__(self, recorder, name):
+        self._recorder = recorder
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._recorder.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def active() -> Optional[Recorder]:
+    """
+    the active recorder, None when the instrumentation is off
+    """
+    return _RECORDER
+
+
+def enable(recorder: Optional[Recorder] = None) -> Recorder:
+    global _RECORDER
+    _RECORDER = recorder if recorder is not None else Recorder()
+    return _RECORDER
+
+
+def disable():
+    global _RECORDER
+    _RECORDER = None
+
+
+@contextmanager
+def instrument(recorder: Optional[Recorder] = None):
+    """
+    record the metrics within the block, the previous recorder (if any) is restored afterwards
+    """
+    global _RECORDER
+    previous = _RECORDER
+    recorder = enable(recorder)
+    try:
+        yield recorder
+    finally:
+        _RECORDER = previous
+
+
+def timer(name: str):
+    """
+    `with timer(name): ...` records the wall time of the block, a no-op when the instrumentation is off
+    """
+    recorder = _RECORDER
+    if recorder is None:
+        return _NULL_TIMER
+    return _Timer(recorder, name)
+
+
+def count(name: str, value=1):
+    recorder = _RECORDER
+    if recorder is not None:
+        recorder.add(name, value)
+
+
+def add_hook(hook: Callable[[str, str, float], None]):
+    """
+    register `hook(kind, name, value)`, called for every event while a recorder is active
+    """
+    _HOOKS.append(hook)
+    return hook
+
+
+def remove_hook(hook: Callable[[str, str, float], None]):
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
@@ -3,6 +3,7 @@ from .ali_oss import AliOSSFileReader
 from .base import BaseFileReader
 from .ceph import CephFileReader, PetrelFileReader
 from .aws_oss import AwsOSSFileReader
+from .cache import CachingFileReader
 
 __all__ = [
     "LocalFileReader",
@@ -11,4 +12,5 @@ __all__ = [
     "CephFileReader",
     "PetrelFileReader",
     "AwsOSSFileReader",
+    "CachingFileReader",
 ]
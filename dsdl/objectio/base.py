@@ -1,4 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from typing import List, Sequence
+
+
+class BytesWrapper:
+    def __init__(self, value):
+        self.value = value
+
+    def read(self):
+        return self.value
 
 
 class BaseFileReader:
@@ -9,3 +19,19 @@ class BaseFileReader:
     @contextmanager
     def load(self, file):
         raise NotImplementedError
+
+    def read(self, file) -> bytes:
+        """
+        read the whole content of the file
+        """
+        with self.load(file) as f:
+            return f.read()
+
+    def load_many(self, files: Sequence[str], max_workers: int = 8) -> List[bytes]:
+        """
+        read several files concurrently with a thread pool, the contents are returned in the order of `files`
+        """
+        if max_workers is None or max_workers <= 1 or len(files) <= 1:
+            return [self.read(_) for _ in files]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+            return list(executor.map(self.read, files))
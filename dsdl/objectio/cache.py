@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Sequence, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+from .base import BaseFileReader, BytesWrapper
+
+_DATA_SUFFIX = ".bin"
+_META_SUFFIX = ".json"
+
+
+class CachingFileReader(BaseFileReader):
+    """
+    为任意BaseFileReader增加内存+磁盘两级的读缓存，可以直接在location_config中配置，如：
+
+        dict(
+            type="CachingFileReader",
+            reader=dict(type="AwsOSSFileReader", working_dir=..., bucket_name=..., ...),
+            memory_size=512 * 1024 ** 2,
+            disk_dir="/tmp/dsdl_cache",
+            disk_size=50 * 1024 ** 3,
+        )
+
+    - 内存层：每个进程独立的LRU，按字节数限制大小；
+    - 磁盘层：同一台机器上的多个进程（如DataLoader的多个worker）共享，文件先写入临时文件再原子地重命名，
+      超过`disk_size`时在文件锁的保护下按最近访问时间淘汰（只计算本进程写入的增量，其他进程写入的部分在淘汰扫描时计入）；
+    - 每个缓存文件有一个记录size（以及可选的etag）的元信息文件，读取时校验文件大小，
+      `validate_remote=True`时还会通过被包装reader的`stat`方法校验远端对象的size/etag是否发生变化。
+      默认每次命中磁盘缓存都要请求一次`stat`（对象存储上即一次HEAD请求），`validate_ttl`秒内校验过的缓存项不再重复校验。
+    """
+
+    def __init__(self, reader: Union[dict, BaseFileReader], memory_size: int = 256 * 1024 ** 2,
+                 disk_dir: Optional[str] = None, disk_size: int = 10 * 1024 ** 3, validate_remote: bool = False,
+                 validate_ttl: float = 0):
+        if isinstance(reader, dict):
+            from .. import objectio
+            reader = reader.copy()
+            reader = getattr(objectio, reader.pop("type"))(**reader)
+        super().__init__(reader.working_dir)
+        self.reader = reader
+        self.memory_size = memory_size
+        self.disk_dir = disk_dir
+        self.disk_size = disk_size
+        self.validate_remote = validate_remote and hasattr(reader, "stat")
+        self.validate_ttl = validate_ttl
+        self._init_state()
+        if self.disk_dir is not None:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _init_state(self):
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._disk_used = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for k in ("_memory", "_memory_used", "_lock", "_disk_used"):
+            state.pop(k)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def _cache_key(self, file):
+        name = f"{self.reader.__class__.__name__}|{self.reader.working_dir}|{file}"
+        return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+    # ---------------- memory tier ----------------
+    def _memory_get(self, key):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key, value):
+        size = len(value)
+        if size > self.memory_size:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = value
+            self._memory_used += size
+            while self._memory_used > self.memory_size:
+                _, old = self._memory.popitem(last=False)
+                self._memory_used -= len(old)
+
+    # ---------------- disk tier ----------------
+    def _disk_paths(self, key):
+        sub_dir = os.path.join(self.disk_dir, key[:2])
+        return os.path.join(sub_dir, key + _DATA_SUFFIX), os.path.join(sub_dir, key + _META_SUFFIX)
+
+    def _disk_get(self, key, file):
+        data_path, meta_path = self._disk_paths(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(data_path, "rb") as f:
+                value = f.read()
+        except (OSError, ValueError):
+            return None
+        if len(value) != meta.get("size"):
+            return None
+        now = time.time()
+        if self.validate_remote and now - meta.get("checked", 0) >= self.validate_ttl:
+            stat = self.reader.stat(file)
+            if stat.get("size") != meta.get("size") or (meta.get("etag") and stat.get("etag") != meta.get("etag")):
+                return None
+            if self.validate_ttl > 0:
+                meta["checked"] = now
+                self._write_files(((meta_path, json.dumps(meta), "w"),))
+        try:
+            os.utime(data_path)  # 记录访问时间，用于淘汰
+        except OSError:
+            pass
+        return value
+
+    def _disk_put(self, key, file, value):
+        data_path, meta_path = self._disk_paths(key)
+        meta = {"file": file, "size": len(value)}
+        if self.validate_remote:
+            meta["etag"] = self.reader.stat(file).get("etag")
+            meta["checked"] = time.time()
+        try:
+            old_size = os.path.getsize(data_path)  # 覆盖已有的缓存项时只计入大小的差值
+        except OSError:
+            old_size = 0
+        try:
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        except OSError:
+            return
+        if not self._write_files(((data_path, value, "wb"), (meta_path, json.dumps(meta), "w"))):
+            return
+        with self._lock:
+            if self._disk_used is None:
+                self._disk_used = self._scan_disk()[1]
+            else:
+                self._disk_used += len(value) - old_size
+            need_evict = self._disk_used > self.disk_size
+        if need_evict:
+            self._evict()
+
+    @staticmethod
+    def _write_files(items):
+        """
+        依次将内容写入临时文件后原子地重命名，`items`为(path, content, mode)，全部写入成功时返回True
+        """
+        suffix = f".tmp{os.getpid()}.{threading.get_ident()}"
+        try:
+            for path, content, mode in items:
+                with open(path + suffix, mode) as f:
+                    f.write(content)
+                os.replace(path + suffix, path)
+        except OSError:
+            for path, _, _ in items:
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            return False
+        return True
+
+    def _scan_disk(self):
+        entries, total = [], 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith(_DATA_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return entries, total
+
+    @contextmanager
+    def _disk_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.disk_dir, ".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _evict(self):
+        with self._disk_lock():
+            entries, total = self._scan_disk()
+            target = self.disk_size * 0.9
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                for p in (path, path[:-len(_DATA_SUFFIX)] + _META_SUFFIX):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                total -= size
+        with self._lock:
+            self._disk_used = total
+
+    # ---------------- reader api ----------------
+    def _get_cached(self, key, file):
+        value = self._memory_get(key)
+        if value is None and self.disk_dir is not None:
+            value = self._disk_get(key, file)
+            if value is not None:
+                self._memory_put(key, value)
+        return value
+
+    def _put(self, key, file, value):
+        self._memory_put(key, value)
+        if self.disk_dir is not None:
+            self._disk_put(key, file, value)
+
+    def read(self, file) -> bytes:
+        key = self._cache_key(file)
+        value = self._get_cached(key, file)
+        if value is None:
+            value = self.reader.read(file)
+            self._put(key, file, value)
+        return value
+
+    @contextmanager
+    def load(self, file):
+        yield BytesWrapper(self.read(file))
+
+    def load_many(self, files: Sequence[str], max_workers: Optional[int] = None) -> List[bytes]:
+        keys = [self._cache_key(_) for _ in files]
+        res = [self._get_cached(k, f) for k, f in zip(keys, files)]
+        missing = [i for i, v in enumerate(res) if v is None]
+        if missing:
+            kwargs = {} if max_workers is None else {"max_workers": max_workers}
+            values = self.reader.load_many([files[i] for i in missing], **kwargs)
+            for i, value in zip(missing, values):
+                res[i] = value
+                self._put(keys[i], files[i], value)
+        return res
+
+    def stat(self, file):
+        return self.reader.stat(file)
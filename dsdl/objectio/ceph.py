@@ -1,17 +1,9 @@
-from .base import BaseFileReader
+from .base import BaseFileReader, BytesWrapper
 from contextlib import contextmanager
 import os
 import re
 
 
-class BytesWrapper:
-    def __init__(self, value):
-        self.value = value
-
-    def read(self):
-        return self.value
-
-
 class CephFileReader(BaseFileReader):
 
     def __init__(self, working_dir):
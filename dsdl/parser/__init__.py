@@ -1,8 +1,10 @@
 from .parser import parse, dsdl_parse, CHECK_LOG, check_dsdl_parser
+from .cache import compile_dsdl_py
 
 __all__ = [
     "parse",
     "dsdl_parse",
     "CHECK_LOG",
-    "check_dsdl_parser"
+    "check_dsdl_parser",
+    "compile_dsdl_py",
 ]
\ No newline at end of file
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import marshal
+import hashlib
+import builtins
+import warnings
+from typing import Optional, List
+
+from ..__version__ import __version__
+
+# 缓存格式的版本号，生成代码的逻辑或缓存格式改变时需要加1
+CACHE_FORMAT = 2
+
+_CODE_MEMO = {}
+
+
+def parser_cache_dir() -> Optional[str]:
+    """
+    解析结果的缓存目录，可以通过环境变量`DSDL_PARSER_CACHE_DIR`指定，设置环境变量`DSDL_PARSER_CACHE=0`可以关闭缓存。
+    """
+    if os.environ.get("DSDL_PARSER_CACHE", "1") in ("0", "false", "False"):
+        return None
+    return os.environ.get("DSDL_PARSER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".dsdl", "parser_cache"))
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_digest(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def parse_cache_key(dsdl_yaml: str, dsdl_library_path: Optional[str]) -> str:
+    """
+    缓存的键：解析器版本、dsdl yaml文件的内容以及`$import`的查找路径。被import的文件的哈希值、会覆盖library版本的本地import路径
+    存储在缓存项中，读取缓存时校验。
+    """
+    h = hashlib.sha1()
+    # 不指定library路径时，import会在当前工作目录下的`dsdl/dsdl_library`中查找
+    search_path = os.path.abspath(dsdl_library_path) if dsdl_library_path else f"cwd:{os.getcwd()}"
+    h.update(f"{__version__}|{CACHE_FORMAT}|{os.path.abspath(dsdl_yaml)}|{search_path}|".encode("utf-8"))
+    h.update(_file_digest(dsdl_yaml).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _warning_category(name: str):
+    from .. import warning
+    category = getattr(warning, name, None) or getattr(builtins, name, None)
+    return category if isinstance(category, type) and issubclass(category, Warning) else UserWarning
+
+
+def load_parse_cache(key: str) -> Optional[str]:
+    """
+    读取缓存的解析结果，import的文件被修改、或者出现了会覆盖library版本的本地import文件时视为未命中；命中时重新发出解析时的警告。
+    """
+    cache_dir = parser_cache_dir()
+    if cache_dir is None:
+        return None
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), "r") as f:
+            entry = json.load(f)
+        for path, digest in entry["imports"]:
+            if _file_digest(path) != digest:
+                return None
+        if any(os.path.exists(path) for path in entry["shadows"]):
+            return None
+        caught = [(_warning_category(name), msg) for name, msg in entry["warnings"]]
+        dsdl_py = entry["dsdl_py"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    for category, msg in caught:
+        warnings.warn(msg, category)
+    return dsdl_py
+
+
+def save_parse_cache(key: str, dsdl_py: str, import_list: List[str], shadow_list: List[str] = (),
+                     warning_list: List[List[str]] = ()):
+    """
+    `shadow_list`为解析时不存在、回退到library的本地import路径，`warning_list`为解析时发出的警告(`[类别名, 信息]`)。
+    """
+    cache_dir = parser_cache_dir()
+    if cache_dir is None or dsdl_py is None:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        entry = {
+            "version": __version__,
+            "imports": [[os.path.abspath(p), _file_digest(p)] for p in import_list],
+            "shadows": [os.path.abspath(p) for p in shadow_list],
+            "warnings": list(warning_list),
+            "dsdl_py": dsdl_py,
+        }
+        _write_atomic(os.path.join(cache_dir, f"{key}.json"), json.dumps(entry).encode("utf-8"))
+    except OSError:
+        # 缓存目录不可写时直接跳过缓存
+        pass
+
+
+def compile_dsdl_py(dsdl_py: str):
+    """
+    将解析得到的python代码编译为code对象，结果在进程内及磁盘上缓存（磁盘缓存按解释器版本区分），调用方式为`exec(compile_dsdl_py(dsdl_py), {})`。
+    """
+    digest = _source_digest(dsdl_py)
+    code = _CODE_MEMO.get(digest)
+    if code is not None:
+        return code
+    cache_dir = parser_cache_dir()
+    code_path = None
+    if cache_dir is not None and sys.implementation.cache_tag is not None:
+        code_path = os.path.join(cache_dir, f"{digest}.{sys.implementation.cache_tag}.code")
+        try:
+            with open(code_path, "rb") as f:
+                code = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            code = None
+    if code is None:
+        code = compile(dsdl_py, "<dsdl>", "exec")
+        if code_path is not None:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                _write_atomic(code_path, marshal.dumps(code))
+            except OSError:
+                pass
+    _CODE_MEMO[digest] = code
+    return code
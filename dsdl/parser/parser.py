@@ -15,6 +15,8 @@ from .utils import *
 from .parse_params import ParserParam
 from .parse_field import ParserField, EleStruct
 from .parse_class import ParserClass, EleClass
+from .cache import parse_cache_key, load_parse_cache, save_parse_cache
+from dsdl import instrumentation
 
 try:
     from yaml import CSafeLoader as YAMLSafeLoader
@@ -87,6 +89,9 @@ class DSDLParser(Parser, ABC):
         self.dsdl_version = None
         self.meta = dict()
         self.report_flag = report_flag
+        self.import_list = []
+        # 未找到、回退到`dsdl/dsdl_library`的本地import路径，这些文件出现后会覆盖library中的版本
+        self.shadow_list = []
 
     def _parse(self, data_file: str, library_path: str):
         """
@@ -150,6 +155,7 @@ class DSDLParser(Parser, ABC):
 
         # import原则：优先import `-p`指定的路径，木有报错；如果`-p`木有指定，先import 本地路径，没有的话import dsdl/library路径
         import_list = []
+        shadow_list = []
         if "$import" in desc:
             _import = desc["$import"]
             if library_path:
@@ -169,6 +175,7 @@ class DSDLParser(Parser, ABC):
                     if os.path.exists(temp_p):
                         import_list.append(temp_p)
                     else:
+                        shadow_list.append(temp_p)
                         temp_p = os.path.join(
                             "dsdl", "dsdl_library", p.strip() + ".yaml"
                         )
@@ -189,6 +196,8 @@ class DSDLParser(Parser, ABC):
         else:
             root_class_defi = dict()
 
+        self.import_list = import_list
+        self.shadow_list = shadow_list
         import_desc = dict()
         for input_file in import_list:
             with open(input_file, "r") as f:
@@ -478,6 +487,7 @@ def dsdl_parse(
     dsdl_library_path: str = None,
     output_file: str = None,
     report_flag: bool = False,
+    use_cache: bool = True,
 ) -> Optional[str]:
     """
     Main function of parser yaml files to .py dsdl struct definition code.
@@ -487,13 +497,34 @@ def dsdl_parse(
         dsdl_library_path: file path of '`$import` path' in `dsdl_yaml` file.
         output_file: output file path. if None, return string, else, generate .py file in output file path.
         report_flag: if return report
+        use_cache: whether to reuse the generated code cached on disk (see `dsdl.parser.cache`), the cache is never
+            used when `report_flag` is True since the check log is produced by parsing.
 
     Returns:
         Optional[str]: if output_file=None, return string of dsdl definition .py file;
                        else generate a .py file in `output_file` path.
     """
+    use_cache = use_cache and not report_flag
+    if use_cache:
+        cache_key = parse_cache_key(dsdl_yaml, dsdl_library_path)
+        res = load_parse_cache(cache_key)
+        instrumentation.count("parser.cache_misses" if res is None else "parser.cache_hits")
+        if res is not None:
+            if output_file:
+                with open(output_file, "w") as of:
+                    print(res, file=of)
+            return res
     dsdl_parser = DSDLParser(report_flag)
-    res = dsdl_parser.process(dsdl_yaml, dsdl_library_path, output_file)
+    if not use_cache:
+        return dsdl_parser.process(dsdl_yaml, dsdl_library_path, output_file)
+    # 记录解析过程中的警告，存入缓存，命中缓存时重新发出
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        res = dsdl_parser.process(dsdl_yaml, dsdl_library_path, output_file)
+    for w in caught:
+        warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+    save_parse_cache(cache_key, res, dsdl_parser.import_list, dsdl_parser.shadow_list,
+                     [[w.category.__name__, str(w.message)] for w in caught])
     return res
 
 
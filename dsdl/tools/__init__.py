@@ -1,9 +1,11 @@
 from .visualize import view
 from .check import check
+from .compile import compile_cmd
 from .studio_view import StudioView
 
 __all__ = [
     "view",
     "check",
+    "compile_cmd",
     "StudioView",
 ]
@@ -10,7 +10,7 @@ try:
 except ImportError:
     from yaml import SafeLoader as YAMLSafeLoader
 from .commons import OptionEatAll, prepare_input
-from ..parser import check_dsdl_parser
+from ..parser import check_dsdl_parser, compile_dsdl_py
 
 
 @click.command(name="check")
@@ -23,9 +23,10 @@ from ..parser import check_dsdl_parser
 @click.option("-f", "--fields", cls=OptionEatAll, type=str, help="the task to visualize")
 @click.option("-t", "--task", type=str, help="the task to visualize")
 @click.option("-p", "--position", type=str, required=False, help='the directory of dsdl define file')
+@click.option("-w", "--workers", type=int, default=0, help="how many processes used to parse and check the samples")
 @click.option("-o", "--output", type=str, help="the dir to output the check report")
 @prepare_input(visualize=True, multistage=False)
-def check(dsdl_yaml, num, random, fields, config, position, output, **kwargs):
+def check(dsdl_yaml, num, random, fields, config, position, output, workers, **kwargs):
     assert os.path.isdir(output), "Please use '-o' to specify a existing working dir to generate the log files."
     log_dir = os.path.join(output, "log")
     os.makedirs(log_dir, exist_ok=True)
@@ -53,10 +54,11 @@ def check(dsdl_yaml, num, random, fields, config, position, output, **kwargs):
         report_obj.generate()
         return
 
-    exec(dsdl_py, {})
+    exec(compile_dsdl_py(dsdl_py), {})
 
     dataset = CheckDataset(report_obj, dsdl_yaml["samples"], dsdl_yaml["sample_type"], config,
-                           global_info_type=dsdl_yaml["global_info_type"], global_info=dsdl_yaml["global_info"])
+                           global_info_type=dsdl_yaml["global_info_type"], global_info=dsdl_yaml["global_info"],
+                           num_workers=workers, dsdl_py=dsdl_py)
 
     num = min(num, len(dataset))
 
@@ -1,21 +1,13 @@
 import click
 from typing import Sequence, Union
-import os
 
 try:
     from yaml import CSafeLoader as YAMLSafeLoader
 except ImportError:
     from yaml import SafeLoader as YAMLSafeLoader
 from yaml import load as yaml_load
-import json
-
-TASK_FIELDS = {
-    "detection": ["image", "label", "bbox", "polygon", "keypoint", "rotatedbbox"],
-    "classification": ["image", "label"],
-    "semantic-seg": ["image", "labelmap"],
-    "panoptic-seg": ["image", "labelmap", "instancemap"],
-    "ocr": ["image", "rotatedbbox", "text", "polygon"]
-}
+from ..dataset.utils.loader import resolve_sample_paths, load_sample_files
+from ..dataset.utils.commons import TASK_FIELDS
 
 
 class OptionEatAll(click.Option):
@@ -65,45 +57,14 @@ class OptionEatAll(click.Option):
         return retval
 
 
-YAML_VALID_SUFFIX = ('.yaml', '.YAML')
-JSON_VALID_SUFFIX = ('.json', '.JSON')
-VALID_SUFFIX = YAML_VALID_SUFFIX + JSON_VALID_SUFFIX
-
-
-def load_samples(dsdl_path: str, path: Union[str, Sequence[str]], extract_key="samples"):
-    samples = []
-    paths = []
-    dsdl_dir = os.path.split(dsdl_path)[0]
-    if isinstance(path, str):
-        path = os.path.join(dsdl_dir, path)
-        if os.path.isdir(path):
-            paths = [os.path.join(path, _) for _ in os.listdir(path) if _.endswith(VALID_SUFFIX)]
-        elif os.path.isfile(path):
-            if path.endswith(VALID_SUFFIX):
-                paths = [path]
-    elif isinstance(path, (list, tuple)):
-        paths = [os.path.join(dsdl_dir, _) for _ in path if os.path.isfile(_) and _.endswith(VALID_SUFFIX)]
-    for p in paths:
-        if p.endswith(YAML_VALID_SUFFIX):
-            with open(p, "r") as f:
-                data = yaml_load(f, YAMLSafeLoader)[extract_key]
-            if isinstance(data, list):
-                samples.extend(data)
-            else:
-                samples.append(data)
-        else:
-            with open(p, "r") as f:
-                data = json.load(f)[extract_key]
-            if isinstance(data, list):
-                samples.extend(data)
-            else:
-                samples.append(data)
-    return samples
+def load_samples(dsdl_path: str, path: Union[str, Sequence[str]], extract_key="samples", num_workers=0):
+    paths = resolve_sample_paths(dsdl_path, path)
+    return load_sample_files(paths, extract_key, num_workers)
 
 
 def prepare_input(**kwargs):
     def _decorator(func):
-        def process(dsdl_yaml, config, location, num, random, fields, task, position, **kwargs2):
+        def process(dsdl_yaml, config, location, num, random, fields, task, position, workers=0, **kwargs2):
             result = {
                 "dsdl_yaml": dsdl_yaml,
                 "config": config,
@@ -113,6 +74,7 @@ def prepare_input(**kwargs):
                 "fields": fields,
                 "task": task,
                 "position": position,
+                "workers": workers,
                 **kwargs2
             }
 
@@ -127,7 +89,7 @@ def prepare_input(**kwargs):
                     samples = dsdl_info['samples']
                 else:
                     sample_path = dsdl_info["sample-path"]
-                    samples = load_samples(dsdl_yaml, sample_path)
+                    samples = load_samples(dsdl_yaml, sample_path, num_workers=workers)
                 if global_info_type is not None:
                     if "global-info-path" not in dsdl_info:
                         assert "global-info" in dsdl_info, f"Key 'global-info' is required in {dsdl_yaml}."
@@ -0,0 +1,11 @@
+import click
+from dsdl.dataset.utils.compiled import compile_dsdl, CompiledSamples
+
+
+@click.command(name="compile")
+@click.option("-y", "--yaml", "dsdl_yaml", type=str, required=True, help="the path of dsdl yaml file")
+@click.option("-o", "--output", type=str, default=None,
+              help="the path of the compiled sample file, default to the dsdl yaml path with suffix '.dsdlc'")
+def compile_cmd(dsdl_yaml, output):
+    output = compile_dsdl(dsdl_yaml, output)
+    print(f"Totally {len(CompiledSamples(output))} samples compiled to {output}.")
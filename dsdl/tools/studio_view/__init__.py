@@ -2,11 +2,11 @@ from .local_studio_view import LocalStudioView
 from .remote_studio_view import RemoteStudioView
 
 
-def StudioView(dataset_name, task_type, n=None, shuffle=False, remote=False):
+def StudioView(dataset_name, task_type, n=None, shuffle=False, remote=False, num_workers=0):
     if remote:
-        return RemoteStudioView(dataset_name, task_type, n=n, shuffle=shuffle)
+        return RemoteStudioView(dataset_name, task_type, n=n, shuffle=shuffle, num_workers=num_workers)
     else:
-        return LocalStudioView(dataset_name, task_type, n=n, shuffle=shuffle)
+        return LocalStudioView(dataset_name, task_type, n=n, shuffle=shuffle, num_workers=num_workers)
 
 
 __all__ = [
@@ -1,4 +1,5 @@
 from ...dataset import ImageVisualizePipeline, Util
+from ...dataset.utils.prefetch import prefetch_map, prefetch_media, PrefetchedFileReader
 import os
 import json
 import random
@@ -9,14 +10,17 @@ try:
 except ImportError:
     from yaml import SafeLoader as YAMLSafeLoader
 from ..commons import load_samples, TASK_FIELDS
-from ...parser import dsdl_parse
+from ...parser import dsdl_parse, compile_dsdl_py
 from yaml import load as yaml_load
 from ...geometry import LABEL, STRUCT, CLASSDOMAIN
 
 
 class BaseStudioView:
-    def __init__(self, dataset_name, task_type, n=None, shuffle=False):
+    def __init__(self, dataset_name, task_type, n=None, shuffle=False, num_workers=0, prefetch=16, prefetch_workers=8):
         self.dataset_name = dataset_name
+        self.num_workers = num_workers
+        self.prefetch = prefetch
+        self.prefetch_workers = prefetch_workers
         assert task_type in TASK_FIELDS, f"invalid task, you can only choose in {list(TASK_FIELDS.keys())}"
         self.fields = TASK_FIELDS[task_type]
         self.task_type = task_type
@@ -32,6 +36,7 @@ class BaseStudioView:
     def reinit(self):
         self._palette = dict()
         self._ind = 0
+        self._generator.close()
         self._generator = self._init_generator()
 
     def __iter__(self):
@@ -55,19 +60,25 @@ class BaseStudioView:
         for dsdl_yaml in self.yaml_paths:
             # print(f"Parsing {dsdl_yaml} ...")
             self.clear_registry()
-            yaml_info = self.extract_info_from_yml(dsdl_yaml, shuffle=self.shuffle)
+            yaml_info = self.extract_info_from_yml(dsdl_yaml, shuffle=self.shuffle, num_workers=self.num_workers)
             dsdl_py, sample_type, samples, global_info_type, global_info = yaml_info["dsdl_py"], yaml_info[
                 "sample_type"], yaml_info["samples"], yaml_info["global_info_type"], yaml_info["global_info"]
-            exec(dsdl_py, {})
+            exec(compile_dsdl_py(dsdl_py), {})
             sample_type = self.parse_sample_type(sample_type)
+            # 在后台线程中创建样本并提前读取媒体文件，可视化仍按顺序在当前线程中进行
+            samples = prefetch_map(lambda _: self._prefetch_sample(sample_type, _),
+                                   samples, prefetch=self.prefetch, workers=self.prefetch_workers)
             for sample in samples:
-                sample = sample_type(file_reader=self.file_reader, **sample)
                 sample = ImageVisualizePipeline(sample=sample, palette=self._palette, field_list=self.fields)
                 vis_sample = sample.visualize()
                 for _, vis_item in vis_sample.items():
                     self._ind += 1
                     yield vis_item
 
+    def _prefetch_sample(self, sample_type, sample):
+        reader = PrefetchedFileReader(self.file_reader)
+        return prefetch_media(sample_type(file_reader=reader, **sample), reader)
+
     def _init_file_reader(self):
         raise NotImplementedError
 
@@ -81,7 +92,7 @@ class BaseStudioView:
                 samples = dsdl_info['samples']
             else:
                 sample_path = dsdl_info["sample-path"]
-                samples = load_samples(dsdl_yaml, sample_path)
+                samples = load_samples(dsdl_yaml, sample_path, num_workers=self.num_workers)
             res += len(samples)
         return res
 
@@ -98,7 +109,7 @@ class BaseStudioView:
         CLASSDOMAIN.clear()
 
     @staticmethod
-    def extract_info_from_yml(dsdl_yaml, shuffle=False):
+    def extract_info_from_yml(dsdl_yaml, shuffle=False, num_workers=0):
         with open(dsdl_yaml, "r") as f:
             dsdl_info = yaml_load(f, Loader=YAMLSafeLoader)['data']
         sample_type = dsdl_info['sample-type']
@@ -109,7 +120,7 @@ class BaseStudioView:
             samples = dsdl_info['samples']
         else:
             sample_path = dsdl_info["sample-path"]
-            samples = load_samples(dsdl_yaml, sample_path)
+            samples = load_samples(dsdl_yaml, sample_path, num_workers=num_workers)
         if global_info_type is not None:
             if "global-info-path" not in dsdl_info:
                 assert "global-info" in dsdl_info, f"Key 'global-info' is required in {dsdl_yaml}."
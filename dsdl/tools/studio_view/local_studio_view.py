@@ -8,8 +8,8 @@ except ImportError:
 
 
 class LocalStudioView(BaseStudioView):
-    def __init__(self, dataset_name, task_type, n=None, shuffle=False):
-        super().__init__(dataset_name, task_type, n=n, shuffle=shuffle)
+    def __init__(self, dataset_name, task_type, n=None, shuffle=False, num_workers=0):
+        super().__init__(dataset_name, task_type, n=n, shuffle=shuffle, num_workers=num_workers)
 
     def _init_file_reader(self):
         return LocalFileReader(self.media_dir)
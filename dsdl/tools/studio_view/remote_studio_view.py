@@ -11,10 +11,10 @@ default_cfg = s3_config("ailabminio", "123123123", "http://10.140.0.94:9800", "a
 
 class RemoteStudioView(BaseStudioView):
 
-    def __init__(self, dataset_name, task_type, n=None, shuffle=False):
+    def __init__(self, dataset_name, task_type, n=None, shuffle=False, num_workers=0):
         self.remote_cfg = self._get_s3_config(dataset_name)
         os.system(f"odl-cli get {dataset_name} --label")
-        super().__init__(dataset_name, task_type, n=n, shuffle=shuffle)
+        super().__init__(dataset_name, task_type, n=n, shuffle=shuffle, num_workers=num_workers)
 
     def _init_file_reader(self):
         if self.remote_cfg is None:
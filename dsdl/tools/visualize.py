@@ -10,7 +10,7 @@ try:
 except ImportError:
     from yaml import SafeLoader as YAMLSafeLoader
 from .commons import OptionEatAll, prepare_input
-from ..parser import dsdl_parse
+from ..parser import dsdl_parse, compile_dsdl_py
 
 
 @click.command(name="view")
@@ -24,6 +24,7 @@ from ..parser import dsdl_parse
 @click.option("-f", "--fields", cls=OptionEatAll, type=str, help="the task to visualize")
 @click.option("-t", "--task", type=str, help="the task to visualize")
 @click.option("-p", "--position", type=str, required=False, help='the directory of dsdl define file')
+@click.option("-w", "--workers", type=int, default=0, help="how many processes used to parse the sample files")
 @click.option("-m", "--multistage", is_flag=True, help="whether to use the generated python file")
 @prepare_input(output=None)
 def view(dsdl_yaml, num, random, visualize, fields, config, position, multistage, **kwargs):
@@ -37,7 +38,7 @@ def view(dsdl_yaml, num, random, visualize, fields, config, position, multistage
             dsdl_py = dsdl_parse(dsdl_yaml["yaml_file"], dsdl_library_path=position)
         else:
             dsdl_py = dsdl_parse(dsdl_yaml["yaml_file"], dsdl_library_path="")
-        exec(dsdl_py, {})
+        exec(compile_dsdl_py(dsdl_py), {})
 
     dataset = Dataset(dsdl_yaml["samples"], dsdl_yaml["sample_type"], config,
                       global_info=dsdl_yaml["global_info"], global_info_type=dsdl_yaml["global_info_type"])
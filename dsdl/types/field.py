@@ -17,5 +17,9 @@ class Field:
 
     @classmethod
     def extract_key(cls):
-        field_cls_name = cls.__name__
-        return "$" + field_cls_name.replace("Field", "").lower()
+        # 缓存在类上，避免每个样本的每个field都生成一个新的字符串
+        key = cls.__dict__.get("_extract_key", None)
+        if key is None:
+            key = "$" + cls.__name__.replace("Field", "").lower()
+            cls._extract_key = key
+        return key
@@ -1,3 +1,4 @@
+import sys
 from .field import Field
 from .struct import Struct
 from ..exception import ValidationError
@@ -48,20 +49,29 @@ class ListField(Field):
         if hasattr(self.ele_type, "set_file_reader"):
             self.ele_type.set_file_reader(self.file_reader)
         if isinstance(self.ele_type, Field):
+            # 支持批量校验的field（如BBoxField）一次性校验整个列表，返回列式存储的对象（如BBoxArray），
+            # 展开的样本中仍按元素的路径保存单个对象（如BBox）
+            validate_many = getattr(self.ele_type, "validate_many", None)
             if self.prefix is not None and self.flatten_dic is not None:
                 field_key = self.ele_type.extract_key()
                 field_dic = self.flatten_dic.setdefault(field_key, {})
-                res = [self.ele_type.validate(_) for _ in value]
-                paths = [f"{self.prefix}/{ind}" for ind in range(len(res))]
+                res = [self.ele_type.validate(_) for _ in value] if validate_many is None else validate_many(value)
+                paths = [sys.intern(f"{self.prefix}/{ind}") for ind in range(len(res))]
                 _ = [field_dic.update({k: v}) for k, v in zip(paths, res)]
+            elif validate_many is not None:
+                res = validate_many(value)
             else:
                 res = [self.ele_type.validate(_) for _ in value]
 
         elif isinstance(self.ele_type, Struct):
+            for item in value:
+                if not isinstance(item, dict):
+                    raise ValidationError(f"Struct validation error: {self.ele_type.__class__.__name__} requires a dict "
+                                          f"to initiate, but got '{item}'.")
             res = [
                 self.ele_type.__class__(
                     file_reader=self.file_reader,
-                    prefix=f"{self.prefix}/{i}",
+                    prefix=sys.intern(f"{self.prefix}/{i}"),
                     flatten_dic=self.flatten_dic,
                     lazy_init=self.lazy_init, **item)
                 for i, item in enumerate(value)
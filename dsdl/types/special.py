@@ -1,5 +1,5 @@
 from .field import Field
-from ..geometry import BBox, Polygon, PolygonItem, Coord2D, KeyPoints, Text, RBBox, ImageShape, UniqueID
+from ..geometry import BBox, BBoxArray, Polygon, PolygonItem, Coord2D, KeyPoints, Text, RBBox, ImageShape, UniqueID
 from ..exception import ValidationError
 from datetime import date, time, datetime
 import math
@@ -41,6 +41,15 @@ class BBoxField(Field):
         x, y, w, h = validate_list_of_number(value, 4, float, "BBoxField")
         return BBox(x, y, w, h)
 
+    def validate_many(self, value):
+        """
+        validate a list of bboxes in one pass, return a `BBoxArray` instead of a list of `BBox`.
+        """
+        try:
+            return BBoxArray.from_list(value)
+        except ValueError as e:
+            raise ValidationError(f"BBoxField Error: {e}")
+
 
 class RotatedBBoxField(Field):
     def __init__(self, mode="xywht", measure="radian", *args, **kwargs):
@@ -86,9 +95,10 @@ class KeypointField(Field):
     def validate(self, value):
         value = validate_list_of_number(value, len(self.dom), list, "KeypointField")
         keypoints = []
-        for class_ind, p in enumerate(value, start=1):
+        labels = self.dom.get_labels()
+        for class_ind, p in enumerate(value):
             p = validate_list_of_number(p, 3, float, "KeypointField")
-            label = self.dom.get_label(class_ind)
+            label = labels[class_ind]
             coord2d = Coord2D(x=p[0], y=p[1], visiable=int(p[2]), label=label)
             keypoints.append(coord2d)
 
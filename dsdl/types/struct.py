@@ -1,5 +1,6 @@
 import re
 import os
+import sys
 from fnmatch import translate
 from .field import Field
 from ..geometry import STRUCT
@@ -14,28 +15,50 @@ def _is_magic(p):
 
 class RegisterPattern:
     """
-    {
-        './a/b/*/[1-9]/*': {
-            "$bbox": [('./a/b/det/%d/box', 1), ('./a/b/ann/%d/box', 1)]
-            "$label": [('./a/b/det/[1-9]/cate', 1), ('./a/b/ann/[1-9]/cate', 1)]
-        }
-    }
+    每个Struct类各自持有一个RegisterPattern，将(pattern, field_keys)编译为提取计划并缓存，例如：
+
+        pattern './objects/[0-1]/*' 的计划为
+        (
+            ("$bbox", "./objects/*/bbox", <BBoxField>, ("objects", re.compile("[0-1]"), "bbox")),
+            ("$label", "./objects/*/label", <LabelField>, ("objects", re.compile("[0-1]"), "label")),
+        )
+
+    计划中的每一步是字典的key（str）、列表的固定下标（int）或遍历列表（None表示所有元素，正则表示下标需要匹配的元素），
+    提取时直接按照列表的长度遍历样本，耗时只与结果的数量有关。
     """
 
-    def __init__(self):
-        self.flatten_struct = None
+    def __init__(self, flatten_struct=None):
+        self.flatten_struct = flatten_struct
         self.registered_patterns = dict()
+        self._plans = dict()
 
     def set_flatten_struct(self, flatten_struct):
         self.flatten_struct = flatten_struct
+        self.registered_patterns.clear()
+        self._plans.clear()
 
     def register_pattern(self, pattern):
-        if not _is_magic(pattern):
-            return
+        """
+        {
+            './a/b/*/[1-9]/*': {
+                "$bbox": [('./a/b/det/*/box', ('a', 'b', 'det', re.compile('[1-9]'), 'box'))],
+                "$label": [('./a/b/ann/*/cate', ('a', 'b', 'ann', re.compile('[1-9]'), 'cate'))],
+            }
+        }
+        """
         assert self.flatten_struct is not None
         if pattern in self.registered_patterns:
             return
         res_dic = self.registered_patterns.setdefault(pattern, {})
+        if not _is_magic(pattern):
+            field_path = "/".join([_ if not _.isdigit() else "*" for _ in pattern.split("/")])
+            field_obj = self.flatten_struct["$field_mapping"].get(field_path, None)
+            if field_obj is None:
+                FieldNotFoundWarning(f"No field of path '{field_path}' exists in this struct.")
+            else:
+                steps = tuple(int(_) if _.isdigit() else _ for _ in pattern.split("/")[1:])
+                res_dic[field_obj.extract_key()] = [(field_path, steps)]
+            return
         pattern = os.path.normcase(pattern)
         pattern_seg = pattern.split(os.sep)
         pattern_seg = [(re.compile(translate(_)), _) if _is_magic(_) else _ for _ in pattern_seg]
@@ -44,8 +67,9 @@ class RegisterPattern:
                 continue
             field_lst = res_dic.setdefault(field_key, [])
             for field_path in field_info:
-                match_res = self._match(field_path, pattern_seg)
-                field_lst.append(match_res) if match_res else None
+                steps = self._match(field_path, pattern_seg)
+                if steps is not None:
+                    field_lst.append((field_path, steps))
 
     def get_parsed_pattern(self, pattern, field_keys=None):
         patterns_res = self.registered_patterns[pattern]
@@ -62,33 +86,84 @@ class RegisterPattern:
     def has_registered(self, pattern):
         return pattern in self.registered_patterns
 
+    def get_plan(self, pattern, field_keys=None):
+        """
+        返回(pattern, field_keys)的提取计划：((field_key, field_path, field_obj, steps), ...)
+        """
+        key = (pattern, None if field_keys is None else tuple(field_keys))
+        plan = self._plans.get(key, None)
+        if plan is None:
+            self.register_pattern(pattern)
+            parsed = self.get_parsed_pattern(pattern, field_keys)
+            field_mapping = self.flatten_struct["$field_mapping"]
+            plan = tuple((field_key, field_path, field_mapping[field_path], steps)
+                         for field_key in (field_keys or parsed.keys())
+                         for field_path, steps in parsed.get(field_key, ()))
+            self._plans[key] = plan
+        return plan
+
+    def get_field_plan(self, field_key):
+        """
+        返回某一类field（如"$bbox"）的所有路径的提取计划
+        """
+        key = ("$field", field_key)
+        plan = self._plans.get(key, None)
+        if plan is None:
+            field_mapping = self.flatten_struct["$field_mapping"]
+            plan = tuple(
+                (field_key, field_path, field_mapping[field_path],
+                 tuple(None if _ == "*" else _ for _ in field_path.split("/")[1:]))
+                for field_path in self.flatten_struct.get(field_key, []))
+            self._plans[key] = plan
+        return plan
+
     @staticmethod
     def _match(path, pattern_seg):
         path = os.path.normcase(path)
         path_seg = path.split(os.sep)
-        magic_num = 0
         if len(path_seg) != len(pattern_seg):
-            return False
+            return None
+        steps = []
         for i, (pattern_, path_) in enumerate(zip(pattern_seg, path_seg)):
             if path_ != "*":  # not list
                 if isinstance(pattern_, tuple):
                     p_compile, p_str = pattern_
                     if p_compile.match(path_) is None:
-                        return False
+                        return None
                 else:
                     if pattern_ != path_:
-                        return False
+                        return None
+                if i > 0:
+                    steps.append(path_)
             else:  # list
                 if isinstance(pattern_, tuple):
-                    path_seg[i] = "%d"
-                    magic_num += 1
+                    p_compile, p_str = pattern_
+                    steps.append(None if p_str == "*" else p_compile)
+                elif pattern_.isdigit():
+                    steps.append(int(pattern_))
                 else:
-                    if pattern_.isdigit():
-                        path_seg[i] = pattern_
-                    else:
-                        return False
+                    return None
+        return tuple(steps)
 
-        return "/".join(path_seg), magic_num
+
+def _walk_steps(value, steps, prefix="."):
+    """
+    按照提取计划中的steps逐层遍历原始样本，返回[(路径, 值), ...]，不存在的key或下标会被跳过
+    """
+    frontier = [(prefix, value)]
+    for step in steps:
+        if step.__class__ is str:
+            frontier = [(f"{p}/{step}", v[step]) for p, v in frontier if isinstance(v, dict) and step in v]
+        elif step.__class__ is int:
+            frontier = [(f"{p}/{step}", v[step]) for p, v in frontier if isinstance(v, list) and step < len(v)]
+        elif step is None:
+            frontier = [(f"{p}/{i}", x) for p, v in frontier if isinstance(v, list) for i, x in enumerate(v)]
+        else:
+            frontier = [(f"{p}/{i}", x) for p, v in frontier if isinstance(v, list) for i, x in enumerate(v)
+                        if step.match(str(i)) is not None]
+        if not frontier:
+            break
+    return frontier
 
 
 def lazy_init_wrapper(f):
@@ -109,6 +184,151 @@ def no_lazy_init_wrapper(f):
     return func
 
 
+def _build_struct_init(name, required, optional, struct_mappings):
+    """
+    根据Struct类的字段定义生成专用的构造函数：字段的校验函数、字段key、路径后缀等都在生成时确定并绑定为闭包变量，
+    非lazy模式下不再经过__setattr__中逐字段的hasattr判断和动态分发；List[Struct]和嵌套的Struct直接调用子类生成的
+    `__struct_build__`，不再展开**kwargs。生成的__init__与Struct.__init__的行为一致。
+
+    返回(__init__, __struct_build__)，其中`__struct_build__(self, file_reader, prefix, flatten_dic, lazy_init, kwargs)`
+    直接使用样本的原始dict初始化一个已经创建的实例。
+    """
+    args, objs, lines = [], [], []
+    body = lines.append
+
+    def _sub_struct(i, cls, prefix_expr, indent):
+        # 子Struct有生成的构造函数时直接使用原始dict，否则回退到普通的实例化
+        if "__struct_build__" in cls.__dict__:
+            body(f"{indent}if type(item) is dict:")
+            body(f"{indent}    obj = _new(_c{i})")
+            body(f"{indent}    _b{i}(obj, file_reader, {prefix_expr}, flatten, False, item)")
+            body(f"{indent}else:")
+            body(f"{indent}    obj = _c{i}(file_reader=file_reader, prefix={prefix_expr}, flatten_dic=flatten, **item)")
+        else:
+            body(f"{indent}obj = _c{i}(file_reader=file_reader, prefix={prefix_expr}, flatten_dic=flatten, **item)")
+
+    def _field_block(i, key, field_obj, is_required):
+        ele_type = getattr(field_obj, "ele_type", None)
+        if isinstance(ele_type, Struct):
+            # List[Struct]：直接在这里逐个实例化，元素的路径前缀在生成时拼好
+            args.append((f"_c{i}", ele_type.__class__))
+            body(f"if {key!r} in kwargs and type(kwargs[{key!r}]) is list:")
+            body(f"    ele_prefix = prefix + {'/' + key + '/'!r}")
+            body(f"    value = []")
+            body(f"    try:")
+            body(f"        for j, item in enumerate(kwargs[{key!r}]):")
+            body(f"            if not isinstance(item, dict):")
+            body(f"                raise ValidationError(f\"Struct validation error: {{_c{i}.__name__}} requires a dict to "
+                 f"initiate, but got '{{item}}'.\")")
+            _sub_struct(i, ele_type.__class__, "_intern(ele_prefix + str(j))", " " * 12)
+            body(f"            value.append(obj)")
+            body(f"    except ValidationError as error:")
+            body(f"        raise ValidationError(f\"Field '{key}' validation error: {{error}}.\")")
+            body(f"    self[{key!r}] = value")
+            body(f"    keys.append({key!r})")
+            body(f"elif {key!r} in kwargs:")
+        else:
+            body(f"if {key!r} in kwargs:")
+        # 需要知道当前样本信息的field（如ListField、ImageField）在校验前设置
+        if hasattr(field_obj, "set_file_reader"):
+            body(f"    _f{i}.set_file_reader(file_reader)")
+        if hasattr(field_obj, "set_prefix"):
+            body(f"    _f{i}.set_prefix(_intern(prefix + {'/' + key!r}))")
+        if hasattr(field_obj, "set_flatten_dic"):
+            body(f"    _f{i}.set_flatten_dic(flatten)")
+        body(f"    try:")
+        body(f"        value = _v{i}(kwargs[{key!r}])")
+        body(f"    except ValidationError as error:")
+        body(f"        raise ValidationError(f\"Field '{key}' validation error: {{error}}.\")")
+        body(f"    self[{key!r}] = value")
+        field_key = field_obj.extract_key()
+        if field_key != "$list":
+            body(f"    field_dic = flatten.get({field_key!r}, None)")
+            body(f"    if field_dic is None:")
+            body(f"        field_dic = flatten[{field_key!r}] = {{}}")
+            body(f"    field_dic[_intern(prefix + {'/' + key!r})] = value")
+        body(f"    keys.append({key!r})")
+        if is_required:
+            body(f"else:")
+            body(f"    FieldNotFoundWarning({f'Required field {key} is missing.'!r})")
+
+    for is_required, fields in ((True, required), (False, optional)):
+        for key, field_obj in fields.items():
+            i = len(objs)
+            objs.append(field_obj)
+            args.append((f"_f{i}", field_obj))
+            args.append((f"_v{i}", field_obj.validate))
+            _field_block(i, key, field_obj, is_required)
+    for key, struct_obj in struct_mappings.items():
+        i = len(objs)
+        cls = struct_obj.__class__
+        objs.append(cls)
+        args.append((f"_c{i}", cls))
+        body(f"if {key!r} in kwargs:")
+        body(f"    item = kwargs[{key!r}]")
+        body(f"    if not isinstance(item, dict):")
+        body(f"        raise ValidationError(f\"Struct validation error: {{_c{i}.__name__}} requires a dict to "
+             f"initiate, but got '{{item}}'.\")")
+        _sub_struct(i, cls, f"_intern(prefix + {'/' + key!r})", " " * 4)
+        body(f"    self[{key!r}] = obj")
+        body(f"    keys.append({key!r})")
+        body(f"else:")
+        body(f"    FieldNotFoundWarning({f'Required struct instance {key} is missing.'!r})")
+
+    for i, obj in enumerate(objs):
+        cls = obj if isinstance(obj, type) else getattr(getattr(obj, "ele_type", None), "__class__", None)
+        if cls is not None and "__struct_build__" in cls.__dict__:
+            args.append((f"_b{i}", cls.__dict__["__struct_build__"]))
+
+    src = (
+        f"def _make_init({', '.join(_[0] for _ in args)}):\n"
+        f"    def __struct_build__(self, file_reader, prefix, flatten_dic, lazy_init, kwargs):\n"
+        f"        self['file_reader'] = file_reader\n"
+        f"        self['_raw_dict'] = kwargs\n"
+        f"        self['lazy_init'] = lazy_init\n"
+        f"        if lazy_init:\n"
+        f"            self._set_file_reader(file_reader)\n"
+        f"            self.init_pattern_register()\n"
+        f"            return\n"
+        f"        assert flatten_dic is None or isinstance(flatten_dic, dict)\n"
+        f"        keys = []\n"
+        f"        self['_keys'] = keys\n"
+        f"        self['_dict_format'] = None\n"
+        f"        flatten = dict() if flatten_dic is None else flatten_dic\n"
+        f"        self['_flatten_format'] = flatten\n"
+        f"        prefix = prefix or '.'\n"
+        f"        self['_prefix'] = prefix\n"
+        + "".join(f"        {_}\n" for _ in lines) +
+        f"\n"
+        f"    def __init__(self, file_reader=None, prefix=None, flatten_dic=None, lazy_init=False, **kwargs):\n"
+        f"        __struct_build__(self, file_reader, prefix, flatten_dic, lazy_init, kwargs)\n"
+        f"\n"
+        f"    return __init__, __struct_build__\n"
+    )
+    namespace = {"ValidationError": ValidationError, "FieldNotFoundWarning": FieldNotFoundWarning,
+                 "_intern": sys.intern, "_new": dict.__new__}
+    exec(compile(src, f"<dsdl struct {name}>", "exec"), namespace)
+    init, build = namespace["_make_init"](*[_[1] for _ in args])
+    init.__qualname__ = f"{name}.__init__"
+    build.__qualname__ = f"{name}.__struct_build__"
+    init.__source__ = src
+    return init, build
+
+
+def _inherits_custom_init(bases):
+    """
+    基类（Struct本身除外）中是否有用户自定义的__init__，生成的__init__带有`__source__`属性
+    """
+    for base in bases:
+        for klass in base.__mro__:
+            if klass in (Struct, dict, object):
+                continue
+            init = klass.__dict__.get("__init__", None)
+            if init is not None and not hasattr(init, "__source__"):
+                return True
+    return False
+
+
 class StructMetaclass(type):
     def __new__(mcs, name, bases, attributes):
 
@@ -145,6 +365,10 @@ class StructMetaclass(type):
         attributes["__optional__"] = optional
         attributes["__mappings__"] = mappings
         attributes["__struct_mappings__"] = struct_mappings
+        # 自己或基类定义了__init__时不生成构造函数，否则生成的__init__会覆盖继承的__init__
+        if "__init__" not in attributes and not _inherits_custom_init(bases):
+            attributes["__init__"], attributes["__struct_build__"] = _build_struct_init(
+                name, required, optional, struct_mappings)
 
         new_class = super_new(mcs, name, bases, attributes)
         STRUCT.register(name, new_class)
@@ -153,7 +377,7 @@ class StructMetaclass(type):
 
 class Struct(dict, metaclass=StructMetaclass):
     _FLATTEN_STRUCT = None
-    _REGISTER_PATTERN = RegisterPattern()
+    _REGISTER_PATTERN = None
     _FILE_READER = None
 
     def __init__(self, file_reader=None, prefix=None, flatten_dic=None, lazy_init=False, **kwargs):
@@ -232,7 +456,8 @@ class Struct(dict, metaclass=StructMetaclass):
             self[key] = geometry_obj
             field_key = field_obj.extract_key()
             if field_key != "$list":
-                path = f"{self._prefix}/{key}"
+                # 不同样本的路径大多相同，intern之后所有样本共享同一个字符串
+                path = sys.intern(f"{self._prefix}/{key}")
                 tmp_field_dic = self._flatten_format.setdefault(field_key, {})
                 tmp_field_dic[path] = geometry_obj
 
@@ -243,7 +468,7 @@ class Struct(dict, metaclass=StructMetaclass):
                     f"Struct validation error: {cls.__name__} requires a dict to initiate, but got '{value}'.")
             struct_obj = cls(
                 file_reader=self.file_reader,
-                prefix=f"{self._prefix}/{key}",
+                prefix=sys.intern(f"{self._prefix}/{key}"),
                 flatten_dic=self._flatten_format, **value)
             self[key] = struct_obj
         else:
@@ -269,163 +494,94 @@ class Struct(dict, metaclass=StructMetaclass):
         else:
             return self.no_lazy_extract_path_info(pattern, field_keys, verbose)
 
-    def extract_field_info(self, field_lst, nest_flag=True, verbose=False):
+    def extract_field_info(self, field_lst, nest_flag=True, verbose=False, whole_list=False):
+        """
+        `whole_list`为True时，支持批量校验的列表（如List[BBox]）以整个列表的路径返回一个列式存储的对象（如BBoxArray），
+        否则（默认）与其他列表一样按元素的路径返回单个对象（如BBox）。
+        """
         if self.lazy_init:
-            return self.lazy_extract_field_info(field_lst, nest_flag, verbose)
+            return self.lazy_extract_field_info(field_lst, nest_flag, verbose, whole_list)
         else:
-            return self.no_lazy_extract_field_info(field_lst, nest_flag, verbose)
-
-    @lazy_init_wrapper
-    def lazy_extract_path_info(self, pattern, field_keys=None, verbose=False):
-        if field_keys is not None:
-            if not isinstance(field_keys, list):
-                field_keys = [field_keys]
-            field_keys = [f"${_.lower()}" for _ in field_keys if isinstance(_, str)]
-
-        if not _is_magic(pattern):  # 无通配
-            res = self.lazy_extract_path_value(pattern, field_keys)
-            if res is not None:
-                return res if verbose else list(res.values())
-            return dict() if verbose else []
-
-        self.register_path_for_extract(pattern)
-        all_parsed_pattern = self._REGISTER_PATTERN.get_parsed_pattern(pattern, field_keys)
-        res = dict()
-        for field_key in field_keys or all_parsed_pattern.keys():
-            pattern_field_info = all_parsed_pattern.get(field_key, None)
-            if pattern_field_info is None:
-                continue
-            for this_pattern in pattern_field_info:
-                this_res = self.lazy_extract_path_value(this_pattern[0].replace("%d", "*"), [field_key])
-                if this_res is not None:
-                    res.update(this_res)
-        if not verbose:
-            res = list(res.values())
-        return res
+            return self.no_lazy_extract_field_info(field_lst, nest_flag, verbose, whole_list)
 
-    @lazy_init_wrapper
-    def lazy_extract_path_value(self, path, field_keys=None):
-
-        def _extract_value_from_pattern(p_segs, value_dic, ret_dic, prefix="."):
-            if len(p_segs) == 0:
-                ret_dic[prefix] = field_obj.validate(value_dic)
-                return
-            p = p_segs[0]
-            if p.isdigit():
-                p = int(p)
-            if p != "*":
-                _extract_value_from_pattern(p_segs[1:], value_dic[p], ret_dic, f"{prefix}/{p}")
-            else:
-                for i, v in enumerate(value_dic):  # list
-                    _extract_value_from_pattern(p_segs[1:], v, ret_dic, f"{prefix}/{i}")
-
-        path_segs = path.split("/")
-        field_path = "/".join([_ if not _.isdigit() else "*" for _ in path_segs])
-        try:
-            field_obj = self._FLATTEN_STRUCT["$field_mapping"][field_path]
-            if field_keys is not None and field_obj.extract_key() not in field_keys:
-                return None
-        except KeyError as e:
-            FieldNotFoundWarning(f"No field of path '{field_path}' exists in this struct.")
-            return None
-        value = self._raw_dict
-        res = dict()
-        try:
-            _extract_value_from_pattern(path_segs[1:], value, res)
-        except KeyError as e:
-            return None
-        except IndexError as e:
+    @staticmethod
+    def _normalize_field_keys(field_keys):
+        if field_keys is None:
             return None
-        except ValidationError as e:
-            raise e  # not valid
-        return res
+        if not isinstance(field_keys, list):
+            field_keys = [field_keys]
+        return [f"${_.lower()}" for _ in field_keys if isinstance(_, str)]
 
-    @no_lazy_init_wrapper
-    def no_lazy_extract_path_info(self, pattern, field_keys=None, verbose=False):
+    def _run_plan(self, plan, res, whole_list=False):
+        """
+        执行提取计划：lazy模式下校验原始值得到对应的对象，非lazy模式下从已展开的样本中按路径取出对象。
 
-        if field_keys is None:
-            flatten_sample = self.flatten_sample()
+        `whole_list`为True时，支持批量校验的列表（如List[BBox]）以整个列表的路径返回一个对象（如BBoxArray），
+        否则按元素的路径返回单个元素。
+        """
+        raw_dict = self["_raw_dict"]
+        if self["lazy_init"]:
+            file_reader = self["file_reader"]
+            for field_key, field_path, field_obj, steps in plan:
+                # 计划中的field对象为类共享的，与__getattr__一样使用当前样本的file reader
+                if hasattr(field_obj, "set_file_reader"):
+                    field_obj.set_file_reader(file_reader)
+                if whole_list and steps and steps[-1] is None and hasattr(field_obj, "validate_many"):
+                    for path, value in _walk_steps(raw_dict, steps[:-1]):
+                        if isinstance(value, list):
+                            res[path] = field_obj.validate_many(value)
+                    continue
+                for path, value in _walk_steps(raw_dict, steps):
+                    res[path] = field_obj.validate(value)
         else:
-            if not isinstance(field_keys, list):
-                field_keys = [field_keys]
-            field_keys = [f"${_.lower()}" for _ in field_keys if isinstance(_, str)]
-            all_flatten_sample = self.flatten_sample()
-            flatten_sample = dict()
-            for field_key in field_keys:
-                field_info = all_flatten_sample.get(field_key, None)
-                if field_info is not None:
-                    flatten_sample[field_key] = field_info
-        if not _is_magic(pattern):  # 无通配
-            for field_info in flatten_sample.values():
-                res = field_info.get(pattern, None)
-                if res is not None:
-                    return {pattern: res} if verbose else [res]
-            return dict() if verbose else []
-
-        self.register_path_for_extract(pattern)
-
-        all_parsed_pattern = self._REGISTER_PATTERN.get_parsed_pattern(pattern, field_keys)
-        res = dict()
-        for field_key in field_keys or all_parsed_pattern.keys():
-            pattern_field_info = all_parsed_pattern.get(field_key, None)
-            field_info = flatten_sample.get(field_key, None)
-            if pattern_field_info is None or field_info is None:
-                continue
-            for this_pattern in pattern_field_info:
-                self._match(this_pattern, field_info, res)
+            flatten_sample = self.flatten_sample()
+            for field_key, field_path, field_obj, steps in plan:
+                if whole_list and steps and steps[-1] is None and hasattr(field_obj, "validate_many"):
+                    # 实例化后的样本中该列表已经是批量校验的结果（如BBoxArray）
+                    for path, value in _walk_steps(self, steps[:-1]):
+                        res[path] = value
+                    continue
+                field_info = flatten_sample.get(field_key, None)
+                if not field_info:
+                    continue
+                for path, _ in _walk_steps(raw_dict, steps):
+                    item = field_info.get(path, None)
+                    if item is not None:
+                        res[path] = item
+        return res
+
+    def _extract_path_info(self, pattern, field_keys=None, verbose=False):
+        field_keys = self._normalize_field_keys(field_keys)
+        plan = self.pattern_register().get_plan(pattern, field_keys)
+        res = self._run_plan(plan, dict())
         if not verbose:
             res = list(res.values())
         return res
 
-    @staticmethod
-    def _match(pattern, all_sample, result_dic):
-        pattern, digit_num = pattern
-        if digit_num == 0:
-            result_dic[pattern] = all_sample[pattern]
-            return
+    @lazy_init_wrapper
+    def lazy_extract_path_info(self, pattern, field_keys=None, verbose=False):
+        return self._extract_path_info(pattern, field_keys, verbose)
 
-        def _helper(prefix, idx_num):
-            if idx_num == 0:
-                this_pattern = pattern % tuple(prefix)
-                item = all_sample.get(this_pattern, None)
-                if item is not None:
-                    result_dic[this_pattern] = item
-                    return True
-                else:
-                    return False
-            start_idx = 0
-            while 1:
-                res = _helper(prefix + [start_idx], idx_num - 1)
-                if res:
-                    start_idx += 1
-                else:
-                    break
-            return start_idx > 0
+    @lazy_init_wrapper
+    def lazy_extract_path_value(self, path, field_keys=None):
+        res = self._run_plan(self.pattern_register().get_plan(path, field_keys), dict())
+        return res or None
 
-        _helper([], digit_num)
+    @no_lazy_init_wrapper
+    def no_lazy_extract_path_info(self, pattern, field_keys=None, verbose=False):
+        return self._extract_path_info(pattern, field_keys, verbose)
 
     @lazy_init_wrapper
-    def lazy_extract_field_info(self, field_lst, nest_flag=True, verbose=False):
-        ori_field_lst = field_lst
-        # {field_type: [pattern1, pattern2, ...]}
-        field_paths = {_: self._FLATTEN_STRUCT.get(f"${_.lower()}", []) for i, _ in enumerate(ori_field_lst)}
+    def lazy_extract_field_info(self, field_lst, nest_flag=True, verbose=False, whole_list=False):
+        pattern_register = self.pattern_register()
         res = dict()
-        for field, pattern_lst in field_paths.items():
-            if verbose:
-                this_res = res.setdefault(field, dict())
-            else:
-                this_res = res.setdefault(field, list())
-            for pattern in pattern_lst:
-                extract_res = self.lazy_extract_path_value(pattern, field_keys=[f"${field.lower()}"])
-                if extract_res is not None:
-                    if verbose:
-                        this_res.update(extract_res)
-                    else:
-                        this_res.extend(extract_res.values())
+        for field in field_lst:
+            this_res = self._run_plan(pattern_register.get_field_plan(f"${field.lower()}"), dict(), whole_list)
+            res[field] = this_res if verbose else list(this_res.values())
         return res
 
     @no_lazy_init_wrapper
-    def no_lazy_extract_field_info(self, field_lst, nest_flag=True, verbose=False):
+    def no_lazy_extract_field_info(self, field_lst, nest_flag=True, verbose=False, whole_list=False):
         """
         Extract the field info given field list, for example, if field_lst is [bbox, image], the result will be:
 
@@ -443,6 +599,10 @@ class Struct(dict, metaclass=StructMetaclass):
             }
         """
         flatten_sample = self.flatten_sample()
+        if whole_list:
+            pattern_register = self.pattern_register()
+            flatten_sample = {f"${_.lower()}": self._run_plan(pattern_register.get_field_plan(f"${_.lower()}"), dict(),
+                                                              whole_list) for _ in field_lst}
         result_dic = {}
         ori_field_lst = field_lst
         field_lst = [_.lower() for _ in ori_field_lst]
@@ -528,15 +688,19 @@ class Struct(dict, metaclass=StructMetaclass):
 
     @classmethod
     def register_path_for_extract(cls, pattern):
-        cls.init_pattern_register()
-        if not cls._REGISTER_PATTERN.has_registered(pattern):
-            cls._REGISTER_PATTERN.register_pattern(pattern)
+        cls.pattern_register().register_pattern(pattern)
 
     @classmethod
     def init_pattern_register(cls):
-        if getattr(cls, "_FLATTEN_STRUCT", None) is None:
+        # 每个类单独缓存展开的结构和提取计划（不能从父类继承）
+        if cls.__dict__.get("_REGISTER_PATTERN", None) is None:
             cls._FLATTEN_STRUCT = cls._flatten_struct()
-            cls._REGISTER_PATTERN.set_flatten_struct(cls._FLATTEN_STRUCT)
+            cls._REGISTER_PATTERN = RegisterPattern(cls._FLATTEN_STRUCT)
+
+    @classmethod
+    def pattern_register(cls):
+        cls.init_pattern_register()
+        return cls._REGISTER_PATTERN
 
     @classmethod
     def _parse_struct(cls, sample):
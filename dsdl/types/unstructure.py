@@ -1,17 +1,35 @@
+import time
 from .field import Field
 from ..geometry import ImageMedia, SegmentationMap, InstanceMap
 from ..exception import ValidationError
+from .. import instrumentation
 
 
 class FileReader(object):
+    __slots__ = ("_file_reader", "_loc")
+
     def __init__(self, file_reader, args):
         self._file_reader = file_reader
-        self.args = args
+        self._loc = args["$loc"]
+
+    @property
+    def args(self):
+        return {"$loc": self._loc}
 
     def read(self):
         reader = self._file_reader
-        with reader.load(self.args["$loc"]) as f:
-            return f.read()
+        recorder = instrumentation.active()
+        if recorder is None:
+            with reader.load(self._loc) as f:
+                return f.read()
+        name = "reader." + reader.__class__.__name__
+        start = time.perf_counter()
+        with reader.load(self._loc) as f:
+            value = f.read()
+        recorder.observe(name + ".read", time.perf_counter() - start)
+        recorder.add(name + ".requests")
+        recorder.add(name + ".bytes", len(value))
+        return value
 
 
 class UnstructuredObjectField(Field):
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+pytest.importorskip("boto3")
+from botocore.exceptions import ClientError
+from cli.utils.oss_ops.downloader import ParallelDownloader, DownloadJournal, JOURNAL_NAME, PART_SUFFIX
+
+
+class FakeS3Client:
+    """
+    download_file的替身：`errors`中每个key对应依次抛出的错误码，错误用完后写入文件内容
+    """
+
+    def __init__(self, errors=None):
+        self.errors = {k: list(v) for k, v in (errors or {}).items()}
+        self.calls = []
+
+    def download_file(self, bucket, key, filename, Callback=None, Config=None):
+        self.calls.append(key)
+        assert filename.endswith(PART_SUFFIX)
+        with open(filename, "wb") as f:
+            f.write(b"partial")
+        errors = self.errors.get(key)
+        if errors:
+            raise ClientError({"Error": {"Code": errors.pop(0)}}, "GetObject")
+        with open(filename, "wb") as f:
+            f.write(key.encode())
+        if Callback is not None:
+            Callback(len(key))
+
+
+def _tasks(tmp_path, keys):
+    return [(key, str(tmp_path / key), len(key)) for key in keys]
+
+
+def test_retry_transient_error(tmp_path):
+    client = FakeS3Client({"a.jpg": ["SlowDown", "InternalError"]})
+    failed = ParallelDownloader(client, max_workers=1, max_retries=3, backoff=0).download(
+        "bucket", _tasks(tmp_path, ["a.jpg"]), str(tmp_path))
+    assert failed == [] and client.calls == ["a.jpg"] * 3
+    assert (tmp_path / "a.jpg").read_bytes() == b"a.jpg"
+    assert not (tmp_path / ("a.jpg" + PART_SUFFIX)).exists()
+
+
+def test_no_retry_missing_key(tmp_path):
+    client = FakeS3Client({"a.jpg": ["NoSuchKey"]})
+    failed = ParallelDownloader(client, max_workers=1, max_retries=3, backoff=0).download(
+        "bucket", _tasks(tmp_path, ["a.jpg", "b.jpg"]), str(tmp_path))
+    assert [key for key, _ in failed] == ["a.jpg"] and client.calls.count("a.jpg") == 1
+    # 失败的文件不会留下不完整的内容
+    assert not (tmp_path / "a.jpg").exists() and not (tmp_path / ("a.jpg" + PART_SUFFIX)).exists()
+    # 部分文件失败时保留journal，只记录下载完成的文件
+    assert DownloadJournal(str(tmp_path / JOURNAL_NAME)).done == {"b.jpg"}
+
+
+def test_resume_from_journal(tmp_path):
+    keys = ["a.jpg", "b.jpg", "c.jpg"]
+    client = FakeS3Client({"c.jpg": ["AccessDenied"]})
+    downloader = ParallelDownloader(client, max_workers=2, max_retries=0, backoff=0)
+    assert [key for key, _ in downloader.download("bucket", _tasks(tmp_path, keys), str(tmp_path))] == ["c.jpg"]
+    assert os.path.exists(tmp_path / JOURNAL_NAME)
+
+    # 再次运行时只下载journal中没有记录的文件，全部成功后删除journal
+    client.calls = []
+    assert downloader.download("bucket", _tasks(tmp_path, keys), str(tmp_path)) == []
+    assert client.calls == ["c.jpg"]
+    assert not os.path.exists(tmp_path / JOURNAL_NAME)
+    assert [(tmp_path / key).read_bytes() for key in keys] == [key.encode() for key in keys]
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+import pytest
+
+from cli.utils.oss_ops.manifest import ObjectManifest
+
+LISTING = [
+    {"Key": "ds/parquet/train.parquet", "Size": 10, "ETag": '"e1"'},
+    {"Key": "ds/media/a/1.jpg", "Size": 3, "ETag": '"e2"'},
+    {"Key": "ds/media/b/c/2.jpg", "Size": 4},
+    {"Key": "ds/README.md", "Size": 1, "ETag": '"e3"'},
+]
+
+
+def test_manifest_from_listing():
+    manifest = ObjectManifest.from_listing("bucket", "ds/", LISTING)
+    assert len(manifest) == 4 and "ds/media/a/1.jpg" in manifest and "ds/x.jpg" not in manifest
+    assert manifest.size("ds/parquet/train.parquet") == 10 and manifest.etag("ds/parquet/train.parquet") == "e1"
+    assert manifest.etag("ds/media/b/c/2.jpg") == ""
+    assert manifest.dirs() == ["media", "media/a", "media/b", "media/b/c", "parquet"]
+    assert manifest.dirs("ds/media/") == ["a", "b", "b/c"]
+
+
+def test_manifest_save_load(tmp_path):
+    cache_dir = str(tmp_path)
+    manifest = ObjectManifest.from_listing("bucket", "ds/", LISTING)
+    manifest.save(cache_dir)
+    loaded = ObjectManifest.load(cache_dir, "bucket", "ds/", max_age=60)
+    assert loaded.objects == manifest.objects and loaded.created == manifest.created
+    assert ObjectManifest.load(cache_dir, "bucket", "other/") is None
+
+    # 超过max_age的清单视为过期
+    ObjectManifest("bucket", "ds/", manifest.objects, created=time.time() - 120).save(cache_dir)
+    assert ObjectManifest.load(cache_dir, "bucket", "ds/", max_age=60) is None
+    assert ObjectManifest.load(cache_dir, "bucket", "ds/") is not None
+
+
+@pytest.fixture
+def oss_client(tmp_path, monkeypatch):
+    pytest.importorskip("human_readable")
+    pytest.importorskip("boto3")
+    # cli中的模块以cli目录为根导入
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(__file__), "..", "..", "cli"))
+    from utils.oss_ops.ops import OssClient
+
+    def _client(listing):
+        client = OssClient("ak", "sk", "http://127.0.0.1:9000", "us-east-1", manifest_cache_dir=str(tmp_path))
+        client.list_calls = 0
+
+        def _list_objects(bucket, prefix, delimiter=""):
+            client.list_calls += 1
+            return [obj for obj in listing if obj["Key"].startswith(prefix)]
+
+        client.list_objects = _list_objects
+        return client
+
+    yield _client
+    sys.modules.pop("utils.oss_ops.ops", None)
+
+
+def test_recursive_dir_list(oss_client):
+    client = oss_client(LISTING)
+    assert client.get_recursive_dir_list("bucket", "ds/media/") == ["", "a/", "b/", "b/c/"]
+
+
+def test_sum_size_ignores_stale_disk_cache(oss_client):
+    oss_client(LISTING).get_manifest("bucket", "ds/")
+    # 另一个进程：磁盘缓存的清单之后对象被覆盖
+    listing = [dict(obj, Size=obj["Size"] * 2) for obj in LISTING]
+    client = oss_client(listing)
+    keys = ["ds/media/a/1.jpg", "ds/media/b/c/2.jpg"]
+    assert client.get_sum_size("bucket", keys) == 14 and client.list_calls == 1
+    assert client.get_sum_size("bucket", keys) == 14 and client.list_calls == 1
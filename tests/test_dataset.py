@@ -0,0 +1,214 @@
+import numpy as np
+import yaml
+from PIL import Image
+from dsdl.dataset import DSDLDataset, DSDLCollate
+from dsdl.types import Struct
+
+DSDL_YAML = "demo/coco_demo.yaml"
+LIBRARY = "dsdl/dsdl_library"
+
+
+def _make_dataset(tmp_path, lazy_init=False):
+    with open(DSDL_YAML) as f:
+        samples = yaml.safe_load(f)["data"]["samples"]
+    (tmp_path / "media").mkdir(parents=True)
+    for sample in samples[:4]:
+        Image.fromarray(np.zeros((32, 48, 3), dtype=np.uint8)).save(tmp_path / sample["image"])
+    location_config = dict(type="LocalFileReader", working_dir=str(tmp_path))
+    return DSDLDataset(DSDL_YAML, location_config, import_dir=LIBRARY, lazy_init=lazy_init), samples
+
+
+def test_detection_collate(tmp_path):
+    dataset, samples = _make_dataset(tmp_path)
+    batch = DSDLCollate("detection", to_tensor=False)([dataset[i] for i in range(4)])
+    assert batch["image"].shape == (4, 32, 48, 3)
+    num_objects = [len(_["objects"]) for _ in samples[:4]]
+    assert batch["bbox_offsets"].tolist() == np.cumsum([0] + num_objects).tolist()
+    x, y, w, h = samples[0]["objects"][0]["bbox"]
+    np.testing.assert_allclose(batch["bbox"][0], [x, y, x + w, y + h], rtol=1e-5)
+    assert batch["label"][0] == samples[0]["objects"][0]["label"]
+
+
+def test_prefetch_iter(tmp_path):
+    import threading
+    from dsdl.dataset.utils import prefetch_map
+    from dsdl.dataset.utils.prefetch import PrefetchedFileReader
+    for lazy_init in (False, True):
+        dataset, _ = _make_dataset(tmp_path / str(lazy_init), lazy_init=lazy_init)
+        readers = []
+        for i, sample in enumerate(dataset.iter(prefetch=2, workers=2, indices=range(4))):
+            image = sample.extract_field_info(["image"])["image"][0]
+            reader = image._reader._file_reader
+            assert isinstance(reader, PrefetchedFileReader) and reader.pending == 1
+            expected = dataset[i].extract_field_info(["image"])["image"][0]
+            assert (image.to_array() == expected.to_array()).all()
+            # 预读的内容在第一次读取后即被释放
+            assert reader.pending == 0
+            readers.append(reader)
+        assert len(readers) == 4
+        for sample in dataset.sample_list:
+            assert sample.file_reader is dataset.file_reader
+
+    submitted = []
+    lock = threading.Lock()
+
+    def func(x):
+        with lock:
+            submitted.append(x)
+        if x == 5:
+            raise ValueError(x)
+        return x * 2
+
+    gen = prefetch_map(func, range(100), prefetch=3, workers=2)
+    assert [next(gen), next(gen)] == [0, 2]
+    assert len(submitted) <= 5
+    try:
+        list(gen)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the exception of func should be re-raised")
+    assert len(submitted) <= 9
+
+
+def test_extract_path_info(tmp_path):
+    for lazy_init in (False, True):
+        dataset, samples = _make_dataset(tmp_path / str(lazy_init), lazy_init=lazy_init)
+        sample, raw = dataset[0], samples[0]
+        labels = [_["label"] for _ in raw["objects"]]
+        assert [_.index_in_domain() for _ in sample.extract_path_info("./objects/*/label")] == labels
+        assert list(sample.extract_path_info("./objects/[0-1]/*", ["label"], verbose=True)) == [
+            "./objects/0/label", "./objects/1/label"]
+        assert sample.extract_path_info(f"./objects/{len(labels)}/label") == []
+        assert [_.index_in_domain() for _ in sample.extract_field_info(["label"])["label"]] == labels
+    register = dataset.sample_type.pattern_register()
+    assert register is not Struct._REGISTER_PATTERN and register.get_plan("./objects/*/label")
+
+
+def test_generated_struct_init(tmp_path):
+    import pytest
+    from dsdl.exception import ValidationError
+    dataset, samples = _make_dataset(tmp_path)
+    sample_type = dataset.sample_type
+    sample = sample_type(**samples[0])
+    assert "__struct_build__" in sample_type.__dict__
+    assert list(sample.flatten_sample()["$bbox"]) == [f"./objects/{i}/bbox" for i in range(len(samples[0]["objects"]))]
+    bad = dict(samples[0], objects=[dict(samples[0]["objects"][0], bbox=[1, 2])])
+    with pytest.raises(ValidationError, match="Field 'objects' validation error"):
+        sample_type(**bad)
+    with pytest.raises(ValidationError, match="requires a dict"):
+        sample_type(**dict(samples[0], objects=[1]))
+
+
+def test_struct_inherited_init():
+    from dsdl.geometry import STRUCT
+    from dsdl.types import IntField
+
+    class _InitBase(Struct):
+        x = IntField()
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.initialized = True
+
+    class _InitChild(_InitBase):
+        y = IntField()
+
+    try:
+        assert "__struct_build__" not in _InitChild.__dict__
+        sample = _InitChild(x=1, y=2)
+        assert sample.initialized and sample.y == 2
+    finally:
+        STRUCT.unregister("_InitBase")
+        STRUCT.unregister("_InitChild")
+
+
+def test_to_parquet(tmp_path):
+    import pytest
+    pq = pytest.importorskip("pyarrow.parquet")
+    dataset, samples = _make_dataset(tmp_path)
+    table = dataset.to_arrow(batch_size=7)
+    assert table.num_rows == len(samples)
+    objects_type = table.schema.field("objects").type.value_type
+    assert objects_type.field("bbox").type.list_size == 4
+    assert objects_type.field("bbox").metadata[b"dsdl.path"] == b"./objects/*/bbox"
+    row = table.slice(0, 1).to_pylist()[0]
+    assert np.allclose([_["bbox"] for _ in row["objects"]], [_["bbox"] for _ in samples[0]["objects"]])
+    assert [_["label"] for _ in row["objects"]] == [
+        dataset[0].extract_path_info(f"./objects/{i}/label")[0].name for i in range(len(row["objects"]))]
+
+    path = dataset.to_parquet(str(tmp_path / "samples.parquet"), row_group_size=30)
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_rows == len(samples) and meta.num_row_groups == (len(samples) + 29) // 30
+    assert pq.read_table(path).equals(table)
+
+
+def test_group_media_and_ann_index():
+    from dsdl.dataset import ImageVisualizePipeline
+    image_paths = ["./image", "./objects/1/crop", "./objects/1/mask/image", "./pair/left", "./pair/right"]
+    index = ImageVisualizePipeline._path_index(image_paths)
+    for ann_path in ["./objects/0/bbox", "./objects/1/bbox", "./objects/1/parts/2/bbox", "./pair/label", "./label",
+                     "./objects/1/mask/label"]:
+        expected = ImageVisualizePipeline._match(ann_path, image_paths)
+        assert [image_paths[_] for _ in index.match(ann_path)] == expected
+
+
+CHECK_DSDL_PY = """
+from dsdl.types import *
+
+
+class _CheckSample(Struct):
+    bbox = BBoxField()
+    name = StrField()
+"""
+CHECK_SAMPLES = [{"bbox": [0, 0, 1, 1], "name": "a"}, {"bbox": [0, 0, 2, 2], "name": "b", "extra": 1},
+                 {"bbox": "bad", "name": "c"}, {"bbox": [1, 1, 1, 1], "name": "d"}] * 3
+
+
+def _run_check(tmp_path, num_workers):
+    import io
+    from dsdl.dataset import CheckDataset, Report
+    from dsdl.geometry import STRUCT
+
+    class _IndexedCheckDataset(CheckDataset):
+        def process_sample(self, i, sample):
+            return i, sample.name
+
+    namespace = {}
+    exec(CHECK_DSDL_PY, namespace)
+    try:
+        (tmp_path / str(num_workers)).mkdir()
+        report = Report(str(tmp_path / str(num_workers) / "report.md"))
+        location_config = dict(type="LocalFileReader", working_dir=str(tmp_path))
+        dataset = _IndexedCheckDataset(report, CHECK_SAMPLES, namespace["_CheckSample"], location_config,
+                                       num_workers=num_workers, dsdl_py=CHECK_DSDL_PY)
+        stat = dict(report.sample_stat)
+        report_text = io.StringIO()
+        report.generate_sample_info(report_text)
+        samples = [dataset[i] for i in range(len(dataset))]
+    finally:
+        STRUCT.unregister("_CheckSample")
+    return stat, samples, report_text.getvalue(), (tmp_path / str(num_workers) / "samples_log.md").read_text()
+
+
+def test_check_dataset_parallel(tmp_path):
+    serial = _run_check(tmp_path, 0)
+    assert serial[0] == {"total": 12, "error": 3, "warn": 3, "normal": 6}
+    assert serial[1] == [(i, name) for i, name in enumerate("abcd" * 3) if name != "c"]
+    # 两种模式下的报告内容及process_sample的结果完全相同
+    assert _run_check(tmp_path, 2) == serial
+
+
+def test_report_sample_log(tmp_path):
+    from dsdl.dataset import Report
+    report = Report(str(tmp_path / "report.md"))
+    report.add_sample_info({"error_flag": False, "warning_flag": False, "normal_flag": True})
+    report.add_sample_info({"error_flag": False, "warning_flag": True, "normal_flag": False,
+                            "warning_msgs": ["missing field"], "sample_content": {"a": 1}})
+    report.add_sample_info({"error_flag": True, "warning_flag": False, "normal_flag": False,
+                            "error_msg": "bad bbox", "sample_content": {"b": 2}}, 7)
+    assert report.parse_sample_info() == {"total": 3, "error": 1, "warn": 1, "normal": 1}
+    log = (tmp_path / "samples_log.md").read_text()
+    assert "sample 1: status WARNING" in log and "missing field" in log and "{'a': 1}" in log
+    assert "sample 7: status ERROR" in log and "bad bbox" in log
+    assert "sample 0:" not in log and log.rstrip().endswith("```")
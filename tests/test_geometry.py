@@ -0,0 +1,188 @@
+import numpy as np
+import pytest
+from dsdl.geometry import BBox, BBoxArray
+from dsdl.types import Struct, ListField, BBoxField
+from dsdl.exception import ValidationError
+
+
+class _BoxesSample(Struct):
+    boxes = ListField(ele_type=BBoxField())
+
+
+def test_bbox_array():
+    boxes = BBoxArray.from_list([[1, 2, 3, 4], [0, 0, 10, 5], [421.09, 0, 1, 1]])
+    assert boxes.data.dtype == np.float64 and len(boxes) == 3
+    np.testing.assert_allclose(boxes.xyxy[:2], [[1, 2, 4, 6], [0, 0, 10, 5]])
+    np.testing.assert_allclose(boxes.area[:2], [12, 50])
+    assert isinstance(boxes[0], BBox) and boxes[0].xyxy == [1, 2, 4, 6]
+    assert boxes[2].x == 421.09
+    assert len(BBoxArray.from_list([])) == 0
+
+
+def test_list_of_bbox_field():
+    from dsdl.dataset import DSDLCollate
+    for lazy_init in (False, True):
+        sample = _BoxesSample(boxes=[[1, 2, 3, 4], [0, 0, 10, 5]], lazy_init=lazy_init)
+        assert isinstance(sample.boxes, BBoxArray)
+        # 默认按元素的路径返回单个BBox，与其他列表相同
+        boxes = sample.extract_field_info(["bbox"], verbose=True)["bbox"]
+        assert list(boxes) == ["./boxes/0", "./boxes/1"] and all(isinstance(_, BBox) for _ in boxes.values())
+        assert [b.openmmlabformat for b in boxes.values()] == [[1, 2, 4, 6], [0, 0, 10, 5]]
+        if not lazy_init:
+            assert list(sample.flatten_sample()["$bbox"]) == ["./boxes/0", "./boxes/1"]
+        items = sample.extract_path_info("./boxes/*", verbose=True)
+        assert {k: v.xyxy for k, v in items.items()} == {"./boxes/0": [1, 2, 4, 6], "./boxes/1": [0, 0, 10, 5]}
+        # whole_list=True时整个列表为一个BBoxArray
+        boxes = sample.extract_field_info(["bbox"], whole_list=True)["bbox"]
+        assert len(boxes) == 1 and isinstance(boxes[0], BBoxArray)
+        assert DSDLCollate._bbox_rows(boxes) == [[1, 2, 4, 6], [0, 0, 10, 5]]
+    with pytest.raises(ValidationError):
+        _BoxesSample(boxes=[[1, 2, 3]])
+
+
+def test_rle_roundtrip():
+    from dsdl.geometry import rle
+    from dsdl.geometry.polygon import RLEPolygon
+    rng = np.random.default_rng(0)
+    mask = rng.random((13, 17)) > 0.6
+    counts = rle.encode_counts(mask)
+    assert (rle.decode_counts(rle.counts_to_string(counts), mask.shape) == mask).all()
+    assert (rle.decode_counts_batch([counts, counts], mask.shape) == mask).all()
+    ys, xs = np.nonzero(mask)
+    bbox = [xs.min(), ys.min(), xs.max() - xs.min() + 1, ys.max() - ys.min() + 1]
+    for rle_format in (RLEPolygon.START_LENGTH, RLEPolygon.COCO):
+        polygon = RLEPolygon.from_mask(mask, rle_format)
+        assert (polygon.mask == mask).all()
+        assert polygon.area == mask.sum()
+        assert polygon.bbox == bbox
+
+
+def test_bytes_to_numpy():
+    import io
+    from PIL import Image
+    from dsdl.geometry.utils import bytes_to_numpy
+    arr = np.random.default_rng(0).integers(0, 255, (40, 30, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(arr).save(buffer, "PNG")
+    assert (bytes_to_numpy(buffer.getvalue()) == arr).all()
+    assert (bytes_to_numpy(io.BytesIO(buffer.getvalue())) == arr).all()
+    buffer = io.BytesIO()
+    Image.fromarray(arr).save(buffer, "JPEG")
+    for backend in ("pil", "cv2"):
+        assert bytes_to_numpy(buffer.getvalue(), backend=backend).shape == (40, 30, 3)
+    assert bytes_to_numpy(buffer.getvalue(), draft=(15, 20)).shape == (20, 15, 3)
+
+
+def test_geometry_slots():
+    from dsdl.geometry import Label, ImageMedia, PolygonItem
+    box = BBox(1, 2, 3, 4)
+    box.to_float()
+    assert box.xyxy == [1., 2., 4., 6.] and isinstance(box.x, float)
+    for obj in (box, Label("cat"), ImageMedia("a.jpg", None), PolygonItem([[0, 0], [1, 1]])):
+        assert not hasattr(obj, "__dict__")
+
+
+@pytest.fixture
+def class_domains():
+    from dsdl.geometry import Label, ClassDomain
+    from dsdl.geometry.registry import CLASSDOMAIN, LABEL
+
+    class _KeypointDom(ClassDomain):
+        Classes = [Label("nose"), Label("left_eye"), Label("right_eye")]
+        Skeleton = [[1, 2], [1, 3]]
+
+    a = Label("a")
+    b = Label("b", supercategories=[a])
+    c = Label("c", supercategories=[b])
+
+    class _TreeDom(ClassDomain):
+        Classes = [a, b, c]
+
+    # 复用其他类别域中的Label
+    class _ReuseDom(ClassDomain):
+        Classes = [c, a]
+
+    domains = (_KeypointDom, _TreeDom, _ReuseDom)
+    yield domains
+    for dom in domains:
+        for label in dom.get_labels():
+            LABEL.unregister(label.registry_name)
+        CLASSDOMAIN.unregister(dom.__name__)
+
+
+def test_class_domain_indices(class_domains):
+    from dsdl.geometry import Label, KeyPoints, Coord2D
+    _KeypointDom, _TreeDom, _ReuseDom = class_domains
+
+    labels = _KeypointDom.get_labels()
+    assert [_.index_in_domain() for _ in labels] == [1, 2, 3]
+    assert labels[1] == Label("left_eye", domain_name="_KeypointDom") and labels[1] != labels[2]
+    assert len({labels[0], Label("nose", domain_name="_KeypointDom")}) == 1
+    keypoints = KeyPoints([Coord2D(i, i, 2, label) for i, label in enumerate(labels)], _KeypointDom)
+    assert keypoints["right_eye"].x == 2
+    skeleton = _KeypointDom.get_attribute("Skeleton")
+    assert skeleton.index_pairs.tolist() == [[0, 1], [0, 2]]
+    assert [[p.name for p in pair] for pair in skeleton.get_point_pairs(keypoints)] == [["nose", "left_eye"],
+                                                                                        ["nose", "right_eye"]]
+
+    a, b, c = _TreeDom.get_labels()
+    assert c.ancestor_names == {"_TreeDom__a", "_TreeDom__b"}
+    assert c.is_subcategory_of(a) and not a.is_subcategory_of(c)
+    assert [_.index_in_domain() for _ in (a, b, c)] == [1, 2, 3]
+    assert _ReuseDom.get_index("c") == 1 and c.domain_name == "_TreeDom"
+
+
+def test_class_domains_unregistered():
+    from dsdl.geometry.registry import CLASSDOMAIN, LABEL
+    from dsdl.exception import ClassNotFoundError
+    with pytest.raises(ClassNotFoundError):
+        CLASSDOMAIN.get("_TreeDom")
+    assert "_TreeDom__a" not in LABEL
+
+
+def test_map_visualize(monkeypatch):
+    import io
+    from PIL import Image, ImageFont
+    from dsdl.geometry import SegmentationMap, InstanceMap
+    from dsdl.geometry.base_geometry import FontMixin
+    from dsdl.geometry.insmap import instance_boundaries
+    monkeypatch.setattr(FontMixin, "FONT", ImageFont.load_default())
+
+    class _Reader:
+        def __init__(self, array):
+            buffer = io.BytesIO()
+            Image.fromarray(array).save(buffer, "png")
+            self.value = buffer.getvalue()
+
+        def read(self):
+            return self.value
+
+    seg = np.zeros((64, 64), dtype=np.uint8)
+    seg[32:, 32:] = 1
+    palette = {"background": (10, 20, 30), "object": (200, 100, 50)}
+    image = Image.new("RGBA", (64, 64))
+    out = np.asarray(SegmentationMap("seg.png", _Reader(seg), None).visualize(image, palette))
+    # 默认类别域中像素值0为background，1为object
+    assert tuple(out[63, 0, :3]) == (5, 10, 15) and tuple(out[63, 63, :3]) == (100, 50, 25)
+
+    # 三通道的标签图取第一个通道
+    rgb = np.asarray(SegmentationMap("seg.png", _Reader(np.stack([seg] * 3, axis=-1)), None).visualize(image, palette))
+    assert (rgb == out).all()
+
+    class _ArraySegMap(SegmentationMap):
+        __slots__ = ()
+
+        def to_array(self, draft=None):
+            return self._reader
+
+    # 负的像素值不对应任何类别，不着色
+    signed = seg.astype(np.int16)
+    signed[:8, :8] = -1
+    out = np.asarray(_ArraySegMap("seg.png", signed, None).visualize(image, palette))
+    assert tuple(out[0, 0, :3]) == (0, 0, 0) and tuple(out[63, 63, :3]) == (100, 50, 25)
+
+    ins = np.zeros((6, 6), dtype=np.uint8)
+    ins[1:4, 1:4] = 7
+    edge = instance_boundaries(ins)
+    assert edge[2, 2] == 0 and edge[1, 1] == 7 and edge[0, 1] == 7 and edge[5, 5] == 0
+    assert InstanceMap("ins.png", _Reader(ins)).visualize(Image.new("RGBA", (6, 6)), {}).size == (6, 6)
@@ -0,0 +1,35 @@
+import json
+import numpy as np
+from PIL import Image
+from dsdl import instrumentation
+from dsdl.geometry.utils import bytes_to_numpy
+from dsdl.objectio import LocalFileReader
+from dsdl.types.unstructure import FileReader
+
+
+def test_instrument_records_reads_and_decode(tmp_path):
+    Image.fromarray(np.zeros((8, 8, 3), dtype=np.uint8)).save(tmp_path / "a.png")
+    reader = FileReader(LocalFileReader(str(tmp_path)), {"$loc": "a.png"})
+    events = []
+    hook = instrumentation.add_hook(lambda kind, name, value: events.append((kind, name)))
+    try:
+        with instrumentation.instrument() as rec:
+            for _ in range(3):
+                bytes_to_numpy(reader.read(), backend="pil")
+    finally:
+        instrumentation.remove_hook(hook)
+    assert instrumentation.active() is None
+
+    res = json.loads(rec.to_json())
+    assert res["counters"]["reader.LocalFileReader.requests"] == 3
+    assert res["counters"]["reader.LocalFileReader.bytes"] == 3 * (tmp_path / "a.png").stat().st_size
+    assert res["timers"]["decode.pil"]["count"] == 3
+    assert sum(res["timers"]["reader.LocalFileReader.read"]["buckets"].values()) == 3
+    assert ("timer", "decode.pil") in events
+
+    merged = instrumentation.Recorder.merge(res, res)
+    assert merged["timers"]["decode.pil"]["count"] == 6
+
+    # 未开启时不记录任何内容
+    reader.read()
+    assert rec.counters["reader.LocalFileReader.requests"] == 3
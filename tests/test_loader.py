@@ -0,0 +1,104 @@
+import json
+import yaml
+import pytest
+from dsdl.dataset.utils.loader import SampleStream, iter_json_samples, iter_yaml_samples
+
+SAMPLES = [{"image": "a.jpg", "bbox": [1, 2.5, 3, 4], "label": "cat"},
+           {"image": "b.jpg", "bbox": [0, 0, 1e3, -1], "label": None}]
+
+
+def test_iter_yaml_samples(tmp_path):
+    p = tmp_path / "samples.yaml"
+    p.write_text(yaml.safe_dump({"meta": {"x": [1, 2]}, "samples": SAMPLES, "tail": 1}))
+    assert list(iter_yaml_samples(str(p))) == SAMPLES
+
+
+def test_iter_json_samples(tmp_path):
+    p = tmp_path / "samples.json"
+    p.write_text(json.dumps({"meta": {"x": [1, 2]}, "samples": SAMPLES, "tail": 1}, indent=2))
+    assert list(iter_json_samples(str(p))) == SAMPLES
+
+
+def test_sample_stream_reiterable(tmp_path):
+    p1, p2 = tmp_path / "a.yaml", tmp_path / "b.json"
+    p1.write_text(yaml.safe_dump({"samples": SAMPLES[:1]}))
+    p2.write_text(json.dumps({"samples": SAMPLES[1]}))
+    stream = SampleStream([str(p1), str(p2)])
+    assert list(stream) == SAMPLES
+    assert list(stream) == SAMPLES
+
+
+def test_compiled_samples(tmp_path):
+    from dsdl.dataset.utils.compiled import CompiledSamples, write_compiled_samples
+    p = str(tmp_path / "samples.dsdlc")
+    assert write_compiled_samples(iter(SAMPLES), p, {"sample_type": "Foo"}) == 2
+    compiled = CompiledSamples(p)
+    assert len(compiled) == 2
+    assert compiled.info == {"sample_type": "Foo"}
+    assert compiled[1] == SAMPLES[1] and compiled[-2] == SAMPLES[0]
+    assert list(compiled) == SAMPLES
+
+
+def test_compiled_samples_dates(tmp_path):
+    from datetime import date, datetime
+    from dsdl.dataset.utils.compiled import CompiledSamples, write_compiled_samples
+    p = str(tmp_path / "samples.dsdlc")
+    # yaml safe_load得到的日期、时间戳原样还原
+    samples = yaml.safe_load("- {day: 2023-01-02, stamp: 2023-01-02 03:04:05, text: '2023-01-02'}")
+    assert isinstance(samples[0]["day"], date) and isinstance(samples[0]["stamp"], datetime)
+    write_compiled_samples(samples, p)
+    assert list(CompiledSamples(p)) == samples
+    assert type(CompiledSamples(p)[0]["day"]) is date
+
+    # 其他非json类型编译时报错
+    with pytest.raises(TypeError):
+        write_compiled_samples([{"data": b"abc"}], p)
+
+
+def test_compiled_up_to_date(tmp_path):
+    from dsdl.dataset.utils.compiled import CompiledSamples, compile_dsdl, is_compiled_up_to_date
+    (tmp_path / "samples").mkdir()
+    sample_file = tmp_path / "samples" / "a.json"
+    sample_file.write_text(json.dumps({"samples": SAMPLES[:1]}))
+    dsdl_yaml = tmp_path / "train.yaml"
+    dsdl_yaml.write_text(yaml.safe_dump({"$dsdl-version": "0.5.0", "meta": {"name": "x"},
+                                         "data": {"sample-type": "Foo", "sample-path": "samples"}}))
+    dsdl_yaml, compiled_path = str(dsdl_yaml), compile_dsdl(str(dsdl_yaml))
+    assert is_compiled_up_to_date(dsdl_yaml, compiled_path)
+
+    # 只修改样本文件，dsdl yaml不变
+    sample_file.write_text(json.dumps({"samples": SAMPLES}))
+    assert not is_compiled_up_to_date(dsdl_yaml, compiled_path)
+    compile_dsdl(dsdl_yaml, compiled_path)
+    assert is_compiled_up_to_date(dsdl_yaml, compiled_path)
+    assert list(CompiledSamples(compiled_path)) == SAMPLES
+
+    # 目录下新增样本文件
+    (tmp_path / "samples" / "b.json").write_text(json.dumps({"samples": SAMPLES[:1]}))
+    assert not is_compiled_up_to_date(dsdl_yaml, compiled_path)
+
+
+def test_load_sample_files_parallel(tmp_path):
+    from dsdl.dataset.utils.loader import load_sample_files, resolve_sample_paths
+    (tmp_path / "samples").mkdir()
+    expected = []
+    for i in range(6):
+        samples = [dict(s, image=f"{i}_{s['image']}") for s in SAMPLES]
+        expected.extend(samples)
+        if i % 2:
+            (tmp_path / "samples" / f"{i}.json").write_text(json.dumps({"samples": samples}))
+        else:
+            (tmp_path / "samples" / f"{i}.yaml").write_text(yaml.safe_dump({"samples": samples}))
+    dsdl_yaml = str(tmp_path / "train.yaml")
+
+    # sample-path为目录
+    paths = resolve_sample_paths(dsdl_yaml, "samples")
+    assert load_sample_files(paths, num_workers=0) == expected
+    assert load_sample_files(paths, num_workers=3) == expected
+
+    # sample-path为文件列表，按列表的顺序合并
+    path_list = ["samples/5.json", "samples/0.yaml", "samples/3.json"]
+    paths = resolve_sample_paths(dsdl_yaml, path_list)
+    serial = load_sample_files(paths, num_workers=0)
+    assert serial == expected[10:12] + expected[0:2] + expected[6:8]
+    assert load_sample_files(paths, num_workers=2) == serial
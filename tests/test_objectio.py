@@ -0,0 +1,128 @@
+import io
+import os
+import pickle
+import time
+import pytest
+from dsdl import instrumentation
+
+
+def test_caching_file_reader(tmp_path):
+    from dsdl.objectio import CachingFileReader, LocalFileReader
+    for i in range(4):
+        (tmp_path / f"{i}.bin").write_bytes(bytes([i]) * 100)
+
+    class CountingReader(LocalFileReader):
+        calls = 0
+
+        def read(self, file):
+            CountingReader.calls += 1
+            return super().read(file)
+
+    reader = CachingFileReader(CountingReader(str(tmp_path)), memory_size=250, disk_dir=str(tmp_path / "cache"),
+                               disk_size=250)
+    assert reader.load_many(["0.bin", "1.bin"]) == [b"\x00" * 100, b"\x01" * 100]
+    with reader.load("0.bin") as f:
+        assert f.read() == b"\x00" * 100
+    assert CountingReader.calls == 2
+    # a fresh process only sees the disk tier
+    reader = CachingFileReader(reader.reader, memory_size=250, disk_dir=str(tmp_path / "cache"), disk_size=250)
+    assert pickle.loads(pickle.dumps(CachingFileReader(dict(type="LocalFileReader", working_dir=str(tmp_path)))))
+    assert reader.read("1.bin") == b"\x01" * 100 and CountingReader.calls == 2
+    for i in range(4):
+        reader.read(f"{i}.bin")
+    assert reader._scan_disk()[1] <= 250
+
+
+def test_caching_file_reader_overwrite(tmp_path):
+    from dsdl.objectio import CachingFileReader, LocalFileReader
+
+    class StatReader(LocalFileReader):
+        def stat(self, file):
+            return {"size": os.path.getsize(os.path.join(self.working_dir, file))}
+
+    (tmp_path / "a.bin").write_bytes(b"a" * 100)
+    reader = CachingFileReader(StatReader(str(tmp_path)), memory_size=0, disk_dir=str(tmp_path / "cache"),
+                               disk_size=1000, validate_remote=True)
+    reader.read("a.bin")
+    # 远端文件变化后重新缓存，覆盖已有的缓存项
+    (tmp_path / "a.bin").write_bytes(b"b" * 120)
+    assert reader.read("a.bin") == b"b" * 120
+    assert reader._disk_used == reader._scan_disk()[1] == 120
+
+
+def test_caching_file_reader_validate_ttl(tmp_path, monkeypatch):
+    from dsdl.objectio import CachingFileReader, LocalFileReader
+
+    class StatReader(LocalFileReader):
+        stats = 0
+
+        def stat(self, file):
+            StatReader.stats += 1
+            return {"size": os.path.getsize(os.path.join(self.working_dir, file))}
+
+    (tmp_path / "a.bin").write_bytes(b"a" * 100)
+    reader = CachingFileReader(StatReader(str(tmp_path)), memory_size=0, disk_dir=str(tmp_path / "cache"),
+                               disk_size=1000, validate_remote=True, validate_ttl=60)
+    reader.read("a.bin")
+    assert StatReader.stats == 1
+    # ttl内命中磁盘缓存不请求stat
+    (tmp_path / "a.bin").write_bytes(b"b" * 120)
+    assert reader.read("a.bin") == b"a" * 100 and StatReader.stats == 1
+    # 超过ttl后重新校验
+    now = time.time()
+    monkeypatch.setattr("dsdl.objectio.cache.time.time", lambda: now + 120)
+    assert reader.read("a.bin") == b"b" * 120
+
+
+def _aws_reader(max_retries=2):
+    pytest.importorskip("boto3")
+    from dsdl.objectio.aws_oss import AwsOSSFileReader
+    return AwsOSSFileReader("data", "bucket", "ak", "sk", "http://127.0.0.1:9000", "us-east-1",
+                            max_retries=max_retries, backoff=0)
+
+
+def _body(content):
+    from botocore.response import StreamingBody
+    return {"Body": StreamingBody(io.BytesIO(content), len(content))}
+
+
+def test_aws_reader_retry():
+    reader = _aws_reader(max_retries=2)
+    from botocore.stub import Stubber
+    assert reader.s3_client.meta.config.retries["total_max_attempts"] == 1
+    expected = {"Bucket": "bucket", "Key": "data/a.jpg"}
+
+    # 可重试的错误：第3次请求成功
+    with Stubber(reader.s3_client) as stubber, instrumentation.instrument() as rec:
+        stubber.add_client_error("get_object", "SlowDown", http_status_code=503, expected_params=expected)
+        stubber.add_client_error("get_object", "InternalError", http_status_code=500, expected_params=expected)
+        stubber.add_response("get_object", _body(b"abc"), expected)
+        assert reader.read("a.jpg") == b"abc"
+        stubber.assert_no_pending_responses()
+    assert rec.counters["reader.AwsOSSFileReader.retries"] == 2
+
+    # 超过max_retries次后失败，共max_retries+1个请求
+    with Stubber(reader.s3_client) as stubber:
+        for _ in range(3):
+            stubber.add_client_error("get_object", "SlowDown", http_status_code=503)
+        with pytest.raises(RuntimeError):
+            reader.read("a.jpg")
+        stubber.assert_no_pending_responses()
+
+    # 不可重试的错误码只请求一次
+    with Stubber(reader.s3_client) as stubber, instrumentation.instrument() as rec:
+        stubber.add_client_error("get_object", "NoSuchKey", http_status_code=404)
+        stubber.add_response("get_object", _body(b"abc"))
+        with pytest.raises(RuntimeError):
+            reader.read("a.jpg")
+    assert "reader.AwsOSSFileReader.retries" not in rec.counters
+
+
+def test_aws_reader_client_per_process(monkeypatch):
+    reader = _aws_reader()
+    client = reader.s3_client
+    assert reader.s3_client is client
+    monkeypatch.setattr("os.getpid", lambda: -1)
+    assert reader.s3_client is not client
+    restored = pickle.loads(pickle.dumps(reader))
+    assert restored._client is None and restored.max_retries == 2
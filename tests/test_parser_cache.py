@@ -0,0 +1,49 @@
+import shutil
+import pytest
+from dsdl.parser import dsdl_parse
+from dsdl.parser import cache
+from dsdl.warning import DefineSyntaxWarning
+
+LIBRARY = "dsdl/dsdl_library"
+
+
+def test_parse_cache_invalidated_by_import(tmp_path, monkeypatch):
+    monkeypatch.setenv("DSDL_PARSER_CACHE_DIR", str(tmp_path / "cache"))
+    library = tmp_path / "library"
+    shutil.copytree(LIBRARY, library)
+    dsdl_yaml = "demo/coco_demo.yaml"
+
+    dsdl_py = dsdl_parse(dsdl_yaml, dsdl_library_path=str(library))
+    key = cache.parse_cache_key(dsdl_yaml, str(library))
+    assert cache.load_parse_cache(key) == dsdl_py
+    assert dsdl_parse(dsdl_yaml, dsdl_library_path=str(library)) == dsdl_py
+
+    with open(library / "task" / "object-detection.yaml", "a") as f:
+        f.write("\n# changed\n")
+    assert cache.load_parse_cache(key) is None
+
+
+def test_parse_cache_shadowed_import(tmp_path, monkeypatch):
+    monkeypatch.setenv("DSDL_PARSER_CACHE_DIR", str(tmp_path / "cache"))
+    dsdl_yaml = str(tmp_path / "coco_demo.yaml")
+    shutil.copy("demo/coco_demo.yaml", dsdl_yaml)
+
+    with pytest.warns(DefineSyntaxWarning, match="global-info-type"):
+        dsdl_py = dsdl_parse(dsdl_yaml)
+    # 命中缓存时同样发出解析时的警告
+    with pytest.warns(DefineSyntaxWarning, match="global-info-type"):
+        assert dsdl_parse(dsdl_yaml) == dsdl_py
+
+    # yaml所在目录下新出现的import文件覆盖library中的版本
+    (tmp_path / "task").mkdir()
+    shutil.copy(f"{LIBRARY}/task/object-detection.yaml", tmp_path / "task" / "object-detection.yaml")
+    assert cache.load_parse_cache(cache.parse_cache_key(dsdl_yaml, None)) is None
+
+
+def test_compile_dsdl_py(tmp_path, monkeypatch):
+    monkeypatch.setenv("DSDL_PARSER_CACHE_DIR", str(tmp_path))
+    code = cache.compile_dsdl_py("a = 1\n")
+    cache._CODE_MEMO.clear()
+    scope = {}
+    exec(cache.compile_dsdl_py("a = 1\n"), scope)
+    assert scope["a"] == 1 and code.co_filename == "<dsdl>"